@@ -1,19 +1,73 @@
 """Default classes for all to inherit from."""
 
 import builtins
+import os
+from importlib import import_module
 from pathlib import Path
-from typing import List, Optional
-
-import srsly
+from typing import TYPE_CHECKING, List, Optional, Union
 
 from genbase._version import __version__
-from genbase.data import import_data, rename_labels, train_test_split
-from genbase.decorator import add_callargs
-from genbase.internationalization import LOCALE_MAP, get_locale, set_locale, translate_list, translate_string
-from genbase.mixin import CaseMixin, SeedMixin
-from genbase.model import import_model
-from genbase.ui import Render, is_colab, is_interactive
-from genbase.utils import recursive_to_dict, silence_tqdm
+
+if TYPE_CHECKING:  # pragma: no cover
+    from genbase.data import import_data, rename_labels, train_test_split
+    from genbase.decorator import add_callargs
+    from genbase.internationalization import LOCALE_MAP, get_locale, set_locale, translate_list, translate_string
+    from genbase.mixin import CaseMixin, SeedMixin
+    from genbase.model import import_model
+    from genbase.ui import Render, is_colab, is_interactive
+    from genbase.utils import ArrayEncoding, recursive_to_dict, silence_tqdm
+
+# Public names are only imported when first accessed, so `import genbase` does not pull in heavy dependencies
+# (`instancelib`, `pandas`, `sklearn`, `matplotlib`, `plotly`, ...) until they are actually needed.
+_LAZY_IMPORTS = {
+    'import_data': 'genbase.data',
+    'rename_labels': 'genbase.data',
+    'train_test_split': 'genbase.data',
+    'add_callargs': 'genbase.decorator',
+    'LOCALE_MAP': 'genbase.internationalization',
+    'get_locale': 'genbase.internationalization',
+    'set_locale': 'genbase.internationalization',
+    'translate_list': 'genbase.internationalization',
+    'translate_string': 'genbase.internationalization',
+    'CaseMixin': 'genbase.mixin',
+    'SeedMixin': 'genbase.mixin',
+    'import_model': 'genbase.model',
+    'Render': 'genbase.ui',
+    'is_colab': 'genbase.ui',
+    'is_interactive': 'genbase.ui',
+    'recursive_to_dict': 'genbase.utils',
+    'silence_tqdm': 'genbase.utils',
+}
+_LAZY_SUBMODULES = ['data', 'decorator', 'internationalization', 'locale', 'mixin', 'model', 'ui', 'utils']
+
+
+def __getattr__(name: str):
+    """Import public names and submodules on first access."""
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = import_module(f'{__name__}.{name}')
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS) | set(_LAZY_SUBMODULES))
+
+
+def _is_file(path_or_string: str) -> bool:
+    try:
+        return Path(path_or_string).is_file()
+    except (OSError, ValueError):
+        return False
+
+
+def _check_json_encoding(array_encoding: Optional['ArrayEncoding']) -> None:
+    if array_encoding == 'native':
+        raise ValueError('Array encoding "native" is only supported by MessagePack, choose from "list", "base64" or '
+                         '"npy" for JSON.')
 
 
 class Readable:
@@ -29,24 +83,31 @@ class Configurable:
 
     @classmethod
     def from_config(cls, config: dict, **kwargs) -> 'Configurable':
-        config = {**config, **kwargs}
+        from genbase.utils import decode_arrays, resolve_references
+        config = {**resolve_references(decode_arrays(config)), **kwargs}
         _ = config.pop('__class__', None)
         return cls(**config)
 
     @classmethod
     def read_json(cls, path: str, **read_args) -> 'Configurable':
-        """Read config from JSON file (GZIP JSON, JSONL or JSON).
+        """Read config from JSON file (GZIP JSON, JSONL or JSON), or MessagePack file if `path` ends in `.msgpack`.
 
         Args:
             path (str): File path.
             **read_args: Optional arguments passed to `srsly.read_json()`/`srsly.read_jsonl()`/`srsly.read_gzip_json`.
         """
+        if path.endswith('.msgpack'):
+            return cls.read_msgpack(path, **read_args)
+
+        import srsly
+
+        from genbase.utils import decode_arrays
         read_fn = srsly.read_json
         if path.endswith('.json.gz'):
             read_fn = srsly.read_gzip_json
         elif path.endswith('.jsonl'):
             read_fn = srsly.read_jsonl
-        return cls.from_config(read_fn(path, **read_args))
+        return cls.from_config(decode_arrays(read_fn(path, **read_args), root=os.path.dirname(os.path.abspath(path))))
 
     @classmethod
     def from_json(cls, json_or_path: str, **read_args) -> 'Configurable':
@@ -56,8 +117,9 @@ class Configurable:
             json_or_path (str): File path or JSON string.
             **read_args: Optional arguments passed to `srsly.read_json()`/`srsly.read_jsonl()`/`srsly.read_gzip_json`.
         """
-        if Path.is_file(json_or_path):
+        if _is_file(json_or_path):
             return cls.read_json(json_or_path, **read_args)
+        import srsly
         return cls.from_config(srsly.json_loads(json_or_path))
 
     @classmethod
@@ -67,6 +129,7 @@ class Configurable:
         Args:
             path (str): File path.
         """
+        import srsly
         return cls.from_config(srsly.read_yaml(path))
 
     @classmethod
@@ -76,31 +139,88 @@ class Configurable:
         Args:
             yaml_or_path (str): File path or YAML string.
         """
-        if Path.is_file(yaml_or_path):
+        if _is_file(yaml_or_path):
             return cls.read_yaml(yaml_or_path)
+        import srsly
         return cls.from_config(srsly.yaml_loads(yaml_or_path))
 
-    def to_config(self, exclude: List[str]) -> dict:
+    @classmethod
+    def read_msgpack(cls, path: str, **read_args) -> 'Configurable':
+        """Read config from MessagePack file.
+
+        Args:
+            path (str): File path.
+            **read_args: Optional arguments passed to `srsly.read_msgpack()`.
+        """
+        import srsly
+
+        from genbase.utils import decode_arrays
+        return cls.from_config(decode_arrays(srsly.read_msgpack(path, **read_args),
+                                             root=os.path.dirname(os.path.abspath(path))))
+
+    @classmethod
+    def from_msgpack(cls, msgpack_or_path: Union[bytes, str], **read_args) -> 'Configurable':
+        """Get config from MessagePack bytes or filepath.
+
+        Args:
+            msgpack_or_path (Union[bytes, str]): File path or MessagePack bytes.
+            **read_args: Optional arguments passed to `srsly.read_msgpack()`/`srsly.msgpack_loads()`.
+        """
+        if not isinstance(msgpack_or_path, bytes):
+            return cls.read_msgpack(msgpack_or_path, **read_args)
+        import srsly
+        return cls.from_config(srsly.msgpack_loads(msgpack_or_path, **read_args))
+
+    def to_config(self, exclude: Optional[List[str]] = None, array_encoding: Optional['ArrayEncoding'] = None,
+                  dedupe: bool = False) -> dict:
         """Convert class information into config (configuration dictionary).
 
         Args:
-            exclude (List[str]): Names of variables to exclude.
+            exclude (Optional[List[str]], optional): Names of variables to exclude. Defaults to None.
+            array_encoding (Optional[ArrayEncoding], optional): Encode `np.ndarray`s as nested lists ('list') or
+                base64-encoded buffers ('base64'). If None, uses the current encoding (see
+                `genbase.utils.array_encoding`). Defaults to None.
+            dedupe (bool, optional): Export shared objects once and later occurrences (and reference cycles) as
+                references to them (see `genbase.utils.references`). Defaults to False.
 
         Returns:
-            dict: [description]
+            dict: Config.
         """
-        return dict(recursive_to_dict(self, exclude=exclude))
+        from contextlib import nullcontext
+
+        from genbase import utils
 
-    def to_json(self, indent: int = 2) -> str:
+        # Export `vars(self)` instead of `self`, as `recursive_to_dict()` would call `self.to_config()` again
+        config = {'__class__': str(self.__class__).split("'")[1]}
+        with utils.references(self) if dedupe else nullcontext():
+            if array_encoding is None:
+                return dict(config, **dict(utils.recursive_to_dict(vars(self), exclude=exclude)))
+            with utils.array_encoding(array_encoding):
+                return dict(config, **dict(utils.recursive_to_dict(vars(self), exclude=exclude)))
+
+    def to_json(self, indent: int = 2, array_encoding: Optional['ArrayEncoding'] = None) -> str:
         """Convert config to JSON-formatted string.
 
         Args:
             indent (int, optional): Number of spaces to indent JSON. Defaults to 2.
+            array_encoding (Optional[ArrayEncoding], optional): Encode `np.ndarray`s as nested lists ('list') or
+                base64-encoded buffers ('base64'). If None, uses the current encoding (or the exporter registered for
+                `np.ndarray`, nested lists by default). Defaults to None.
+
+        Raises:
+            ValueError: Array encoding 'native', which JSON does not support.
 
         Returns:
             str: Config formatted as JSON.
         """
-        return srsly.json_dumps(self.to_config(), indent=indent)
+        import srsly
+
+        from genbase.utils import array_encoding as encode_arrays
+        from genbase.utils import references
+        _check_json_encoding(array_encoding)
+        with encode_arrays(array_encoding), references(self):
+            config = self.to_config()
+        return srsly.json_dumps(config, indent=indent)
 
     def to_yaml(self, **write_args) -> str:
         """Convert config to YAML-formatted string.
@@ -111,21 +231,100 @@ class Configurable:
         Returns:
             str: Config formatted as YAML.
         """
+        import srsly
         return srsly.yaml_dumps(self.to_config(), **write_args)
 
-    def write_json(self, path: str, indent: int = 2) -> None:
+    def to_msgpack(self, array_encoding: 'ArrayEncoding' = 'native') -> bytes:
+        """Convert config to MessagePack-formatted bytes, with `np.ndarray`s stored natively by default.
+
+        Args:
+            array_encoding (ArrayEncoding, optional): Store `np.ndarray`s natively ('native'), as nested lists ('list')
+                or as base64-encoded buffers ('base64'). Defaults to 'native'.
+
+        Raises:
+            ValueError: Unsupported array encoding.
+
+        Returns:
+            bytes: Config formatted as MessagePack.
+        """
+        import srsly
+
+        from genbase.utils import array_encoding as encode_arrays
+        from genbase.utils import references
+        with encode_arrays(array_encoding), references(self):
+            config = self.to_config()
+        return srsly.msgpack_dumps(config)
+
+    def write_json(self, path: str, indent: int = 2, array_encoding: Optional['ArrayEncoding'] = None,
+                   stream: bool = False, blob_store: Optional[str] = None) -> None:
         """Write class config to JSON.
 
         Args:
-            path (str): Path to save to. If ends in `.json.gz` saves as GZIP JSON, `.jsonl` as JSONL or JSON by default.
+            path (str): Path to save to. If ends in `.json.gz` saves as GZIP JSON, `.jsonl` as JSONL, `.msgpack` as
+                MessagePack (see `write_msgpack()`) or JSON by default.
             indent (int, optional): Number of spaces to indent JSON. Defaults to 2.
+            array_encoding (Optional[ArrayEncoding], optional): Encode `np.ndarray`s as nested lists ('list'),
+                base64-encoded buffers ('base64') or as `.npy` files in directory `{path}_arrays` ('npy'). If None,
+                uses the current encoding (or the exporter registered for `np.ndarray`, nested lists by default), or
+                stores them natively ('native') in MessagePack files. Defaults to None.
+            stream (bool, optional): Write the config incrementally without building it in memory first, as compact
+                JSON (ignoring `indent`; see `genbase.stream`). Defaults to False.
+            blob_store (Optional[str], optional): Directory to write large serialized objects (e.g. `sklearn`
+                estimators) to once, referenced by their content hash (see `genbase.utils.blob_store`). If None,
+                inlines them as base64. Defaults to None.
+
+        Raises:
+            ValueError: Array encoding 'native' for JSON.
         """
+        if path.endswith('.msgpack'):
+            return self.write_msgpack(path, array_encoding='native' if array_encoding is None else array_encoding)
+        _check_json_encoding(array_encoding)
+
+        from contextlib import nullcontext
+
+        from genbase.utils import array_encoding as encode_arrays
+        from genbase.utils import blob_store as store_blobs
+        from genbase.utils import references
+        root = os.path.dirname(os.path.abspath(path))
+        blobs = nullcontext() if blob_store is None else store_blobs(blob_store, root=root)
+        if stream:
+            from genbase.stream import write_json, write_jsonl
+
+            write_fn = write_jsonl if path.endswith('.jsonl') else write_json
+            with encode_arrays(array_encoding, directory=f'{path}_arrays', root=root), blobs:
+                return write_fn(self, path)
+
+        import srsly
+
         write_fn = srsly.write_json
         if path.endswith('.json.gz'):
             write_fn = srsly.write_gzip_json
         elif path.endswith('.jsonl'):
             write_fn = srsly.write_jsonl
-        write_fn(path, self.to_config(), indent=indent)
+        with encode_arrays(array_encoding, directory=f'{path}_arrays', root=root), blobs, references(self):
+            config = self.to_config()
+        write_fn(path, config, indent=indent)
+
+    def write_msgpack(self, path: str, array_encoding: 'ArrayEncoding' = 'native') -> None:
+        """Write class config to MessagePack, with `np.ndarray`s stored natively by default.
+
+        Args:
+            path (str): Path to save to.
+            array_encoding (ArrayEncoding, optional): Store `np.ndarray`s natively ('native'), as nested lists
+                ('list'), base64-encoded buffers ('base64') or as `.npy` files in directory `{path}_arrays` ('npy').
+                Defaults to 'native'.
+
+        Raises:
+            ValueError: Unknown array encoding.
+        """
+        import srsly
+
+        from genbase.utils import array_encoding as encode_arrays
+        from genbase.utils import references
+        root = os.path.dirname(os.path.abspath(path))
+        with encode_arrays(array_encoding, directory=f'{path}_arrays', root=root), references(self):
+            config = self.to_config()
+        srsly.write_msgpack(path, config)
 
     def write_yaml(self, path: str, **write_args) -> None:
         """Write class config to YAML.
@@ -134,6 +333,7 @@ class Configurable:
             path (str): Path to save to.
             **write_args: Optional arguments passed to `srsly.write_yaml()`
         """
+        import srsly
         srsly.write_yaml(path, self.to_config(), **write_args)
 
 
@@ -144,7 +344,7 @@ class MetaInfo(Configurable):
                  fn_name: Optional[str] = None,
                  callargs: Optional[dict] = None,
                  renderargs: Optional[dict] = None,
-                 renderer = Render,
+                 renderer=None,
                  **kwargs):
         """Meta information class.
 
@@ -153,7 +353,7 @@ class MetaInfo(Configurable):
             subtype (Optional[str], optional): Subtype description. Defaults to None.
             callargs (Optional[dict], optional): Arguments used when the function was called. Defaults to None.
             renderargs (Optional[dict], optional): Custom arguments passed to renderer. Defaults to None.
-            renderer
+            renderer (optional): Renderer class or instance. Defaults to None (`genbase.ui.Render`).
             **kwargs: Optional meta descriptors.
         """
         self._type = type
@@ -170,6 +370,9 @@ class MetaInfo(Configurable):
         if self._renderargs is not None:
             self._dict['renderargs'] = self._renderargs
         self._dict = dict(self._dict, **kwargs)
+        if renderer is None:
+            from genbase.ui import Render
+            renderer = Render
         self._renderer = renderer if isinstance(renderer, builtins.type) else renderer.__class__
 
     @property
@@ -194,6 +397,7 @@ class MetaInfo(Configurable):
 
     @property
     def html(self):
+        from genbase.ui import is_colab, is_interactive
         if is_colab():
             return self.raw_html
         if 'add_plotly' not in self.renderargs:
@@ -206,14 +410,28 @@ class MetaInfo(Configurable):
         renderargs['add_plotly'] = True
         return self._renderer(self.to_config()).as_html(**renderargs)
 
-    def to_config(self):
-        if hasattr(self, 'content'):
-            _content = self.content() if callable(self.content) else self.content
-            content = dict(recursive_to_dict(_content, include_class=False))
-        else:
-            content = super().to_config(exclude=['_type', '_subtype', '_dict', '_callargs'])
+    def to_config(self, dedupe: bool = False):
+        from contextlib import nullcontext
+
+        from genbase.utils import recursive_to_dict, references
+
+        # Within an active statement (e.g. of `to_json()`) the `CONTENT` key has to be on the pointer path as well
+        active = dedupe or references.active()
+
+        def scope(*args, **kwargs):
+            return references(*args, **kwargs) if active else nullcontext()
+
+        with scope(self):
+            if hasattr(self, 'content'):
+                _content = self.content() if callable(self.content) else self.content
+                with scope(_content, key='CONTENT'):
+                    content = dict(recursive_to_dict(_content, include_class=False))
+            else:
+                with scope(key='CONTENT'):
+                    content = super().to_config(exclude=['_type', '_subtype', '_dict', '_callargs'], dedupe=dedupe)
 
         return {'META': self.meta, 'CONTENT': content}
 
     def _repr_html_(self) -> str:
+        from genbase.ui import is_interactive
         return self.html if is_interactive() else repr(self)
@@ -0,0 +1,43 @@
+"""Benchmarks for tracking the performance of `genbase` across releases.
+
+Run a benchmark from the command line, which prints the results as JSON:
+
+    $ python -m genbase.bench startup --repeat 5 --output startup.json
+"""
+
+import json
+import platform
+import sys
+import time
+from typing import Optional
+
+from genbase._version import __version__
+
+
+def environment_info() -> dict:
+    """Describe the environment a benchmark was run in.
+
+    Returns:
+        dict: Versions of `genbase` and Python, platform and time of running.
+    """
+    return {'genbase': __version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+
+
+def write_results(results: dict, output: Optional[str] = None) -> None:
+    """Write benchmark results as JSON to `output` or to stdout.
+
+    Args:
+        results (dict): Benchmark results.
+        output (Optional[str], optional): File path to write to. If None, prints to stdout. Defaults to None.
+    """
+    results = {'environment': environment_info(), **results}
+    if output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
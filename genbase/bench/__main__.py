@@ -0,0 +1,24 @@
+"""Command line entry point for `python -m genbase.bench`."""
+
+import argparse
+from typing import List, Optional
+
+from genbase.bench import importing, serialization, startup, write_results
+
+BENCHMARKS = {'importing': importing, 'serialization': serialization, 'startup': startup}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m genbase.bench', description='Run `genbase` benchmarks.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    for name, module in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=module.__doc__.splitlines()[0])
+        subparser.add_argument('--output', '-o', default=None, help='Write JSON results to file instead of stdout.')
+        module.add_arguments(subparser)
+
+    args = parser.parse_args(argv)
+    write_results(BENCHMARKS[args.benchmark].run(args), output=args.output)
+
+
+if __name__ == '__main__':
+    main()
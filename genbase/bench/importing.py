@@ -0,0 +1,81 @@
+"""Time of importing a synthetic sharded dataset serially and in parallel.
+
+Writes `shards` CSV files of `rows` rows each to a temporary directory and imports them with `import_data()` using a
+glob, serially (`n_jobs=None`) and with each combination of `n_jobs` and executor ('thread' or 'process').
+"""
+
+import os
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from genbase.bench.serialization import best_of
+from genbase.data import import_data
+
+EXECUTORS = ['thread', 'process']
+
+
+def write_shards(directory: str, shards: int, rows: int, seed: int = 0) -> str:
+    """Write `shards` synthetic CSV files of `rows` rows to `directory`, returning a glob matching them."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f'word{i}' for i in range(1_000)])
+    for shard in range(shards):
+        texts = [' '.join(row) for row in rng.choice(words, size=(rows, 20))]
+        pd.DataFrame({'text': texts, 'label': rng.integers(0, 10, size=rows)}).to_csv(
+            os.path.join(directory, f'shard_{shard:04d}.csv'), index=False)
+    return os.path.join(directory, '*.csv')
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument('--shards', '-s', type=int, default=16, help='Number of files.')
+    parser.add_argument('--rows', type=int, default=10_000, help='Number of rows per file.')
+    parser.add_argument('--n-jobs', '-n', type=int, nargs='+', default=[2, 4], help='Numbers of workers to compare.')
+    parser.add_argument('--executors', '-e', nargs='+', default=EXECUTORS, choices=EXECUTORS,
+                        help='Executors to compare.')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Number of imports per setting.')
+
+
+def run(args) -> dict:
+    return importing(shards=args.shards, rows=args.rows, n_jobs=args.n_jobs, executors=args.executors,
+                     repeat=args.repeat)
+
+
+def importing(shards: int = 16,
+              rows: int = 10_000,
+              n_jobs: Optional[List[int]] = None,
+              executors: Optional[List[str]] = None,
+              repeat: int = 3) -> dict:
+    """Benchmark importing a sharded dataset serially and in parallel.
+
+    Example:
+        >>> from genbase.bench.importing import importing
+        >>> importing(shards=8, rows=1_000, n_jobs=[4], executors=['process'])
+
+    Args:
+        shards (int, optional): Number of files. Defaults to 16.
+        rows (int, optional): Number of rows per file. Defaults to 10_000.
+        n_jobs (Optional[List[int]], optional): Numbers of workers to compare. If None, uses [2, 4]. Defaults to None.
+        executors (Optional[List[str]], optional): Executors to compare. If None, uses all `EXECUTORS`.
+            Defaults to None.
+        repeat (int, optional): Number of imports per setting. Defaults to 3.
+
+    Returns:
+        dict: Best import time (in seconds) serially and per executor and number of workers.
+    """
+    if n_jobs is None:
+        n_jobs = [2, 4]
+    if executors is None:
+        executors = list(EXECUTORS)
+
+    res = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_shards(directory, shards=shards, rows=rows)
+        res['serial'] = {'seconds': best_of(lambda: import_data(path, data_cols='text', label_cols='label'), repeat)}
+        for executor in executors:
+            for n in n_jobs:
+                res[f'{executor}-{n}'] = {'seconds': best_of(lambda: import_data(path, data_cols='text',
+                                                                                 label_cols='label', n_jobs=n,
+                                                                                 executor=executor), repeat)}
+    return {'benchmark': 'importing', 'shards': shards, 'rows': rows, 'repeat': repeat, 'settings': res}
@@ -0,0 +1,85 @@
+"""Write time, read time and file size of `Configurable` serialization formats.
+
+Compares the JSON paths (`write_json()`/`read_json()`, with arrays as lists or base64-encoded buffers) to MessagePack
+(`write_msgpack()`/`read_msgpack()`) on a synthetic config with nested records and a NumPy array.
+"""
+
+import os
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from genbase import Configurable
+
+FORMATS = {'json': ('.json', {'array_encoding': 'list'}),
+           'json-base64': ('.json', {'array_encoding': 'base64'}),
+           'json.gz': ('.json.gz', {'array_encoding': 'base64'}),
+           'msgpack': ('.msgpack', {})}
+
+
+class Results(Configurable):
+    """Synthetic results, with `size` records and an array of `size` x 10 scores."""
+
+    def __init__(self, records: list, scores: np.ndarray):
+        self.records = records
+        self.scores = scores
+
+    @classmethod
+    def generate(cls, size: int, seed: int = 0) -> 'Results':
+        rng = np.random.default_rng(seed)
+        records = [{'id': i, 'label': f'label_{i % 10}', 'score': float(s), 'features': [f'w{j}' for j in range(5)]}
+                   for i, s in enumerate(rng.random(size))]
+        return cls(records=records, scores=rng.random((size, 10)))
+
+
+def best_of(fn: Callable, repeat: int) -> float:
+    """Best (lowest) time in seconds of calling `fn` `repeat` times."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument('--size', '-s', type=int, default=100_000, help='Number of records.')
+    parser.add_argument('--formats', '-f', nargs='+', default=list(FORMATS.keys()), choices=list(FORMATS.keys()),
+                        help='Formats to compare.')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Number of writes and reads per format.')
+
+
+def run(args) -> dict:
+    return serialization(size=args.size, formats=args.formats, repeat=args.repeat)
+
+
+def serialization(size: int = 100_000, formats: Optional[List[str]] = None, repeat: int = 3) -> dict:
+    """Benchmark writing and reading a synthetic config in each format.
+
+    Example:
+        >>> from genbase.bench.serialization import serialization
+        >>> serialization(size=10_000, formats=['json', 'msgpack'])
+
+    Args:
+        size (int, optional): Number of records. Defaults to 100_000.
+        formats (Optional[List[str]], optional): Formats to compare. If None, uses all `FORMATS`. Defaults to None.
+        repeat (int, optional): Number of writes and reads per format. Defaults to 3.
+
+    Returns:
+        dict: Best write and read time (in seconds) and file size (in bytes) per format.
+    """
+    if formats is None:
+        formats = list(FORMATS.keys())
+    results = Results.generate(size)
+
+    res = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in formats:
+            extension, write_args = FORMATS[name]
+            path = os.path.join(directory, f'results{extension}')
+            res[name] = {'write_seconds': best_of(lambda: results.write_json(path, **write_args), repeat),
+                         'read_seconds': best_of(lambda: Results.read_json(path), repeat),
+                         'size_bytes': os.path.getsize(path)}
+    return {'benchmark': 'serialization', 'size': size, 'repeat': repeat, 'formats': res}
@@ -0,0 +1,114 @@
+"""Import (startup) time and memory of `genbase` submodules.
+
+Each import is measured in a fresh interpreter, so modules imported by earlier measurements do not count towards later
+ones. A *cold* import compiles all bytecode from scratch (using an empty `-X pycache_prefix`), while *warm* imports
+reuse the bytecode cache of the preceding runs.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+MODULES = ['genbase', 'genbase.utils', 'genbase.internationalization', 'genbase.data', 'genbase.model', 'genbase.ui']
+
+_CHILD = '''
+import json, os, sys, time
+from importlib import import_module
+
+
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    except ImportError:
+        return None
+
+
+module = sys.argv[1]
+n_modules, rss_before = len(sys.modules), rss()
+start = time.perf_counter()
+import_module(module)
+seconds = time.perf_counter() - start
+rss_after = rss()
+print(json.dumps({'seconds': seconds,
+                  'rss_bytes': None if rss_before is None else rss_after - rss_before,
+                  'modules_loaded': len(sys.modules) - n_modules}))
+'''
+
+
+def measure_import(module: str, pycache_prefix: Optional[str] = None) -> dict:
+    """Import a module in a fresh interpreter and measure its import time and resident memory.
+
+    Args:
+        module (str): Name of module to import.
+        pycache_prefix (Optional[str], optional): Directory to read and write bytecode caches from. Defaults to None.
+
+    Returns:
+        dict: Import time (`seconds`), resident memory added (`rss_bytes`) and number of modules loaded.
+    """
+    cmd, env = [sys.executable], dict(os.environ)
+    if pycache_prefix is not None:
+        cmd += ['-X', f'pycache_prefix={pycache_prefix}']
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(cmd + ['-c', _CHILD, module], capture_output=True, text=True, check=True, env=env)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_module(module: str, repeat: int = 5) -> dict:
+    """Measure cold and warm import time and memory for a single module.
+
+    Args:
+        module (str): Name of module to import.
+        repeat (int, optional): Number of warm imports. Defaults to 5.
+
+    Returns:
+        dict: Cold measurement, warm measurements and the median warm import time and memory.
+    """
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        cold = measure_import(module, pycache_prefix=pycache_prefix)
+        warm = [measure_import(module, pycache_prefix=pycache_prefix) for _ in range(repeat)]
+    rss = [w['rss_bytes'] for w in warm if w['rss_bytes'] is not None]
+    return {'cold': cold,
+            'warm': {'seconds': statistics.median(w['seconds'] for w in warm) if warm else None,
+                     'rss_bytes': int(statistics.median(rss)) if rss else None,
+                     'runs': warm}}
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument('--modules', '-m', nargs='+', default=MODULES, help='Modules to import.')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Number of warm imports per module.')
+
+
+def run(args) -> dict:
+    return startup(modules=args.modules, repeat=args.repeat)
+
+
+def startup(modules: Optional[List[str]] = None, repeat: int = 5) -> dict:
+    """Benchmark the cold and warm import time and resident memory of `genbase` (sub)modules.
+
+    Example:
+        >>> from genbase.bench.startup import startup
+        >>> startup(['genbase', 'genbase.ui'], repeat=3)
+
+    Args:
+        modules (Optional[List[str]], optional): Modules to import. If None, uses `MODULES`. Defaults to None.
+        repeat (int, optional): Number of warm imports per module. Defaults to 5.
+
+    Returns:
+        dict: Results per module.
+    """
+    if modules is None:
+        modules = MODULES
+    return {'benchmark': 'startup',
+            'repeat': repeat,
+            'modules': {module: benchmark_module(module, repeat=repeat) for module in modules}}
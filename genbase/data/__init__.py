@@ -1,18 +1,34 @@
 """Data imports, sampling and generation."""
 
-from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
 
 import instancelib as il
 import pandas as pd
 from instancelib.typehints import KT, VT
 
 from ..utils import get_file_type, info
+from .index import content_index, deduplicate, lookup  # noqa: F401
+from .sample import Sampler
+from .split import Splitter, k_fold_split  # noqa: F401
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import ParseCache
+    from .download import Downloader
 
 Method = Literal['infer', 'glob', 'pandas']
 
 
 METHODS = ['infer', 'glob', 'pandas']
-PANDAS_FILE_TYPES = ['.csv', '.tsv', '.txt', '.json', '.pkl', '.xls', '.xlsx']
+PANDAS_FILE_TYPES = ['.csv', '.tsv', '.txt', '.json', '.jsonl', '.pkl', '.xls', '.xlsx', '.parquet', '.arrow', '.ipc',
+                     '.feather']
+CHUNKED_FILE_TYPES = ['.csv', '.tsv', '.txt', '.jsonl']
+COLUMNAR_FILE_TYPES = ['.arrow', '.ipc', '.feather', '.parquet']
+DATASETS_BATCH_SIZE = 1000
+SAMPLE_CHUNKSIZE = 100_000
 
 
 
@@ -58,8 +74,7 @@ def get_compressed_files(ioargs):
     raise NotImplementedError(f'Unable to process "{handle}" with compression method "{compression}"!')
 
 
-def pandas_to_instancelib(dataset, data_cols, label_cols, label_map=None):
-    env = il.pandas_to_env(dataset, data_cols, label_cols)
+def _apply_label_map(env, label_map=None):
     if label_map is not None:
         if isinstance(label_map, dict):
             label_map = {str(k): v for k, v in sorted(label_map.items())}
@@ -67,12 +82,209 @@ def pandas_to_instancelib(dataset, data_cols, label_cols, label_map=None):
     return env
 
 
+def pandas_to_instancelib(dataset, data_cols, label_cols, label_map=None):
+    return _apply_label_map(il.pandas_to_env(dataset, data_cols, label_cols), label_map=label_map)
+
+
+def _label_str(value) -> Optional[str]:
+    # Same as `instancelib.ingest.spreadsheet.identity_mapper()`
+    if isinstance(value, str):
+        return value
+    value = str(value)
+    return value if value else None
+
+
+def read_chunks(dataset, file_type: str, columns: List[KT], chunksize: int, **read_kwargs) -> Iterator[pd.DataFrame]:
+    """Read a CSV/TSV/JSONL file in chunks, parsing only `columns` (if supported by the file type).
+
+    Args:
+        dataset: Path or file handle to read from.
+        file_type (str): File type ('.csv', '.tsv', '.txt' or '.jsonl').
+        columns (List[KT]): Columns to read.
+        chunksize (int): Number of rows per chunk.
+        **read_kwargs: Optional arguments passed to `pd.read_csv()`/`pd.read_json()`.
+
+    Yields:
+        Iterator[pd.DataFrame]: Chunks, with a continuous index.
+    """
+    if file_type == '.jsonl':
+        read_kwargs['lines'] = True
+        with pd.read_json(dataset, chunksize=chunksize, **read_kwargs) as reader:
+            for chunk in reader:
+                yield chunk[columns]
+        return
+    if 'sep' not in read_kwargs:
+        read_kwargs['sep'] = '\t' if file_type == '.tsv' else ','
+    read_kwargs.setdefault('usecols', columns)
+    with pd.read_csv(dataset, chunksize=chunksize, **read_kwargs) as reader:
+        yield from reader
+
+
+def chunks_to_instancelib(chunks: Iterator[pd.DataFrame], data_cols, label_cols, label_map=None) -> il.Environment:
+    """Convert chunks of a dataset into an instancelib Environment, adding the instances of each chunk as it is read.
+
+    Results in the same environment as `pandas_to_instancelib()` on the whole dataset. The label provider is created
+    once all chunks are read, as its labelset cannot be extended.
+
+    Args:
+        chunks (Iterator[pd.DataFrame]): Chunks of the dataset, with a continuous index.
+        data_cols: Name of column(s) containing data.
+        label_cols: Name of column(s) containing labels.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+
+    Returns:
+        il.Environment: Environment.
+    """
+    from instancelib.instances.text import TextInstanceProvider
+    from instancelib.labels.memory import MemoryLabelProvider
+
+    dataset, labeldict, labelset = TextInstanceProvider([]), {}, set()
+    for chunk in chunks:
+        indices, texts, labels = extract_columns(chunk, data_cols, label_cols)
+        dataset.add_range(*map(TextInstanceProvider.construct, indices, texts, [None] * len(texts), texts))
+        for index, labeling in zip(indices, labels):
+            labeldict[index] = set(labeling)
+            labelset.update(labeling)
+        del indices, texts, labels
+    env = il.TextEnvironment(dataset, MemoryLabelProvider(labelset, labeldict))
+    return _apply_label_map(env, label_map=label_map)
+
+
+def extract_columns(df: pd.DataFrame, data_cols, label_cols) -> Tuple[List[KT], List[str], List[frozenset]]:
+    """Extract indices, texts and labels column-wise, like `instancelib.ingest.spreadsheet.extract_data()`.
+
+    Unlike `extract_data()`, the indices are not cast with `int(i)` but kept as the values of the index of `df`.
+
+    Args:
+        df (pd.DataFrame): Dataset.
+        data_cols: Name of column(s) containing data, joined by spaces.
+        label_cols: Name of column(s) containing labels.
+
+    Returns:
+        Tuple[List[KT], List[str], List[frozenset]]: Indices (the index of `df`), texts and sets of labels.
+    """
+    data = [df[col].astype(str).tolist() for col in data_cols]
+    texts = data[0] if len(data) == 1 else [' '.join(values) for values in zip(*data)]
+    labels = [frozenset(label for label in map(_label_str, values) if label is not None)
+              for values in zip(*(df[col].tolist() for col in label_cols))]
+    return df.index.tolist(), texts, labels
+
+
+def is_datasets(dataset: Any) -> bool:
+    """Whether `dataset` is a HuggingFace `datasets.Dataset` or `datasets.IterableDataset`."""
+    return type(dataset).__module__.split('.')[0] == 'datasets' and hasattr(dataset, 'column_names') and \
+        (hasattr(dataset, 'iter') or hasattr(dataset, '__iter__'))
+
+
+def iter_datasets_batches(dataset,
+                          columns: List[KT],
+                          batch_size: int = DATASETS_BATCH_SIZE) -> Iterator[Dict[KT, list]]:
+    """Iterate over batches of a HuggingFace dataset, without converting it to pandas.
+
+    Args:
+        dataset (Union[datasets.Dataset, datasets.IterableDataset]): Dataset.
+        columns (List[KT]): Columns to read.
+        batch_size (int, optional): Number of rows per batch. Defaults to `DATASETS_BATCH_SIZE`.
+
+    Yields:
+        Iterator[Dict[KT, list]]: Batches, as dictionaries of column names to lists of values.
+    """
+    if hasattr(dataset, 'select_columns'):
+        dataset = dataset.select_columns(columns)
+    if hasattr(dataset, 'iter'):
+        yield from dataset.iter(batch_size=batch_size)
+    elif hasattr(dataset, '__getitem__') and hasattr(dataset, '__len__'):
+        for start in range(0, len(dataset), batch_size):
+            yield dataset[start:start + batch_size]
+    else:
+        batch = []
+        for row in dataset:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield {col: [r[col] for r in batch] for col in columns}
+                batch = []
+        if batch:
+            yield {col: [r[col] for r in batch] for col in columns}
+
+
+def iter_datasets_frames(dataset, columns: List[KT], batch_size: int = DATASETS_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """Iterate over batches of a HuggingFace dataset as pandas DataFrames, with a continuous index.
+
+    Args:
+        dataset (Union[datasets.Dataset, datasets.IterableDataset]): Dataset.
+        columns (List[KT]): Columns to read.
+        batch_size (int, optional): Number of rows per batch. Defaults to `DATASETS_BATCH_SIZE`.
+
+    Yields:
+        Iterator[pd.DataFrame]: Batches, equal to consecutive parts of `dataset.to_pandas()[columns]`.
+    """
+    start = 0
+    for batch in iter_datasets_batches(dataset, columns, batch_size=batch_size):
+        frame = pd.DataFrame(batch, columns=columns)
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+
+def datasets_to_instancelib(dataset: Union[Any, Dict[KT, Any]],
+                            data_cols: List[KT],
+                            label_cols: List[KT],
+                            label_map: Optional[Union[Callable, dict]] = None,
+                            batch_size: int = DATASETS_BATCH_SIZE) -> il.Environment:
+    """Convert HuggingFace dataset(s) into an instancelib Environment, batch by batch.
+
+    Results in the same environment as converting `dataset.to_pandas()` (or the `to_pandas()` of each split) with
+    `pandas_to_instancelib()`, without copying the whole dataset into pandas.
+
+    Args:
+        dataset (Union[Any, Dict[KT, Any]]): `datasets.Dataset`/`datasets.IterableDataset`, or a dictionary of them
+            (e.g. a `datasets.DatasetDict`), with each split added as named provider.
+        data_cols (List[KT]): Name of columns containing data.
+        label_cols (List[KT]): Name of columns containing labels.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+        batch_size (int, optional): Number of rows to read at a time. Defaults to `DATASETS_BATCH_SIZE`.
+
+    Returns:
+        il.Environment: Environment.
+    """
+    splits = dataset.items() if isinstance(dataset, dict) else [(None, dataset)]
+    columns = list(dict.fromkeys(list(data_cols) + list(label_cols)))
+
+    indices_table, indices, texts, labels = {}, [], [], []
+    for split, split_dataset in splits:
+        info(f'Reading {"dataset" if split is None else f"split {split}"} in batches of {batch_size} rows.')
+        split_indices = []
+        for batch in iter_datasets_batches(split_dataset, columns, batch_size=batch_size):
+            data = [[str(value) for value in batch[col]] for col in data_cols]
+            texts.extend(data[0] if len(data) == 1 else [' '.join(values) for values in zip(*data)])
+            labels.extend(frozenset(label for label in map(_label_str, values) if label is not None)
+                          for values in zip(*(batch[col] for col in label_cols)))
+            start = len(split_indices)
+            split_indices.extend(range(start, start + len(batch[columns[0]])))
+        if split is not None:
+            split_indices = indices_table[split] = [f'{split}_{i}' for i in split_indices]
+        indices.extend(split_indices)
+
+    env = il.TextEnvironment.from_data(frozenset().union(*labels), indices, texts, labels, [])
+    for split, split_indices in indices_table.items():
+        env[split] = env.create_bucket(split_indices)
+    return _apply_label_map(env, label_map=label_map)
+
+
 def import_data(dataset,
                 data_cols: Union[KT, List[KT]],
                 label_cols: Union[KT, List[KT]],
                 label_map: Optional[Union[Callable, dict]] = None,
                 method: Method = 'infer',
+                chunksize: Optional[int] = None,
+                n_jobs: Optional[int] = None,
+                executor: Union[Literal['thread', 'process'], Executor] = 'thread',
+                cache: Optional[Union[str, 'ParseCache']] = None,
+                sample: Optional[Union[int, float, Sampler]] = None,
+                index: bool = False,
+                download: Optional[Union[bool, str, 'Downloader']] = None,
                 _to_instancelib: bool = True,
+                _file_type: Optional[str] = None,
                 **read_kwargs) -> Union[il.Environment, pd.DataFrame]:
     """Import data in an instancelib Environment.
 
@@ -83,6 +295,12 @@ def import_data(dataset,
         >>> ds = import_data('https://storage.googleapis.com/dataset-uploader/bbc/bbc-text.csv',
                              data_cols='text', label_cols='category')
 
+        Download it once to a local cache (`~/.cache/genbase/downloads`), only downloading it again if it changed:
+
+        >>> from genbase import import_data
+        >>> ds = import_data('https://storage.googleapis.com/dataset-uploader/bbc/bbc-text.csv',
+                             data_cols='text', label_cols='category', download=True)
+
         Convert a pandas DataFrame to instancelib Environment:
 
         >>> from genbase import import_data
@@ -102,6 +320,40 @@ def import_data(dataset,
         >>> from datasets import load_dataset
         >>> ds = import_data(load_dataset('glue', 'sst2'), data_cols='sentence', label_cols='label')
 
+        Read an environment written to Arrow IPC/Feather or Parquet by `genbase.data.arrow.write_environment()`,
+        without going through pandas (`data_cols` and `label_cols` are ignored):
+
+        >>> from genbase import import_data
+        >>> ds = import_data('environment.parquet', data_cols='text', label_cols='label')
+
+        Import a large CSV file 100.000 rows at a time, parsing only the 'text' and 'category' columns:
+
+        >>> from genbase import import_data
+        >>> ds = import_data('large.csv', data_cols='text', label_cols='category', chunksize=100_000)
+
+        Import all CSV shards in a directory, parsing 8 files at a time in separate processes:
+
+        >>> from genbase import import_data
+        >>> ds = import_data('shards/*.csv', data_cols='text', label_cols='category', n_jobs=8, executor='process')
+
+        Read only the 'text' and 'category' columns of the rows with 'year' >= 2020 from a Parquet file, skipping
+        row groups without matching rows:
+
+        >>> from genbase import import_data
+        >>> ds = import_data('lake.parquet', data_cols='text', label_cols='category', filters=[('year', '>=', 2020)])
+
+        Load the parsed file from an on-disk cache when importing it again:
+
+        >>> from genbase import import_data
+        >>> ds = import_data('train.csv', data_cols='text', label_cols='category', cache='.genbase_cache')
+
+        Import a seeded 1% sample of a large file, with at most 500 instances per label:
+
+        >>> from genbase import import_data
+        >>> from genbase.data.sample import Sampler
+        >>> ds = import_data('large.csv', data_cols='text', label_cols='category',
+                             sample=Sampler(frac=0.01, per_label=500, seed=42))
+
     Args:
         dataset (_type_): Dataset to import.
         data_cols (Union[KT, List[KT]]): Name of column(s) containing data.
@@ -109,8 +361,33 @@ def import_data(dataset,
         label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
         method (Method, optional): Method used to import data. Choose from 'infer', 'glob', 'pandas'.
             Defaults to 'infer'.
+        chunksize (Optional[int], optional): Read CSV/TSV/JSONL files in chunks of `chunksize` rows, parsing only
+            `data_cols` and `label_cols`, and add each chunk to the environment before reading the next. If None, reads
+            the whole file at once. HuggingFace datasets are always read in batches, of `chunksize` rows or
+            `DATASETS_BATCH_SIZE` if None. Defaults to None.
+        n_jobs (Optional[int], optional): Number of files (matched by a glob or in an archive) to import in parallel.
+            If None, imports them one after another. Defaults to None.
+        executor (Union[Literal['thread', 'process'], Executor], optional): Import files in parallel with a thread
+            pool ('thread', for I/O-bound reads), process pool ('process', for CPU-bound parsing) or a given
+            `concurrent.futures.Executor`. Defaults to 'thread'.
+        cache (Optional[Union[str, ParseCache]], optional): Directory or `genbase.data.cache.ParseCache` to load the
+            parsed environment from if the file(s) were imported before with the same arguments, or store it in
+            otherwise. Only local files and globs are cached. If None, does not cache. Defaults to None.
+        sample (Optional[Union[int, float, Sampler]], optional): Sample at most `sample` rows (int), a fraction
+            `sample` of rows (float) or with a `genbase.data.sample.Sampler` (e.g. with a maximum per label), drawn
+            while reading. CSV/TSV/JSONL files are then read in chunks (of `chunksize` or `SAMPLE_CHUNKSIZE` rows)
+            and HuggingFace datasets in batches, so unsampled rows are never added to the environment. Each file in a
+            glob or archive is sampled separately. If None, imports all rows. Defaults to None.
+        index (bool, optional): Whether to build a content-hash index of the environment, used by `lookup()` and
+            `deduplicate()` (see `genbase.data.index`). Defaults to False.
+        download (Optional[Union[bool, str, Downloader]], optional): Download URLs (`dataset` or the values of a
+            dictionary of URLs, concurrently) to a cache directory before reading them, revalidating and resuming
+            earlier downloads. Either True (`genbase.data.download.DEFAULT_DIRECTORY`), a directory or a
+            `genbase.data.download.Downloader`. If None, URLs are read by pandas directly. Defaults to None.
         _to_instancelib (bool, optional): Whether to convert the final result to instancelib. Defaults to True.
-        **read_kwargs: Optional arguments passed to reading call.
+        **read_kwargs: Optional arguments passed to reading call. Parquet/Feather/Arrow files are read with
+            `genbase.data.arrow.read_dataframe()`, reading only `data_cols` and `label_cols` (unless `columns` is
+            given) and the rows matching `filters`.
 
     Raises:
         ImportError: Unable to import file.
@@ -128,7 +405,38 @@ def import_data(dataset,
     if isinstance(label_cols, (int, str)):
         label_cols = [label_cols]
 
-    file_type = get_file_type(dataset)
+    sampler = None if sample is None else Sampler.from_value(sample)
+
+    if download:
+        from .download import Downloader, is_url
+        downloader = download if isinstance(download, Downloader) else \
+            Downloader() if download is True else Downloader(download)
+        if is_url(dataset):
+            dataset = downloader.fetch(dataset)
+        elif isinstance(dataset, dict) and dataset and all(map(is_url, dataset.values())):
+            dataset = dict(zip(dataset.keys(), downloader.fetch_many(list(dataset.values()))))
+
+    if index and _to_instancelib:
+        environment = import_data(dataset, data_cols=data_cols, label_cols=label_cols, label_map=label_map,
+                                  method=method, chunksize=chunksize, n_jobs=n_jobs, executor=executor, cache=cache,
+                                  sample=sampler, _file_type=_file_type, **read_kwargs)
+        content_index(environment)
+        return environment
+
+    if cache is not None and _to_instancelib:
+        from .cache import ParseCache
+        cache = ParseCache(cache) if isinstance(cache, str) else cache
+        key = cache.entry_key(dataset, data_cols, label_cols, label_map=label_map, method=method,
+                              **(read_kwargs if sampler is None else dict(read_kwargs, sample=sampler)))
+        environment = cache.get(key)
+        if environment is None:
+            environment = import_data(dataset, data_cols=data_cols, label_cols=label_cols, label_map=label_map,
+                                      method=method, chunksize=chunksize, n_jobs=n_jobs, executor=executor,
+                                      sample=sampler, **read_kwargs)
+            cache.put(key, environment)
+        return environment
+
+    file_type = get_file_type(dataset) if _file_type is None else _file_type
     path_like = isinstance(dataset, str)
 
     # Unpack archived file
@@ -143,8 +451,19 @@ def import_data(dataset,
                                       label_cols=label_cols,
                                       label_map=label_map,
                                       method=method,
+                                      chunksize=chunksize,
+                                      n_jobs=n_jobs,
+                                      executor=executor,
+                                      sample=sampler,
                                       **read_kwargs)
 
+    # Read environment written by `genbase.data.arrow.write_environment()`
+    if _to_instancelib and method != 'glob' and file_type in COLUMNAR_FILE_TYPES:
+        from .arrow import is_environment_file, read_environment
+        if is_environment_file(dataset):
+            info(f'Reading environment "{dataset}".')
+            return read_environment(dataset, label_map=label_map, **read_kwargs)
+
     # Infer method
     if method == 'infer':
         if path_like and '*' in dataset:
@@ -155,16 +474,29 @@ def import_data(dataset,
     # Multiple files
     if method == 'glob':
         import glob
-        return import_from_key_values([(file, file) for file in glob.glob(dataset)],
+        return import_from_key_values([(file, file) for file in sorted(glob.glob(dataset))],
                                       data_cols=data_cols,
                                       label_cols=label_cols,
                                       label_map=label_map,
                                       method='infer',
+                                      chunksize=chunksize,
+                                      n_jobs=n_jobs,
+                                      executor=executor,
+                                      sample=sampler,
                                       **read_kwargs)
 
     # Read one file with Pandas
     if method == 'pandas':
-        if file_type is not None:
+        if (chunksize is not None or sampler is not None) and file_type in CHUNKED_FILE_TYPES:
+            chunksize = SAMPLE_CHUNKSIZE if chunksize is None else chunksize
+            info(f'Reading file "{dataset}" in chunks of {chunksize} rows.')
+            chunks = read_chunks(dataset, file_type, list(data_cols) + list(label_cols), chunksize, **read_kwargs)
+            if sampler is not None:
+                chunks, sampler = [sampler.sample(chunks, label_cols, columns=list(data_cols) + list(label_cols))], None
+            if _to_instancelib:
+                return chunks_to_instancelib(chunks, data_cols=data_cols, label_cols=label_cols, label_map=label_map)
+            dataset = pd.concat(chunks)
+        elif file_type is not None:
             info(f'Reading file "{dataset}".')
             if file_type in ['.csv', '.tsv', '.txt']:
                 if 'sep' not in read_kwargs:
@@ -175,14 +507,39 @@ def import_data(dataset,
                 dataset = pd.read_csv(dataset, **read_kwargs)
             elif file_type == '.json':
                 dataset = pd.read_json(dataset, **read_kwargs)
+            elif file_type == '.jsonl':
+                dataset = pd.read_json(dataset, lines=True, **read_kwargs)
             elif file_type == '.pkl':
                 dataset = pd.read_pickle(dataset, **read_kwargs)  # nosec
             elif file_type in ['.xls', '.xlsx']:
                 dataset = pd.read_excel(dataset, **read_kwargs)
+            elif file_type in COLUMNAR_FILE_TYPES:
+                from . import arrow
+                read_kwargs.setdefault('columns', list(dict.fromkeys(list(data_cols) + list(label_cols))))
+                dataset = arrow.read_dataframe(dataset, format=arrow.COLUMNAR_FILE_TYPES[file_type], **read_kwargs)
+                if sampler is not None:
+                    dataset, sampler = sampler.sample([dataset], label_cols), None
+                if _to_instancelib:
+                    return chunks_to_instancelib([dataset], data_cols=data_cols, label_cols=label_cols,
+                                                 label_map=label_map)
             else:
                 raise ImportError(f'Unable to process file type "{file_type}" with method "pandas"!')
 
-    if hasattr(dataset, 'to_pandas') and callable(dataset.to_pandas):
+    if sampler is not None and is_datasets(dataset):
+        batch_size = DATASETS_BATCH_SIZE if chunksize is None else chunksize
+        info(f'Sampling dataset in batches of {batch_size} rows.')
+        columns = list(dict.fromkeys(list(data_cols) + list(label_cols)))
+        dataset, sampler = sampler.sample(iter_datasets_frames(dataset, columns, batch_size=batch_size), label_cols,
+                                          columns=columns), None
+        if _to_instancelib:
+            return chunks_to_instancelib([dataset], data_cols=data_cols, label_cols=label_cols, label_map=label_map)
+        return dataset
+
+    if _to_instancelib and sampler is None and (is_datasets(dataset) or
+                            isinstance(dataset, dict) and dataset and all(map(is_datasets, dataset.values()))):
+        return datasets_to_instancelib(dataset, data_cols=data_cols, label_cols=label_cols, label_map=label_map,
+                                       batch_size=DATASETS_BATCH_SIZE if chunksize is None else chunksize)
+    elif hasattr(dataset, 'to_pandas') and callable(dataset.to_pandas):
         info(f'Preparing "{dataset}" for import with Pandas.'.replace('\n', ' ').replace('\t', ''))
         dataset = dataset.to_pandas()
     elif isinstance(dataset, dict):
@@ -190,8 +547,11 @@ def import_data(dataset,
                                       data_cols=data_cols,
                                       label_cols=label_cols,
                                       label_map=label_map,
+                                      sample=sampler,
                                       **read_kwargs)
 
+    if sampler is not None:
+        dataset = sampler.sample([dataset], label_cols)
     if _to_instancelib:
         return pandas_to_instancelib(dataset, data_cols=data_cols, label_cols=label_cols, label_map=label_map)
     return dataset
@@ -202,35 +562,167 @@ def import_from_key_values(iterator: Iterator[Tuple[KT, VT]],
                            label_cols: Union[KT, List[KT]],
                            label_map: Optional[Union[Callable, dict]] = None,
                            method: Method = 'infer',
+                           chunksize: Optional[int] = None,
+                           n_jobs: Optional[int] = None,
+                           executor: Union[Literal['thread', 'process'], Executor] = 'thread',
+                           sample: Optional[Union[int, float, Sampler]] = None,
                            **read_kwargs) -> Dict[KT, il.Environment]:
-    dataset = {k: import_data(v, data_cols=data_cols, label_cols=label_cols,
-                              method=method, _to_instancelib=False, **read_kwargs)
-               for k, v in iterator}
-    return pandas_to_instancelib(dataset, data_cols=data_cols, label_cols=label_cols, label_map=label_map)
+    if n_jobs is not None:
+        return import_parallel(iterator, data_cols=data_cols, label_cols=label_cols, label_map=label_map,
+                               method=method, chunksize=chunksize, n_jobs=n_jobs, executor=executor, sample=sample,
+                               **read_kwargs)
+    read_kwargs = dict(read_kwargs, sample=sample)
+    return merge_columns(((key, _import_columns(value, data_cols, label_cols, method, chunksize, get_file_type(value),
+                                                read_kwargs))
+                          for key, value in iterator), label_map=label_map)
+
+
+def _import_columns(value, data_cols, label_cols, method, chunksize, file_type, read_kwargs):
+    if isinstance(value, bytes):
+        value = BytesIO(value)
+    df = import_data(value, data_cols=data_cols, label_cols=label_cols, method=method, chunksize=chunksize,
+                     _to_instancelib=False, _file_type=file_type, **read_kwargs)
+    return extract_columns(df, data_cols, label_cols)
+
+
+def import_parallel(iterator: Iterator[Tuple[KT, VT]],
+                    data_cols: List[KT],
+                    label_cols: List[KT],
+                    label_map: Optional[Union[Callable, dict]] = None,
+                    method: Method = 'infer',
+                    chunksize: Optional[int] = None,
+                    n_jobs: int = -1,
+                    executor: Union[Literal['thread', 'process'], Executor] = 'thread',
+                    **read_kwargs) -> il.Environment:
+    """Import files in parallel into one instancelib Environment, with a named provider for each file.
+
+    Results in the same environment as importing the files one after another, as the files are merged in the order
+    of `iterator` (regardless of the order in which they finish). With a process pool, open files (e.g. members of an
+    archive) are read into memory before being parsed in another process.
+
+    Args:
+        iterator (Iterator[Tuple[KT, VT]]): Names and files (paths or file handles) to import.
+        data_cols (List[KT]): Name of columns containing data.
+        label_cols (List[KT]): Name of columns containing labels.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+        method (Method, optional): Method used to import each file. Defaults to 'infer'.
+        chunksize (Optional[int], optional): Read each file in chunks of `chunksize` rows. Defaults to None.
+        n_jobs (int, optional): Number of workers. If -1, uses the number of CPUs. Defaults to -1.
+        executor (Union[Literal['thread', 'process'], Executor], optional): Import files with a thread pool
+            ('thread'), process pool ('process') or a given `concurrent.futures.Executor`. Defaults to 'thread'.
+        **read_kwargs: Optional arguments passed to reading call.
+
+    Raises:
+        ValueError: Unknown executor.
+
+    Returns:
+        il.Environment: Environment for all files.
+    """
+    if isinstance(executor, Executor):
+        pool, shutdown = executor, False
+    elif executor in ('thread', 'process'):
+        max_workers = os.cpu_count() if n_jobs is None or n_jobs < 1 else n_jobs
+        pool = (ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor)(max_workers=max_workers)
+        shutdown = True
+    else:
+        raise ValueError(f'Unknown executor "{executor}", choose from "thread", "process" or an Executor.')
+    in_process = not isinstance(pool, ThreadPoolExecutor)
+
+    try:
+        futures = []
+        for key, value in iterator:
+            file_type = get_file_type(value)
+            if in_process and not isinstance(value, str) and hasattr(value, 'read'):
+                value = value.read()
+            futures.append((key, pool.submit(_import_columns, value, data_cols, label_cols, method, chunksize,
+                                             file_type, read_kwargs)))
+
+        return merge_columns(((key, future.result()) for key, future in futures), label_map=label_map)
+    finally:
+        if shutdown:
+            pool.shutdown(wait=True, cancel_futures=True) if sys.version_info >= (3, 9) else pool.shutdown(wait=True)
+
+
+def merge_columns(columns: Iterable[Tuple[KT, Tuple[List[KT], List[str], List[frozenset]]]],
+                  label_map: Optional[Union[Callable, dict]] = None) -> il.Environment:
+    """Merge the columns extracted from multiple datasets (see `extract_columns()`) into one instancelib Environment.
+
+    Datasets are merged in order, with identifiers `{name}_{index}` and a named provider for each dataset, same as
+    `instancelib.ingest.spreadsheet.build_from_multiple_dfs()`.
+
+    Args:
+        columns (Iterable[Tuple[KT, Tuple[List[KT], List[str], List[frozenset]]]]): Names and extracted indices,
+            texts and sets of labels of each dataset.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+
+    Returns:
+        il.Environment: Environment for all datasets.
+    """
+    indices_table, indices, texts, labels = {}, [], [], []
+    for key, (dataset_indices, dataset_texts, dataset_labels) in columns:
+        indices_table[key] = [f'{key}_{i}' for i in dataset_indices]
+        indices.extend(indices_table[key])
+        texts.extend(dataset_texts)
+        labels.extend(dataset_labels)
+
+    env = il.TextEnvironment.from_data(frozenset().union(*labels), indices, texts, labels, [])
+    for key, split_indices in indices_table.items():
+        env[key] = env.create_bucket(split_indices)
+    return _apply_label_map(env, label_map=label_map)
 
 
 def train_test_split(environment: il.Environment,
                      train_size: Union[int, float],
                      train_name: str = 'train',
-                     test_name: str = 'test') -> il.Environment:
+                     test_name: str = 'test',
+                     stratify: bool = False,
+                     seed: Optional[int] = None) -> il.Environment:
     """Split an environment into training and test data, and save it to the original environment.
 
+    Example:
+        Stratified split, keeping the label distribution of the training and test data equal:
+
+        >>> from genbase.data import train_test_split
+        >>> environment = train_test_split(environment, train_size=0.8, stratify=True, seed=42)
+
     Args:
         environment (instancelib.Environment): Environment containing all data (`environment.dataset`), 
             including labels (`environment.labels`).
         train_size (Union[int, float]): Size of training data, as a proportion [0, 1] or number of instances > 1.
         train_name (str, optional): Name of train split. Defaults to 'train'.
         test_name (str, optional): Name of train split. Defaults to 'test'.
+        stratify (bool, optional): Whether to keep the label distribution equal across splits. Defaults to False.
+        seed (Optional[int], optional): Seed for reproducibility. If given or when stratifying, splits with
+            `genbase.data.split.Splitter`, otherwise with `environment.train_test_split()`. Defaults to None.
 
     Returns:
         instancelib.Environment: Environment with named splits `train_name` (containing training data) and `test_name`
             (containing test data) 
     """
+    if stratify or seed is not None:
+        splitter = Splitter(environment, stratify=stratify, seed=seed)
+        environment[train_name], environment[test_name] = splitter.train_test_split(train_size=train_size)
+        return environment
     environment[train_name], environment[test_name] = environment.train_test_split(environment.dataset,
                                                                                    train_size=train_size)
     return environment
 
 
+def _rename_memory_labels(provider: il.MemoryLabelProvider, mapping: dict) -> il.MemoryLabelProvider:
+    """Equal to `il.MemoryLabelProvider.rename_labels(provider, mapping)`, renaming the inverse label dictionary per
+    label instead of per instance."""
+    rename = mapping.__getitem__
+    labelset = frozenset(map(rename, provider.labelset))
+    labeldict = {key: set(map(rename, labels)) for key, labels in provider._labeldict.items()}
+
+    # The keys of a renamed label are the keys of all labels renamed to it
+    labeldict_inv = {label: set() for label in labelset}
+    for label, keys in provider._labeldict_inv.items():
+        if keys:
+            labeldict_inv[rename(label)].update(keys)
+    return il.MemoryLabelProvider(labelset, labeldict, labeldict_inv)
+
+
 def rename_labels(provider: Union[il.Environment, il.LabelProvider],
                   mapping: Union[Callable, dict]) -> Union[il.Environment, il.LabelProvider]:
     """Rename labels in a labelprovider or environment.
@@ -244,7 +736,10 @@ def rename_labels(provider: Union[il.Environment, il.LabelProvider],
     """
     is_environment = isinstance(provider, il.Environment)
     _provider = provider.labels if is_environment else provider
-    _provider = il.MemoryLabelProvider.rename_labels(_provider, mapping)
+    if isinstance(mapping, dict) and isinstance(_provider, il.MemoryLabelProvider):
+        _provider = _rename_memory_labels(_provider, mapping)
+    else:
+        _provider = il.MemoryLabelProvider.rename_labels(_provider, mapping)
     if is_environment:
         provider._labelprovider = _provider
     else:
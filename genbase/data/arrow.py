@@ -0,0 +1,235 @@
+"""Columnar (Apache Arrow IPC/Feather and Parquet) export and import of `instancelib` environments.
+
+An environment is stored as a table with one row per instance of its dataset, with columns `identifier`, `data`,
+`labels` (list of labels) and `providers` (list of names of the named providers the instance is in). The labelset and
+names of the named providers are stored in the schema metadata (key `genbase`), so files written by
+`write_environment()` are recognized by `import_data()` and read back without going through pandas.
+"""
+
+import json
+from collections import defaultdict
+from typing import Any, Callable, List, Literal, Optional, Union
+
+import instancelib as il
+import pandas as pd
+
+from ..utils import get_file_type, package_available
+
+ColumnarFormat = Literal['infer', 'arrow', 'feather', 'parquet']
+
+COLUMNAR_FORMATS = ['infer', 'arrow', 'feather', 'parquet']
+COLUMNAR_FILE_TYPES = {'.arrow': 'arrow', '.ipc': 'arrow', '.feather': 'feather', '.parquet': 'parquet'}
+METADATA_KEY = b'genbase'
+
+
+def _require_pyarrow() -> None:
+    if not package_available('pyarrow'):
+        raise ImportError('To read and write Arrow/Parquet files install `pyarrow`!')
+
+
+def _infer_format(path: str, format: ColumnarFormat) -> str:
+    if format not in COLUMNAR_FORMATS:
+        raise ValueError(f'Unknown format "{format}", choose from {COLUMNAR_FORMATS}.')
+    if format == 'infer':
+        file_type = get_file_type(path)
+        if file_type not in COLUMNAR_FILE_TYPES:
+            raise ValueError(f'Unable to infer columnar format of "{path}", choose from {list(COLUMNAR_FILE_TYPES)}.')
+        return COLUMNAR_FILE_TYPES[file_type]
+    return format
+
+
+def environment_to_table(environment: il.Environment):
+    """Convert an environment into an Arrow table, with one row per instance in `environment.dataset`.
+
+    Args:
+        environment (il.Environment): Environment to convert.
+
+    Returns:
+        pyarrow.Table: Table with columns `identifier`, `data`, `labels` and `providers`.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+
+    membership = defaultdict(list)
+    named_providers = environment.named_providers if isinstance(environment.named_providers, dict) else {}
+    for name, provider in named_providers.items():
+        for key in provider:
+            membership[key].append(name)
+
+    keys, data = [], []
+    for key, instance in environment.dataset.items():
+        keys.append(key)
+        data.append(instance.data)
+    labels = environment.labels
+    table = pa.table({'identifier': keys if all(isinstance(key, int) for key in keys) else [str(key) for key in keys],
+                      'data': data,
+                      'labels': pa.array([sorted(map(str, labels.get_labels(key))) for key in keys],
+                                         type=pa.list_(pa.string())),
+                      'providers': pa.array([membership.get(key, []) for key in keys], type=pa.list_(pa.string()))})
+    metadata = {'type': 'environment',
+                'labelset': sorted(map(str, labels.labelset)),
+                'named_providers': [str(name) for name in named_providers]}
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+
+
+def table_to_environment(table, label_map: Optional[Union[Callable, dict]] = None) -> il.Environment:
+    """Convert an Arrow table written by `environment_to_table()` back into an environment.
+
+    Args:
+        table (pyarrow.Table): Table with columns `identifier`, `data`, `labels` and `providers`.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+
+    Returns:
+        il.Environment: Environment with the dataset, labels and named providers.
+    """
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    identifiers = table.column('identifier').to_pylist()
+    labels = [frozenset(labels) for labels in table.column('labels').to_pylist()]
+    labelset = metadata.get('labelset', frozenset().union(*labels))
+    environment = il.TextEnvironment.from_data(labelset, identifiers, table.column('data').to_pylist(), labels, [])
+
+    providers = {name: [] for name in metadata.get('named_providers', [])}
+    for key, names in zip(identifiers, table.column('providers').to_pylist()):
+        for name in names:
+            providers.setdefault(name, []).append(key)
+    for name, keys in providers.items():
+        environment[name] = environment.create_bucket(keys)
+
+    from . import _apply_label_map
+    return _apply_label_map(environment, label_map)
+
+
+def write_environment(environment: il.Environment, path: str, format: ColumnarFormat = 'infer', **write_kwargs) -> None:
+    """Write an environment to a columnar file, to be read with `read_environment()` or `import_data()`.
+
+    Example:
+        >>> from genbase.data.arrow import write_environment
+        >>> write_environment(environment, 'environment.parquet')
+
+    Args:
+        environment (il.Environment): Environment to write.
+        path (str): Path to write to.
+        format (ColumnarFormat, optional): File format ('arrow' for Arrow IPC, 'feather' or 'parquet'). If 'infer',
+            infers it from the extension of `path` ('.arrow', '.ipc', '.feather' or '.parquet'). Defaults to 'infer'.
+        **write_kwargs: Optional arguments passed to `pyarrow.parquet.write_table()`/`pyarrow.feather.write_feather()`
+            (e.g. `compression`).
+    """
+    format = _infer_format(path, format)
+    table = environment_to_table(environment)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, **write_kwargs)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, **write_kwargs)
+
+
+def read_table(path: str, format: ColumnarFormat = 'infer', **read_kwargs):
+    """Read a columnar file as Arrow table.
+
+    Args:
+        path (str): Path to read from.
+        format (ColumnarFormat, optional): File format ('arrow', 'feather' or 'parquet'). Defaults to 'infer'.
+        **read_kwargs: Optional arguments passed to `pyarrow.parquet.read_table()`/`pyarrow.feather.read_table()`.
+
+    Returns:
+        pyarrow.Table: Table.
+    """
+    _require_pyarrow()
+    format = _infer_format(path, format)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, **read_kwargs)
+    import pyarrow.feather as feather
+    return feather.read_table(path, **read_kwargs)
+
+
+def _filter_expression(filters):
+    if filters is None or not isinstance(filters, (list, tuple)):
+        return filters
+    import pyarrow.parquet as pq
+    to_expression = getattr(pq, 'filters_to_expression', None) or getattr(pq, '_filters_to_expression')
+    return to_expression(filters)
+
+
+def read_dataframe(source: Any,
+                   columns: Optional[List[str]] = None,
+                   filters: Optional[Any] = None,
+                   format: ColumnarFormat = 'parquet',
+                   **read_kwargs) -> pd.DataFrame:
+    """Read only `columns` and the rows matching `filters` of a columnar file into a DataFrame.
+
+    For Parquet files, row groups that do not match `filters` (according to their statistics) are skipped entirely.
+    Arrow IPC/Feather files have no row group statistics, so their rows are filtered while reading the columns.
+
+    Example:
+        >>> from genbase.data.arrow import read_dataframe
+        >>> df = read_dataframe('lake.parquet', columns=['text', 'label'], filters=[('year', '>=', 2020)])
+
+    Args:
+        source (Any): Path or file handle to read from.
+        columns (Optional[List[str]], optional): Columns to read. If None, reads all columns. Defaults to None.
+        filters (Optional[Any], optional): Rows to read, as `pyarrow.compute.Expression` or in disjunctive normal form
+            (e.g. `[('year', '>=', 2020), ('lang', 'in', ['en', 'nl'])]`, see `pyarrow.parquet.read_table()`). Filtered
+            columns do not need to be in `columns`. If None, reads all rows. Defaults to None.
+        format (ColumnarFormat, optional): File format ('arrow', 'feather' or 'parquet'). Defaults to 'parquet'.
+        **read_kwargs: Optional arguments passed to `pyarrow.parquet.read_table()`/`pyarrow.feather.read_table()`.
+
+    Returns:
+        pd.DataFrame: Selected columns and rows.
+    """
+    _require_pyarrow()
+    if format == 'infer':
+        format = _infer_format(source, format)
+    filters = _filter_expression(filters)
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(source, columns=columns, filters=filters, **read_kwargs).to_pandas()
+
+    import pyarrow.feather as feather
+    if filters is None:
+        return feather.read_table(source, columns=columns, **read_kwargs).to_pandas()
+    if isinstance(source, str):
+        import pyarrow.dataset as ds
+        return ds.dataset(source, format='ipc').to_table(columns=columns, filter=filters).to_pandas()
+    table = feather.read_table(source, **read_kwargs).filter(filters)
+    return (table if columns is None else table.select(columns)).to_pandas()
+
+
+def is_environment_file(path: Any) -> bool:
+    """Whether `path` is a columnar file written by `write_environment()`, by reading only its schema."""
+    if not isinstance(path, str) or get_file_type(path) not in COLUMNAR_FILE_TYPES or not package_available('pyarrow'):
+        return False
+    try:
+        if COLUMNAR_FILE_TYPES[get_file_type(path)] == 'parquet':
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(path)
+        else:
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                schema = pa.ipc.open_file(source).schema
+    except (OSError, ValueError):
+        return False
+    return METADATA_KEY in (schema.metadata or {})
+
+
+def read_environment(path: str,
+                     format: ColumnarFormat = 'infer',
+                     label_map: Optional[Union[Callable, dict]] = None,
+                     **read_kwargs) -> il.Environment:
+    """Read an environment written by `write_environment()`.
+
+    Example:
+        >>> from genbase.data.arrow import read_environment
+        >>> environment = read_environment('environment.parquet')
+
+    Args:
+        path (str): Path to read from.
+        format (ColumnarFormat, optional): File format ('arrow', 'feather' or 'parquet'). Defaults to 'infer'.
+        label_map (Optional[Union[Callable, dict]], optional): Label renaming dictionary/function. Defaults to None.
+        **read_kwargs: Optional arguments passed to `pyarrow.parquet.read_table()`/`pyarrow.feather.read_table()`.
+
+    Returns:
+        il.Environment: Environment with the dataset, labels and named providers.
+    """
+    return table_to_environment(read_table(path, format=format, **read_kwargs), label_map=label_map)
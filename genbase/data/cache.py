@@ -0,0 +1,242 @@
+"""Persistent (on-disk) cache of environments parsed by `import_data()`.
+
+Each entry is an environment stored as pickled columns (identifiers, data, labels and named providers), keyed on the
+source file(s) and all arguments that change the result (`data_cols`, `label_cols`, `label_map`, `method` and
+`read_kwargs`). A source is identified by its content hash (`key='hash'`) or by its path, modification time and size
+(`key='stat'`, the default). Least recently used entries are evicted once the cache grows beyond `max_size` bytes.
+"""
+
+import glob
+import hashlib
+import os
+import pickle  # nosec
+import tempfile
+import types
+from typing import Any, Callable, List, Literal, Optional, Set, Union
+
+import instancelib as il
+
+from ..utils import info
+
+CacheKey = Literal['stat', 'hash']
+
+CACHE_KEYS = ['stat', 'hash']
+EXTENSION = '.pkl'
+MAX_SIZE = 1024 ** 3
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+
+def _file_hash(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Unfingerprintable(Exception):
+    """A value cannot be fingerprinted reliably, so results depending on it are not cached."""
+
+
+def _code_id(code: types.CodeType) -> Any:
+    return (code.co_code, code.co_names,
+            tuple(_code_id(const) if isinstance(const, types.CodeType) else const for const in code.co_consts))
+
+
+def _global_names(code: types.CodeType) -> Set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _value_id(value: Any, seen: Set[int]) -> Any:
+    if isinstance(value, types.ModuleType):
+        return 'module', value.__name__
+    elif isinstance(value, types.FunctionType):
+        return _function_id(value, seen)
+    try:
+        return hashlib.sha256(pickle.dumps(value, protocol=4)).hexdigest()
+    except Exception as e:
+        raise _Unfingerprintable(f'Unable to fingerprint {type(value).__qualname__}') from e
+
+
+def _function_id(function: types.FunctionType, seen: Set[int]) -> Any:
+    """Code, closure cells, defaults and referenced globals of `function` (recursively for functions among them)."""
+    if id(function) in seen:
+        return 'recursion', function.__qualname__
+    seen.add(id(function))
+    code = function.__code__
+    cells = []
+    for cell in function.__closure__ or ():
+        try:
+            cells.append(_value_id(cell.cell_contents, seen))
+        except ValueError:  # empty cell
+            cells.append(None)
+    referenced = sorted(name for name in _global_names(code) if name in function.__globals__)
+    return (function.__module__, function.__qualname__, _code_id(code), cells,
+            _value_id(function.__defaults__, seen), _value_id(function.__kwdefaults__, seen),
+            [(name, _value_id(function.__globals__[name], seen)) for name in referenced])
+
+
+def _label_map_id(label_map: Optional[Union[Callable, dict]]) -> Any:
+    """Identifier of `label_map` for cache keys.
+
+    Raises:
+        _Unfingerprintable: `label_map` (or a value it depends on) cannot be fingerprinted reliably.
+    """
+    if label_map is None or isinstance(label_map, dict):
+        return sorted(label_map.items(), key=repr) if label_map else None
+    return _value_id(label_map, set())
+
+
+def source_files(dataset: Any) -> Optional[List[str]]:
+    """Local files read by `import_data(dataset)`, or None if `dataset` is not a local path or glob.
+
+    Args:
+        dataset (Any): Dataset to import.
+
+    Returns:
+        Optional[List[str]]: Sorted absolute paths.
+    """
+    if not isinstance(dataset, str):
+        return None
+    if '*' in dataset:
+        files = sorted(os.path.abspath(file) for file in glob.glob(dataset))
+        return files or None
+    return [os.path.abspath(dataset)] if os.path.isfile(dataset) else None
+
+
+class ParseCache:
+    def __init__(self, directory: str, max_size: int = MAX_SIZE, key: CacheKey = 'stat'):
+        """On-disk cache of environments parsed by `import_data()`.
+
+        Example:
+            >>> from genbase import import_data
+            >>> from genbase.data.cache import ParseCache
+            >>> cache = ParseCache('.genbase_cache', max_size=2 * 1024 ** 3)
+            >>> ds = import_data('train.csv', data_cols='text', label_cols='category', cache=cache)
+            >>> cache.invalidate('train.csv')
+
+        Args:
+            directory (str): Directory to store entries in, created if it does not exist.
+            max_size (int, optional): Maximum total size of the entries (in bytes), evicting the least recently used
+                entries when exceeded. Defaults to `MAX_SIZE` (1 GiB).
+            key (CacheKey, optional): Identify source files by path, modification time and size ('stat') or by
+                the hash of their content ('hash'). Defaults to 'stat'.
+
+        Raises:
+            ValueError: Unknown key.
+        """
+        if key not in CACHE_KEYS:
+            raise ValueError(f'Unknown key "{key}", choose from {CACHE_KEYS}.')
+        self.directory = directory
+        self.max_size = max_size
+        self.key = key
+        os.makedirs(directory, exist_ok=True)
+
+    def _fingerprint(self, file: str) -> Any:
+        if self.key == 'hash':
+            return _file_hash(file)
+        stat = os.stat(file)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def entry_key(self, dataset: Any, data_cols: List[Any], label_cols: List[Any],
+                  label_map: Optional[Union[Callable, dict]] = None, method: str = 'infer',
+                  **read_kwargs) -> Optional[str]:
+        """Key of the entry for importing `dataset` with the given arguments.
+
+        Returns:
+            Optional[str]: Key, or None if `dataset` is not cacheable (not a local file or glob, or a `label_map` that
+                cannot be fingerprinted).
+        """
+        files = source_files(dataset)
+        if files is None:
+            return None
+        try:
+            label_map_id = _label_map_id(label_map)
+        except _Unfingerprintable as e:
+            info(f'Not caching "{dataset}": {e}.')
+            return None
+        arguments = (list(data_cols), list(label_cols), label_map_id, method,
+                     sorted(read_kwargs.items(), key=repr), [(file, self._fingerprint(file)) for file in files])
+        return f'{_digest(os.path.abspath(dataset))[:16]}-{_digest(arguments)}'
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def get(self, key: Optional[str]) -> Optional[il.Environment]:
+        """Load the environment stored under `key`, or None if there is no such entry."""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                columns = pickle.load(f)  # nosec
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)
+        info(f'Loaded "{path}" from cache.')
+        return _columns_to_environment(columns)
+
+    def put(self, key: Optional[str], environment: il.Environment) -> None:
+        """Store `environment` under `key` and evict least recently used entries beyond `max_size`."""
+        if key is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(_environment_to_columns(environment), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def entries(self) -> List[str]:
+        """Paths of all entries, from least to most recently used."""
+        paths = glob.glob(os.path.join(self.directory, '*' + EXTENSION))
+        return sorted(paths, key=os.path.getmtime)
+
+    @property
+    def size(self) -> int:
+        """Total size of all entries (in bytes)."""
+        return sum(os.path.getsize(path) for path in self.entries())
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """Remove least recently used entries until their total size is at most `max_size` (or `self.max_size`)."""
+        max_size = self.max_size if max_size is None else max_size
+        entries = self.entries()
+        size = sum(os.path.getsize(path) for path in entries)
+        for path in entries:
+            if size <= max_size:
+                break
+            size -= os.path.getsize(path)
+            os.remove(path)
+
+    def invalidate(self, dataset: Optional[str] = None) -> None:
+        """Remove the entries of `dataset` (path or glob, as passed to `import_data()`), or all entries if None."""
+        prefix = '' if dataset is None else f'{_digest(os.path.abspath(dataset))[:16]}-'
+        for path in glob.glob(os.path.join(self.directory, prefix + '*' + EXTENSION)):
+            os.remove(path)
+
+
+def _environment_to_columns(environment: il.Environment) -> dict:
+    keys, data = [], []
+    for key, instance in environment.dataset.items():
+        keys.append(key)
+        data.append(instance.data)
+    named_providers = environment.named_providers if isinstance(environment.named_providers, dict) else {}
+    return {'identifiers': keys,
+            'data': data,
+            'labels': [environment.labels.get_labels(key) for key in keys],
+            'labelset': frozenset(environment.labels.labelset),
+            'named_providers': {name: list(provider) for name, provider in named_providers.items()}}
+
+
+def _columns_to_environment(columns: dict) -> il.Environment:
+    environment = il.TextEnvironment.from_data(columns['labelset'], columns['identifiers'], columns['data'],
+                                               columns['labels'], [])
+    for name, keys in columns['named_providers'].items():
+        environment[name] = environment.create_bucket(keys)
+    return environment
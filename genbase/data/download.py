@@ -0,0 +1,160 @@
+"""Cached downloads of datasets from URLs, before they are read with `import_data()`.
+
+Each URL is downloaded once to a cache directory, next to a small JSON file with its `ETag` and `Last-Modified`
+headers. Later downloads revalidate the file with a conditional request (`If-None-Match`/`If-Modified-Since`), and only
+download it again if it changed. Interrupted downloads are kept as `.part` files and resumed with a ranged request
+(`Range` with `If-Range`), falling back to a full download when the server does not support ranges or the file changed.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+from ..utils import info
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'genbase', 'downloads')
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_url(value) -> bool:
+    """Whether `value` is an HTTP(S) URL."""
+    return isinstance(value, str) and value.lower().startswith(('http://', 'https://'))
+
+
+class Downloader:
+    def __init__(self,
+                 directory: str = DEFAULT_DIRECTORY,
+                 revalidate: bool = True,
+                 timeout: float = 30.0,
+                 max_workers: int = 4,
+                 chunk_size: int = CHUNK_SIZE):
+        """Download URLs to a local cache directory.
+
+        Example:
+            >>> from genbase import import_data
+            >>> from genbase.data.download import Downloader
+            >>> downloader = Downloader('.genbase_downloads')
+            >>> ds = import_data('https://storage.googleapis.com/dataset-uploader/bbc/bbc-text.csv',
+            ...                  data_cols='text', label_cols='category', download=downloader)
+
+        Args:
+            directory (str, optional): Cache directory, created if it does not exist. Defaults to `DEFAULT_DIRECTORY`
+                (`~/.cache/genbase/downloads`).
+            revalidate (bool, optional): Whether to check with the server if a cached file is still up to date. If
+                False, cached files are used as-is. Defaults to True.
+            timeout (float, optional): Timeout of connecting and reading (in seconds). Defaults to 30.0.
+            max_workers (int, optional): Maximum number of concurrent downloads in `fetch_many()`. Defaults to 4.
+            chunk_size (int, optional): Number of bytes to write at a time. Defaults to `CHUNK_SIZE`.
+        """
+        self.directory = directory
+        self.revalidate = revalidate
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url: str) -> str:
+        """Path of the cached file of `url`, keeping the file name (and thereby file type) of the URL."""
+        name = os.path.basename(unquote(urlparse(url).path)) or 'index'
+        return os.path.join(self.directory, f'{hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]}-{name}')
+
+    @staticmethod
+    def _read_meta(path: str) -> Dict[str, str]:
+        try:
+            with open(path + '.json', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict[str, str]) -> None:
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def _validators(response) -> Dict[str, str]:
+        return {key: response.headers[header] for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'))
+                if header in response.headers}
+
+    def fetch(self, url: str) -> str:
+        """Download `url` if it is not cached or changed, and return the path of the cached file.
+
+        Args:
+            url (str): URL to download.
+
+        Raises:
+            requests.HTTPError: Unsuccessful response.
+
+        Returns:
+            str: Path of the cached file.
+        """
+        import requests
+
+        path = self.path(url)
+        part = path + '.part'
+        meta = self._read_meta(path)
+        headers = {}
+
+        if os.path.exists(path) and not os.path.exists(part):
+            if not self.revalidate:
+                return path
+            if 'etag' in meta:
+                headers['If-None-Match'] = meta['etag']
+            if 'last_modified' in meta:
+                headers['If-Modified-Since'] = meta['last_modified']
+        elif os.path.exists(part) and (meta.get('etag') or meta.get('last_modified')):
+            headers['Range'] = f'bytes={os.path.getsize(part)}-'
+            headers['If-Range'] = meta.get('etag') or meta['last_modified']
+
+        with requests.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304:
+                info(f'Using cached "{path}" for "{url}".')
+                return path
+            if response.status_code == 416:  # partial download is already complete, or larger than the file
+                os.remove(part)
+                return self.fetch(url)
+            response.raise_for_status()
+
+            resume = response.status_code == 206
+            if not resume:
+                meta = {'url': url, **self._validators(response)}
+                # Write validators first, so an interrupted download can be resumed
+                self._write_meta(path, meta)
+            info(f'{"Resuming" if resume else "Downloading"} "{url}" to "{path}".')
+            with open(part, 'ab' if resume else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+        os.replace(part, path)
+        return path
+
+    def fetch_many(self, urls: Sequence[str]) -> List[str]:
+        """Download multiple URLs concurrently (see `fetch()`).
+
+        Args:
+            urls (Sequence[str]): URLs to download.
+
+        Returns:
+            List[str]: Paths of the cached files, in order of `urls`.
+        """
+        unique = list(dict.fromkeys(urls))
+        if len(unique) <= 1:
+            paths = [self.fetch(url) for url in unique]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as pool:
+                paths = list(pool.map(self.fetch, unique))
+        paths = dict(zip(unique, paths))
+        return [paths[url] for url in urls]
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Remove the cached file of `url` (including partial downloads), or all cached files if None."""
+        if url is None:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        else:
+            path = self.path(url)
+            paths = [path, path + '.part', path + '.json']
+        for path in paths:
+            if os.path.isfile(path):
+                os.remove(path)
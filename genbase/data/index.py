@@ -0,0 +1,217 @@
+"""Content-hash index of `instancelib` environments, for looking up instances by their data and deduplicating them.
+
+The data of all instances is hashed at once with `pandas.util.hash_array()`, after which instances with equal data are
+found by their hash instead of comparing against every instance. Candidates are compared on their data, so hash
+collisions never result in wrong matches. The index of an environment is built once (e.g. while importing with
+`import_data(..., index=True)`) and reused until instances are added to or removed from its dataset, which the index
+notices through the size of the provider and a checksum of its identifiers. Replacing an instance under the same
+identifier or changing its data in place is not noticed, call `ContentIndex.refresh()` afterwards.
+"""
+
+import weakref
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+
+import instancelib as il
+import numpy as np
+import pandas as pd
+from instancelib.instances.memory import MemoryBucketProvider
+from instancelib.typehints import KT
+
+_INDEXES: Dict[int, 'ContentIndex'] = {}
+
+
+def hash_data(data: Sequence[Any]) -> np.ndarray:
+    """Hash a sequence of data (e.g. texts) at once.
+
+    Args:
+        data (Sequence[Any]): Data to hash.
+
+    Returns:
+        np.ndarray: 64-bit hash of each element.
+    """
+    values = np.empty(len(data), dtype=object)
+    values[:] = [value if isinstance(value, (str, bytes)) else str(value) for value in data]
+    return pd.util.hash_array(values, categorize=False)
+
+
+def _equal(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return a == b
+
+
+class ContentIndex:
+    def __init__(self, provider: il.InstanceProvider, keys: Optional[List[KT]] = None, data: Optional[List] = None):
+        """Index from the content hash of instances to their identifiers.
+
+        Example:
+            >>> from genbase.data.index import ContentIndex
+            >>> index = ContentIndex(environment.dataset)
+            >>> index.lookup('This is a perturbed text.')
+            [12]
+
+        Args:
+            provider (il.InstanceProvider): Provider containing the instances.
+            keys (Optional[List[KT]], optional): Identifiers of all instances in `provider`, in order of `data`. If
+                None, reads them from `provider`. Defaults to None.
+            data (Optional[List], optional): Data of all instances in `provider`. Defaults to None.
+        """
+        self.provider = provider
+        self._build(keys, data)
+
+    def _build(self, keys: Optional[List[KT]] = None, data: Optional[List] = None) -> None:
+        if keys is None or data is None:
+            keys, data = [], []
+            for key, instance in self.provider.items():
+                keys.append(key)
+                data.append(instance.data)
+
+        hashes = hash_data(data)
+        order = np.argsort(hashes, kind='stable')
+        unique, starts = np.unique(hashes[order], return_index=True)
+        sorted_keys = [keys[i] for i in order.tolist()]
+        bounds = starts.tolist()[1:] + [len(sorted_keys)]
+        self._keys: Dict[int, List[KT]] = {h: sorted_keys[start:end]
+                                           for h, start, end in zip(unique.tolist(), starts.tolist(), bounds)}
+        self._size = len(keys)
+        self._checksum = self._key_checksum()
+
+    def _key_checksum(self) -> int:
+        return hash(tuple(self.provider.keys()))
+
+    def __len__(self) -> int:
+        self._check()
+        return self._size
+
+    def __contains__(self, data: Any) -> bool:
+        return bool(self.lookup(data))
+
+    @property
+    def stale(self) -> bool:
+        """Whether instances were added to or removed from the provider since the index was built."""
+        return len(self.provider) != self._size or self._key_checksum() != self._checksum
+
+    def refresh(self) -> None:
+        """Rebuild the index from the current instances of the provider (e.g. after replacing or changing them)."""
+        self._build()
+
+    def _check(self) -> None:
+        if self.stale:
+            self.refresh()
+
+    def _matches(self, digest: int, data: Any) -> List[KT]:
+        return [key for key in self._keys.get(digest, []) if _equal(self.provider[key].data, data)]
+
+    def lookup(self, data: Any) -> List[KT]:
+        """Identifiers of the instances with data equal to `data`.
+
+        Args:
+            data (Any): Data to look up.
+
+        Returns:
+            List[KT]: Identifiers, in order of the provider.
+        """
+        self._check()
+        return self._matches(int(hash_data([data])[0]), data)
+
+    def lookup_many(self, data: Iterable[Any]) -> List[List[KT]]:
+        """Identifiers of the instances with equal data for each element of `data`, hashing all elements at once."""
+        self._check()
+        data = list(data)
+        return [self._matches(h, d) for h, d in zip(hash_data(data).tolist(), data)]
+
+    def duplicates(self) -> List[List[KT]]:
+        """Groups of identifiers of instances with equal data, for each group of more than one instance."""
+        self._check()
+        groups = []
+        for keys in self._keys.values():
+            if len(keys) > 1:
+                # Data with equal hashes is grouped by equality, as it may be unhashable (e.g. lists)
+                by_data: List[Tuple[Any, List[KT]]] = []
+                for key in keys:
+                    data = self.provider[key].data
+                    group = next((group for value, group in by_data if _equal(value, data)), None)
+                    if group is None:
+                        by_data.append((data, [key]))
+                    else:
+                        group.append(key)
+                groups.extend(group for _, group in by_data if len(group) > 1)
+        return groups
+
+    def deduplicate(self, keep: Literal['first', 'last'] = 'first') -> il.InstanceProvider:
+        """Bucket with one instance for each distinct data.
+
+        Args:
+            keep (Literal['first', 'last'], optional): Keep the first or last instance of duplicates, in order of
+                the provider. Defaults to 'first'.
+
+        Raises:
+            ValueError: Unknown value for `keep`.
+
+        Returns:
+            il.InstanceProvider: Deduplicated instances, sharing the instances of the provider.
+        """
+        if keep not in ('first', 'last'):
+            raise ValueError(f'Unknown keep "{keep}", choose from "first" or "last".')
+        drop = {key for group in self.duplicates() for key in (group[1:] if keep == 'first' else group[:-1])}
+        dataset = getattr(self.provider, 'dataset', self.provider)
+        return MemoryBucketProvider(dataset, [key for key in self.provider.key_list if key not in drop])
+
+
+def register_index(environment: il.Environment, index: ContentIndex) -> ContentIndex:
+    """Register `index` as the content index of `environment`, for as long as the environment exists."""
+    if id(environment) not in _INDEXES:
+        weakref.finalize(environment, _INDEXES.pop, id(environment), None)
+    _INDEXES[id(environment)] = index
+    return index
+
+
+def content_index(environment: il.Environment) -> ContentIndex:
+    """Content index of `environment.dataset`, built on first use and rebuilt when instances are added or removed.
+
+    Args:
+        environment (il.Environment): Environment.
+
+    Returns:
+        ContentIndex: Index.
+    """
+    index = _INDEXES.get(id(environment))
+    dataset = environment.dataset
+    if index is None or index.provider is not dataset:
+        index = register_index(environment, ContentIndex(dataset))
+    return index
+
+
+def lookup(environment: il.Environment, data: Any) -> List[KT]:
+    """Identifiers of the instances in `environment.dataset` with data equal to `data`.
+
+    Example:
+        >>> from genbase.data import lookup
+        >>> lookup(environment, 'This is a perturbed text.')
+        [12]
+
+    Args:
+        environment (il.Environment): Environment.
+        data (Any): Data to look up.
+
+    Returns:
+        List[KT]: Identifiers.
+    """
+    return content_index(environment).lookup(data)
+
+
+def deduplicate(environment: il.Environment, keep: Literal['first', 'last'] = 'first') -> il.InstanceProvider:
+    """Instances in `environment.dataset` with distinct data.
+
+    Example:
+        >>> from genbase.data import deduplicate
+        >>> environment['unique'] = deduplicate(environment)
+
+    Args:
+        environment (il.Environment): Environment.
+        keep (Literal['first', 'last'], optional): Keep the first or last of duplicate instances. Defaults to 'first'.
+
+    Returns:
+        il.InstanceProvider: Bucket of the environment with the deduplicated instances.
+    """
+    return content_index(environment).deduplicate(keep=keep)
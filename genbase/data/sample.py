@@ -0,0 +1,136 @@
+"""Seeded sampling of rows while importing data, one chunk at a time.
+
+Each row gets a pseudo-random priority in [0, 1) from a hash of the seed and its position in the dataset, so samples
+are deterministic and independent of how the dataset is chunked. Fractions keep the rows with a priority below the
+fraction, while caps (`n` overall or `per_label` per combination of label values) keep the rows with the lowest
+priorities in a bounded reservoir, which is a uniform random sample without replacement.
+"""
+
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..mixin import SeedMixin
+
+PRIORITY = '__genbase_priority__'
+POSITION = '__genbase_position__'
+
+_MASK = (1 << 64) - 1
+
+
+def priorities(positions: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Pseudo-random numbers in [0, 1) for row `positions`, with the SplitMix64 finalizer.
+
+    Args:
+        positions (np.ndarray): Positions of the rows in the dataset.
+        seed (int, optional): Seed. Defaults to 0.
+
+    Returns:
+        np.ndarray: Priority of each row.
+    """
+    z = positions.astype(np.uint64) + np.uint64(((seed + 1) * 0x9E3779B97F4A7C15) & _MASK)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class Sampler(SeedMixin):
+    def __init__(self,
+                 n: Optional[int] = None,
+                 frac: Optional[float] = None,
+                 per_label: Optional[int] = None,
+                 seed: int = 0):
+        """Sample rows of a dataset while it is being read, keeping at most the sample in memory.
+
+        Options are applied in order: first `frac`, then `per_label` and finally `n`.
+
+        Example:
+            Import a 1% sample of a large file, with at most 1000 instances per label:
+
+            >>> from genbase import import_data
+            >>> from genbase.data.sample import Sampler
+            >>> ds = import_data('large.csv', data_cols='text', label_cols='category',
+            ...                  sample=Sampler(frac=0.01, per_label=1000, seed=42))
+
+        Args:
+            n (Optional[int], optional): Maximum size of the sample (reservoir sampling). Defaults to None.
+            frac (Optional[float], optional): Fraction [0, 1] of rows to sample. Defaults to None.
+            per_label (Optional[int], optional): Maximum number of rows per combination of values in the label
+                columns (stratified sampling). Defaults to None.
+            seed (int, optional): Seed for reproducibility. Defaults to 0.
+
+        Raises:
+            ValueError: Invalid sample size or fraction.
+        """
+        if n is not None and n < 0 or per_label is not None and per_label < 0:
+            raise ValueError('Sample size should be non-negative.')
+        if frac is not None and not 0 <= frac <= 1:
+            raise ValueError(f'Sample fraction {frac} should be between 0 and 1.')
+        self.n = n
+        self.frac = frac
+        self.per_label = per_label
+        self.set_seed(seed)
+
+    @classmethod
+    def from_value(cls, sample: Union[int, float, 'Sampler']) -> 'Sampler':
+        """Sampler of `n=sample` (int), `frac=sample` (float) or `sample` itself."""
+        if isinstance(sample, Sampler):
+            return sample
+        elif isinstance(sample, float):
+            return cls(frac=sample)
+        return cls(n=int(sample))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(n={self.n}, frac={self.frac}, per_label={self.per_label}, seed={self._seed})'
+
+    def _reduce(self, reservoir: pd.DataFrame, label_cols: List) -> pd.DataFrame:
+        if self.per_label is not None:
+            reservoir = reservoir.sort_values(PRIORITY, kind='stable') \
+                .groupby(list(label_cols), dropna=False, sort=False).head(self.per_label)
+        if self.n is not None and len(reservoir) > self.n:
+            reservoir = reservoir.nsmallest(self.n, PRIORITY, keep='first')
+        return reservoir
+
+    def sample(self,
+               chunks: Iterable[pd.DataFrame],
+               label_cols: Optional[List] = None,
+               columns: Optional[List] = None) -> pd.DataFrame:
+        """Sample rows from consecutive chunks of a dataset.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Chunks of the dataset.
+            label_cols (Optional[List], optional): Label columns to stratify on, required for `per_label`.
+                Defaults to None.
+            columns (Optional[List], optional): Columns of the dataset, for the (empty) sample of a dataset without
+                chunks. Defaults to None.
+
+        Raises:
+            ValueError: No `label_cols` to stratify on.
+
+        Returns:
+            pd.DataFrame: Sampled rows, in their original order and with their original index.
+        """
+        if self.per_label is not None and not label_cols:
+            raise ValueError('Sampling per label requires `label_cols`.')
+        reduce = self.n is not None or self.per_label is not None
+
+        sampled, position = [], 0
+        for chunk in chunks:
+            positions = np.arange(position, position + len(chunk))
+            position += len(chunk)
+            chunk_priorities = priorities(positions, seed=self._seed)
+            if self.frac is not None:
+                keep = chunk_priorities < self.frac
+                chunk, positions, chunk_priorities = chunk[keep], positions[keep], chunk_priorities[keep]
+            chunk = chunk.assign(**{PRIORITY: chunk_priorities, POSITION: positions})
+            if reduce:
+                sampled = [self._reduce(pd.concat(sampled + [chunk]) if sampled else chunk, label_cols)]
+            else:
+                sampled.append(chunk)
+
+        if not sampled:
+            return pd.DataFrame(columns=columns)
+        sampled = sampled[0] if len(sampled) == 1 else pd.concat(sampled)
+        return sampled.sort_values(POSITION, kind='stable').drop(columns=[PRIORITY, POSITION])
@@ -0,0 +1,151 @@
+"""Seeded (stratified) train/test and k-fold splits of `instancelib` environments, computed with NumPy.
+
+Splits are returned as buckets of the environment (`environment.create_bucket()`), which only hold the keys of their
+instances and refer to `environment.dataset` for the instances themselves.
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+import instancelib as il
+import numpy as np
+
+from ..mixin import SeedMixin
+
+
+class Splitter(SeedMixin):
+    def __init__(self,
+                 environment: il.Environment,
+                 provider: Optional[il.InstanceProvider] = None,
+                 stratify: bool = True,
+                 seed: Optional[int] = 0):
+        """Split (a provider of) an environment into training and test data, or into k folds.
+
+        The keys and labels are read once, after which each split is computed with NumPy over an array of label
+        codes. For stratified splits each unique combination of labels is a stratum, so multi-label instances are
+        stratified by their labelset. The seed is incremented after each split, so repeated splits differ but are
+        reproducible from the original seed (see `reset_seed()`).
+
+        Example:
+            >>> from genbase.data.split import Splitter
+            >>> splitter = Splitter(environment, stratify=True, seed=42)
+            >>> train, test = splitter.train_test_split(train_size=0.8)
+            >>> for train, test in splitter.k_fold(n_splits=5):
+            ...     ...
+
+        Args:
+            environment (il.Environment): Environment containing the instances and labels.
+            provider (Optional[il.InstanceProvider], optional): Provider to split. If None, splits
+                `environment.dataset`. Defaults to None.
+            stratify (bool, optional): Whether to keep the label distribution equal across splits. Defaults to True.
+            seed (Optional[int], optional): Seed for reproducibility. If None, selects a random seed. Defaults to 0.
+        """
+        self.environment = environment
+        self.stratify = stratify
+        self.set_seed(seed)
+
+        keys = list((environment.dataset if provider is None else provider).key_list)
+        self._keys = np.empty(len(keys), dtype=object)
+        self._keys[:] = keys
+        if stratify:
+            get_labels, strata = environment.labels.get_labels, {}
+            self._codes = np.fromiter((strata.setdefault(frozenset(get_labels(key)), len(strata)) for key in keys),
+                                      dtype=np.intp, count=len(keys))
+        else:
+            self._codes = np.zeros(len(keys), dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _order(self) -> np.ndarray:
+        """Random permutation, grouped by stratum when stratified; increments the seed."""
+        rng = np.random.default_rng(self._seed)
+        self._seed += 1
+        order = rng.permutation(len(self))
+        return order[np.argsort(self._codes[order], kind='stable')] if self.stratify else order
+
+    def _bucket(self, indices: np.ndarray) -> il.InstanceProvider:
+        return self.environment.create_bucket(self._keys[np.sort(indices)].tolist())
+
+    def train_test_split(self, train_size: Union[int, float]) -> Tuple[il.InstanceProvider, il.InstanceProvider]:
+        """Split into training and test data.
+
+        Args:
+            train_size (Union[int, float]): Size of training data, as a proportion [0, 1] or number of instances > 1.
+
+        Raises:
+            ValueError: Training size larger than the number of instances.
+
+        Returns:
+            Tuple[il.InstanceProvider, il.InstanceProvider]: Training and test data.
+        """
+        n = len(self)
+        n_train = round(train_size * n) if isinstance(train_size, float) else int(train_size)
+        if not 0 <= n_train <= n:
+            raise ValueError(f'Training size {train_size} should be at most the number of instances ({n}).')
+        order = self._order()
+
+        if not self.stratify:
+            return self._bucket(order[:n_train]), self._bucket(order[n_train:])
+
+        # Allocate the training size over strata by largest remainder, breaking ties by stratum size
+        counts = np.bincount(self._codes)
+        quotas = counts * (n_train / n) if n else counts.astype(float)
+        n_stratum = np.floor(quotas).astype(np.intp)
+        remainder = n_train - n_stratum.sum()
+        if remainder > 0:
+            n_stratum[np.lexsort((-counts, -(quotas - n_stratum)))[:remainder]] += 1
+
+        codes = self._codes[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank = np.arange(n) - starts[codes]
+        in_train = rank < n_stratum[codes]
+        return self._bucket(order[in_train]), self._bucket(order[~in_train])
+
+    def k_fold(self, n_splits: int = 5) -> Iterator[Tuple[il.InstanceProvider, il.InstanceProvider]]:
+        """Split into `n_splits` folds, yielding the training data (all other folds) and test data (fold) per fold.
+
+        Args:
+            n_splits (int, optional): Number of folds. Defaults to 5.
+
+        Raises:
+            ValueError: Fewer than 2 folds or more folds than instances.
+
+        Yields:
+            Iterator[Tuple[il.InstanceProvider, il.InstanceProvider]]: Training and test data of each fold.
+        """
+        if not 2 <= n_splits <= len(self):
+            raise ValueError(f'Number of splits should be between 2 and the number of instances ({len(self)}).')
+        order = self._order()
+        # Assigning consecutive instances in stratum order to consecutive folds spreads each stratum evenly
+        folds = np.empty(len(self), dtype=np.intp)
+        folds[order] = np.arange(len(self)) % n_splits
+        for fold in range(n_splits):
+            in_test = folds == fold
+            yield self._bucket(np.flatnonzero(~in_test)), self._bucket(np.flatnonzero(in_test))
+
+
+def k_fold_split(environment: il.Environment,
+                 n_splits: int = 5,
+                 stratify: bool = True,
+                 seed: Optional[int] = 0,
+                 provider: Optional[il.InstanceProvider] = None
+                 ) -> List[Tuple[il.InstanceProvider, il.InstanceProvider]]:
+    """Split an environment into k folds of training and test data.
+
+    Example:
+        >>> from genbase.data import k_fold_split
+        >>> for train, test in k_fold_split(environment, n_splits=5, seed=42):
+        ...     ...
+
+    Args:
+        environment (il.Environment): Environment containing all data, including labels.
+        n_splits (int, optional): Number of folds. Defaults to 5.
+        stratify (bool, optional): Whether to keep the label distribution equal across folds. Defaults to True.
+        seed (Optional[int], optional): Seed for reproducibility. If None, selects a random seed. Defaults to 0.
+        provider (Optional[il.InstanceProvider], optional): Provider to split. If None, splits `environment.dataset`.
+            Defaults to None.
+
+    Returns:
+        List[Tuple[il.InstanceProvider, il.InstanceProvider]]: Training and test data of each fold.
+    """
+    return list(Splitter(environment, provider=provider, stratify=stratify, seed=seed).k_fold(n_splits=n_splits))
@@ -1,21 +1,87 @@
 """Wrap models using instancelib and instancelib-onnx."""
 
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Union
 
 from instancelib.environment.base import Environment
 from instancelib.instances.base import InstanceProvider
 from instancelib.machinelearning import AbstractClassifier, SkLearnDataClassifier
 from instancelib.typehints import LT
-from sklearn.base import is_classifier
+from sklearn.base import BaseEstimator, is_classifier
 from sklearn.exceptions import NotFittedError
 from sklearn.pipeline import Pipeline
-from sklearn.utils.estimator_checks import check_estimator
 from sklearn.utils.validation import check_is_fitted
 
 from ..data import train_test_split
 from ..utils import get_file_type, info, package_available
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import PredictionCache
+
+
+class ModelAdapter(NamedTuple):
+    """Detects a type of model by its class, and optionally wraps models of that type for `import_model()`."""
+
+    detect: Callable[[type], bool]
+    adapt: Optional[Callable[..., AbstractClassifier]] = None
+
+
+MODEL_ADAPTERS: Dict[str, ModelAdapter] = {}
+_MODEL_TYPE_CACHE: Dict[type, Optional[str]] = {}
+
+
+def register_model_adapter(name: str,
+                           detect: Callable[[type], bool],
+                           adapt: Optional[Callable[..., AbstractClassifier]] = None) -> None:
+    """Register a type of model for `import_model()`, taking precedence over types registered before it.
+
+    Example:
+        Import models of another library by wrapping them in an instancelib classifier:
+
+        >>> from genbase.model import register_model_adapter
+        >>> register_model_adapter('my_library',
+        ...                        detect=lambda cls: cls.__module__.startswith('my_library.'),
+        ...                        adapt=lambda model, environment, train, label_map: MyClassifier(model, label_map))
+
+    Args:
+        name (str): Name of type of model.
+        detect (Callable[[type], bool]): Whether a class of model is of this type. Only called once per class.
+        adapt (Optional[Callable[..., AbstractClassifier]], optional): Function wrapping a model, called with
+            keyword arguments `model`, `environment`, `train` (training data) and `label_map`. If None, only
+            detects the type (e.g. for `sklearn_model()`). Defaults to None.
+    """
+    MODEL_ADAPTERS.pop(name, None)
+    MODEL_ADAPTERS[name] = ModelAdapter(detect, adapt)
+    _MODEL_TYPE_CACHE.clear()
+
+
+def model_type(model: Any) -> Optional[str]:
+    """Name of the type of `model` in `MODEL_ADAPTERS`, memoized per class.
+
+    Args:
+        model (Any): Model to check.
+
+    Returns:
+        Optional[str]: Name of type of model, or None if unknown.
+    """
+    cls = type(model)
+    try:
+        return _MODEL_TYPE_CACHE[cls]
+    except KeyError:
+        name = _MODEL_TYPE_CACHE[cls] = next((name for name, adapter in reversed(list(MODEL_ADAPTERS.items()))
+                                              if adapter.detect(cls)), None)
+        return name
+
+
+def _is_sklearn(cls: type) -> bool:
+    """Whether `cls` follows the scikit-learn estimator protocol (`BaseEstimator` with `fit()` and a prediction or
+    transformation method)."""
+    return issubclass(cls, BaseEstimator) and callable(getattr(cls, 'fit', None)) and \
+        any(callable(getattr(cls, method, None)) for method in ('predict', 'predict_proba', 'transform'))
+
+
+register_model_adapter('sklearn', _is_sklearn)
+
 
 def sklearn_model(model) -> bool:
     """Check is a model is an scikit-learn model.
@@ -26,13 +92,7 @@ def sklearn_model(model) -> bool:
     Returns:
         bool: Model is a scikit-learn model (True) or not (False).
     """
-    if isinstance(model, Pipeline):
-        return True
-    try:
-        check_estimator(model)
-        return True
-    except:
-        return False
+    return isinstance(model, Pipeline) or model_type(model) == 'sklearn'
 
 
 def sklearn_fitted(model) -> bool:
@@ -57,7 +117,10 @@ def sklearn_fitted(model) -> bool:
 def import_model(model,
                  environment: Optional[Environment] = None,
                  train: Union[int, float, str, InstanceProvider] = 'train',
-                 label_map: Optional[Dict[LT, LT]] = None) -> AbstractClassifier:
+                 label_map: Optional[Dict[LT, LT]] = None,
+                 batch_size: Optional[int] = None,
+                 cache: Optional[Union[bool, str, 'PredictionCache']] = None,
+                 n_jobs: Optional[int] = None) -> AbstractClassifier:
     """Import a model from file or from a Python object.
 
     Examples:
@@ -86,6 +149,16 @@ def import_model(model,
         train (Union[int, float, str, InstanceProvider], optional): Train split size, name in environment or provider. 
             Defaults to 'train'.
         label_map (Optional[Dict[LT, LT]], optional): Conversion of label IDs to named labels. Defaults to None.
+        batch_size (Optional[int], optional): If given, wrap the model in a `BatchedClassifier` that predicts in
+            batches of at most `batch_size` instances and streams results in input order. Defaults to None.
+        cache (Optional[Union[bool, str, PredictionCache]], optional): If given, wrap the model in a `CachedClassifier`
+            that memoizes predictions per instance content, with an in-memory cache (True), a cache with an on-disk tier
+            in a directory (str) or a `genbase.model.cache.PredictionCache`. Models imported from a file are identified
+            by the hash of the file and of the label map. If None, does not cache. Defaults to None.
+        n_jobs (Optional[int], optional): If given, wrap the model in a `ReplicatedClassifier` that predicts batches (of
+            `batch_size` instances) in parallel, with a replica of the model in each of `n_jobs` worker processes (-1
+            for the number of CPUs). ONNX models are imported from their file in each worker, other models are pickled.
+            Shut the workers down with `close()`. Defaults to None.
 
     Raises:
         ImportError: Unable to import model or file.
@@ -94,11 +167,38 @@ def import_model(model,
     Returns:
         AbstractClassifier: Instancelib wrapped model.
     """
+    # Resolved once, so that wrapped models and replicas (in worker processes) use the same labels
     if label_map is None and environment is not None:
         label_map = list(environment.labels.labelset)
     if isinstance(label_map, dict):
         label_map = {str(k): v for k, v in label_map.items()}
 
+    if cache is not None and cache is not False:
+        from .cache import CachedClassifier, PredictionCache
+        if isinstance(cache, str):
+            cache = PredictionCache(directory=cache)
+        fingerprint = None
+        if isinstance(model, str) and Path(model).exists():
+            import hashlib
+
+            from ..data.cache import _file_hash
+
+            # Labels of the predictions depend on the label map as well
+            fingerprint = f'{_file_hash(model)}:{hashlib.sha256(repr(label_map).encode("utf-8")).hexdigest()}'
+        return CachedClassifier(import_model(model, environment=environment, train=train, label_map=label_map,
+                                             batch_size=batch_size, n_jobs=n_jobs),
+                                cache=None if cache is True else cache, fingerprint=fingerprint)
+    if n_jobs is not None:
+        from .batch import BATCH_SIZE
+        from .replicas import ReplicatedClassifier
+        path = model if isinstance(model, str) and get_file_type(model) == '.onnx' else None
+        return ReplicatedClassifier(import_model(model, environment=environment, train=train, label_map=label_map),
+                                    n_jobs=n_jobs, batch_size=batch_size or BATCH_SIZE, path=path, label_map=label_map)
+    if batch_size is not None:
+        from .batch import BatchedClassifier
+        return BatchedClassifier(import_model(model, environment=environment, train=train, label_map=label_map),
+                                 batch_size=batch_size)
+
     if isinstance(model, str):
         if not Path(model).exists():
             raise ImportError(f'Unable to locate file "{model}"')
@@ -144,7 +244,7 @@ def import_model(model,
                 model.fit_provider(train, environment.labels)
                 return model
             else:
-                NotImplementedError('Only classifiers are currently supported!')
+                raise NotImplementedError('Only classifiers are currently supported!')
         else:
             if is_classifier(model):
                 classes = label_map if environment is None else environment
@@ -153,6 +253,9 @@ def import_model(model,
                 raise NotImplementedError('Only classifiers are currently supported!')
     elif isinstance(model, AbstractClassifier):
         return model
+    elif model_type(model) is not None and MODEL_ADAPTERS[model_type(model)].adapt is not None:
+        return MODEL_ADAPTERS[model_type(model)].adapt(model=model, environment=environment, train=train,
+                                                       label_map=label_map)
     elif 'torch' in str(type(model)):
         raise ImportError('Convert your PyTorch model with ONNX (https://pytorch.org/docs/stable/onnx.html)' +
                           ' before importing it with instancelib-onnx.')
@@ -0,0 +1,141 @@
+"""Batched predictions of imported (`instancelib`) classifiers.
+
+Requests of any size are split into batches of `batch_size` instances, which are predicted one at a time with a single
+vectorized call each, and the results are recombined in input order. Inputs are consumed lazily, so streaming
+predictions of a provider or generator only keeps one batch of instances and predictions in memory.
+"""
+
+from itertools import islice
+from typing import Any, FrozenSet, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from instancelib.instances.base import Instance, InstanceProvider
+from instancelib.machinelearning import AbstractClassifier
+from instancelib.typehints import KT, LT
+
+BATCH_SIZE = 1024
+
+
+def to_instances(instances: Any) -> Iterable[Instance]:
+    """Iterable of instances from an instance, instance provider or iterable of instances."""
+    if isinstance(instances, Instance):
+        return [instances]
+    if isinstance(instances, InstanceProvider):
+        return instances.values()
+    return instances
+
+
+def iter_batches(instances: Any, batch_size: int = BATCH_SIZE) -> Iterator[List[Instance]]:
+    """Split instances into consecutive batches, consuming them lazily.
+
+    Args:
+        instances (Any): Instance, instance provider or iterable of instances.
+        batch_size (int, optional): Maximum number of instances per batch. Defaults to `BATCH_SIZE`.
+
+    Yields:
+        Iterator[List[Instance]]: Batches of instances, in input order.
+    """
+    iterator = iter(to_instances(instances))
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class BatchedClassifier:
+    def __init__(self, model: AbstractClassifier, batch_size: int = BATCH_SIZE):
+        """Wrap a classifier to predict in batches of `batch_size` instances, streaming results in input order.
+
+        Attributes other than the prediction methods (e.g. `fit_provider()` or `name`) are those of `model`.
+
+        Example:
+            >>> from genbase import import_model
+            >>> model = import_model(pipeline, environment, batch_size=10_000)
+            >>> for key, labels in model.iter_predict(environment.dataset):
+            ...     ...
+
+        Args:
+            model (AbstractClassifier): Classifier to wrap.
+            batch_size (int, optional): Maximum number of instances per prediction call. Defaults to `BATCH_SIZE`.
+
+        Raises:
+            ValueError: Non-positive batch size.
+        """
+        if batch_size < 1:
+            raise ValueError(f'Batch size should be positive, but is {batch_size}.')
+        self.model = model.model if isinstance(model, BatchedClassifier) else model
+        self.batch_size = batch_size
+
+    def __getattr__(self, name: str):
+        if 'model' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__['model'], name)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.model!r}, batch_size={self.batch_size})'
+
+    def iter_predict_proba_raw(self, instances: Any) -> Iterator[Tuple[Sequence[KT], np.ndarray]]:
+        """Stream the keys and probability matrix of each batch.
+
+        Args:
+            instances (Any): Instance, instance provider or iterable of instances.
+
+        Yields:
+            Iterator[Tuple[Sequence[KT], np.ndarray]]: Keys and probabilities (rows in order of keys) per batch.
+        """
+        for batch in iter_batches(instances, self.batch_size):
+            yield from self.model.predict_proba_instances_raw(batch, batch_size=len(batch))
+
+    def iter_predict_proba(self, instances: Any) -> Iterator[Tuple[KT, FrozenSet[Tuple[LT, float]]]]:
+        """Stream the key and labels with probabilities of each instance, in input order."""
+        for batch in iter_batches(instances, self.batch_size):
+            yield from self.model.predict_proba_instances(batch, batch_size=len(batch))
+
+    def iter_predict(self, instances: Any) -> Iterator[Tuple[KT, FrozenSet[LT]]]:
+        """Stream the key and predicted labels of each instance, in input order."""
+        for batch in iter_batches(instances, self.batch_size):
+            yield from self.model.predict_instances(batch, batch_size=len(batch))
+
+    def predict_proba_raw(self, instances: Any, batch_size: int = None) -> Iterator[Tuple[Sequence[KT], np.ndarray]]:
+        """Equal to `iter_predict_proba_raw()`, ignoring `batch_size` in favor of `self.batch_size`."""
+        return self.iter_predict_proba_raw(instances)
+
+    def predict_proba(self, instances: Any, batch_size: int = None) -> List[Tuple[KT, FrozenSet[Tuple[LT, float]]]]:
+        """Labels with probabilities of each instance, in input order."""
+        return list(self.iter_predict_proba(instances))
+
+    def predict(self, instances: Any, batch_size: int = None) -> List[Tuple[KT, FrozenSet[LT]]]:
+        """Predicted labels of each instance, in input order."""
+        return list(self.iter_predict(instances))
+
+    predict_provider = predict_instances = predict
+    predict_proba_provider = predict_proba_instances = predict_proba
+    predict_proba_provider_raw = predict_proba_instances_raw = predict_proba_raw
+
+
+AbstractClassifier.register(BatchedClassifier)
+
+
+def predict_batched(model: AbstractClassifier,
+                    instances: Iterable[Instance],
+                    batch_size: int = BATCH_SIZE,
+                    proba: bool = True) -> Iterator[Tuple[KT, Any]]:
+    """Stream predictions of `model` in batches of `batch_size` instances, in input order.
+
+    Example:
+        >>> from genbase.model.batch import predict_batched
+        >>> for key, labels in predict_batched(model, environment.dataset, batch_size=10_000):
+        ...     ...
+
+    Args:
+        model (AbstractClassifier): Classifier.
+        instances (Iterable[Instance]): Instance, instance provider or iterable of instances.
+        batch_size (int, optional): Maximum number of instances per prediction call. Defaults to `BATCH_SIZE`.
+        proba (bool, optional): Yield labels with probabilities (True) or predicted labels (False). Defaults to True.
+
+    Yields:
+        Iterator[Tuple[KT, Any]]: Key and prediction of each instance.
+    """
+    batched = BatchedClassifier(model, batch_size=batch_size)
+    return batched.iter_predict_proba(instances) if proba else batched.iter_predict(instances)
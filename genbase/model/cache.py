@@ -0,0 +1,338 @@
+"""Memoization of predictions of imported (`instancelib`) classifiers, keyed on the content of instances.
+
+Each prediction is stored under a hash of the data of the instance, keyed with a fingerprint of the model and the kind
+of prediction, so the same text predicted under another identifier (e.g. a repeated perturbation) is a cache hit. The
+fingerprint is a hash of the pickled model (or of the model file and label map when importing it from a file). Entries
+are kept in memory and evicted least recently used once there are more than `max_entries` entries or they take more than
+`max_bytes` bytes, with an optional SQLite database as on-disk tier that survives restarts. Cache misses of a request
+are predicted by the underlying classifier in a single batch. Models that cannot be pickled (and have no explicit
+fingerprint) are identified by their identity instead, and their predictions are only cached in memory.
+"""
+
+import hashlib
+import os
+import pickle  # nosec
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterator, List, Literal, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from instancelib.instances.base import Instance
+from instancelib.machinelearning import AbstractClassifier
+from instancelib.typehints import KT, LT
+
+from ..utils import info
+from .batch import BatchedClassifier, to_instances
+
+Method = Literal['proba_raw', 'proba', 'predict']
+
+MAX_ENTRIES = 100_000
+MAX_BYTES = 256 * 1024 ** 2
+DATABASE = 'predictions.sqlite'
+_SQLITE_MAX_VARIABLES = 900
+
+
+def _unwrap(model: Any) -> Any:
+    while isinstance(model, (BatchedClassifier, CachedClassifier)):
+        model = model.model
+    return model
+
+
+def model_fingerprint(model: Any) -> Optional[str]:
+    """Hash of the pickled `model`.
+
+    Pickles are not always equal across processes (e.g. when they include sets of strings), in which case the on-disk
+    tier is only reused within a process. Pass a `fingerprint` to `CachedClassifier` (e.g. a version) to reuse it.
+
+    Args:
+        model (Any): Model.
+
+    Returns:
+        Optional[str]: Fingerprint, or None if the model cannot be pickled.
+    """
+    try:
+        return hashlib.sha256(pickle.dumps(_unwrap(model), protocol=4)).hexdigest()
+    except Exception:
+        return None
+
+
+def _encode(data: Any) -> bytes:
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    elif isinstance(data, bytes):
+        return data
+    elif isinstance(data, np.ndarray):
+        return repr((data.dtype.str, data.shape)).encode('utf-8') + np.ascontiguousarray(data).tobytes()
+    return pickle.dumps(data, protocol=4)
+
+
+class PredictionCache:
+    def __init__(self,
+                 max_entries: int = MAX_ENTRIES,
+                 max_bytes: int = MAX_BYTES,
+                 directory: Optional[str] = None):
+        """Cache of predictions, in memory with an optional on-disk tier.
+
+        Example:
+            >>> from genbase import import_model
+            >>> from genbase.model.cache import PredictionCache
+            >>> model = import_model(pipeline, environment, cache=PredictionCache(max_entries=10_000))
+
+        Args:
+            max_entries (int, optional): Maximum number of entries in memory. Defaults to `MAX_ENTRIES`.
+            max_bytes (int, optional): Maximum (approximate) size of the entries in memory, in bytes. Defaults to
+                `MAX_BYTES` (256MiB).
+            directory (Optional[str], optional): Directory of the on-disk tier, created if it does not exist. If None,
+                only caches in memory. Defaults to None.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: 'OrderedDict[bytes, Tuple[Any, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(directory, DATABASE), check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS predictions (key BLOB PRIMARY KEY, value BLOB)')
+            self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(max_entries={self.max_entries}, max_bytes={self.max_bytes}, ' + \
+            f'directory={self.directory!r})'
+
+    def __getstate__(self):
+        return {'max_entries': self.max_entries, 'max_bytes': self.max_bytes, 'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the entries in memory, in bytes."""
+        return self._bytes
+
+    def _store(self, key: bytes, value: Any, size: int) -> None:
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._bytes -= self._entries.popitem(last=False)[1][1]
+
+    def _read_disk(self, keys: Sequence[bytes]) -> Dict[bytes, bytes]:
+        found = {}
+        for i in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+            chunk = keys[i:i + _SQLITE_MAX_VARIABLES]
+            query = f'SELECT key, value FROM predictions WHERE key IN ({",".join("?" * len(chunk))})'  # nosec
+            found.update(self._db.execute(query, chunk).fetchall())
+        return found
+
+    def get_many(self, keys: Sequence[bytes], disk: bool = True) -> Dict[bytes, Any]:
+        """Cached values of `keys`, moving them to the end of the LRU order (and from disk into memory).
+
+        Args:
+            keys (Sequence[bytes]): Keys to look up.
+            disk (bool, optional): Also look up keys in the on-disk tier. Defaults to True.
+
+        Returns:
+            Dict[bytes, Any]: Values of the keys that are cached.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key][0]
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and disk and self._db is not None:
+                for key, blob in self._read_disk(missing).items():
+                    found[key] = pickle.loads(blob)  # nosec
+                    self._store(key, found[key], found[key].nbytes if isinstance(found[key], np.ndarray) else len(blob))
+                self._evict()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Mapping[bytes, Any], disk: bool = True) -> None:
+        """Cache values, evicting the least recently used entries from memory when the cache is full.
+
+        Args:
+            items (Mapping[bytes, Any]): Values per key.
+            disk (bool, optional): Also write the values to the on-disk tier. Defaults to True.
+        """
+        with self._lock:
+            blobs = []
+            disk = disk and self._db is not None
+            for key, value in items.items():
+                is_array = isinstance(value, np.ndarray)
+                blob = pickle.dumps(value, protocol=4) if disk or not is_array else None
+                self._store(key, value, value.nbytes if is_array else len(blob))
+                if disk:
+                    blobs.append((key, blob))
+            self._evict()
+            if blobs:
+                self._db.executemany('INSERT OR REPLACE INTO predictions (key, value) VALUES (?, ?)', blobs)
+                self._db.commit()
+
+    def clear(self, disk: bool = True) -> None:
+        """Remove all entries from memory and (if `disk`) from the on-disk tier."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk and self._db is not None:
+                self._db.execute('DELETE FROM predictions')
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the database of the on-disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedClassifier:
+    def __init__(self,
+                 model: AbstractClassifier,
+                 cache: Optional[PredictionCache] = None,
+                 fingerprint: Optional[str] = None):
+        """Wrap a classifier to memoize its predictions per instance content, only predicting cache misses.
+
+        Attributes other than the prediction and fit methods (e.g. `name`) are those of `model`. Fitting the model
+        through the wrapper updates its fingerprint, so earlier predictions are no longer used.
+
+        Example:
+            >>> from genbase import import_model
+            >>> model = import_model(pipeline, environment, cache='.genbase_predictions')
+            >>> model.predict_proba(perturbed_instances)
+
+        Args:
+            model (AbstractClassifier): Classifier to wrap.
+            cache (Optional[PredictionCache], optional): Cache, which may be shared by models. If None, creates an
+                in-memory `PredictionCache()`. Defaults to None.
+            fingerprint (Optional[str], optional): Identifier of the model (e.g. name and version). If None, uses
+                `model_fingerprint(model)`, or the identity of the model if it cannot be pickled (only caching its
+                predictions in memory). Defaults to None.
+        """
+        self.model = model
+        self.cache = PredictionCache() if cache is None else cache
+        if fingerprint is None:
+            self._fingerprint_model()
+        else:
+            self.fingerprint = fingerprint
+
+    def __getattr__(self, name: str):
+        if 'model' not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__['model'], name)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.model!r}, cache={self.cache!r})'
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifier of the model, part of the key of all its cached predictions."""
+        return self._fingerprint
+
+    @fingerprint.setter
+    def fingerprint(self, fingerprint: str) -> None:
+        self._fingerprint = fingerprint
+        self._hash_key = hashlib.sha256(fingerprint.encode('utf-8')).digest()
+        self._disk = True
+
+    def _fingerprint_model(self) -> None:
+        fingerprint = model_fingerprint(self.model)
+        if fingerprint is not None:
+            self.fingerprint = fingerprint
+            return
+        # The identity of a model is only unique within this process, so never use it for the on-disk tier
+        model = _unwrap(self.model)
+        info(f'Unable to pickle {type(model).__qualname__}, its predictions are only cached in memory (pass a '
+             '`fingerprint` to also cache them on disk).')
+        self.fingerprint = f'{type(model).__module__}.{type(model).__qualname__}:{id(model)}'
+        self._disk = False
+
+    def keys(self, instances: Sequence[Instance], method: Method = 'proba_raw') -> List[bytes]:
+        """Cache keys of the predictions of `instances` with prediction `method`."""
+        person = method.encode('utf-8')
+        return [hashlib.blake2b(_encode(instance.data), digest_size=16, key=self._hash_key, person=person).digest()
+                for instance in instances]
+
+    def _compute(self, method: Method, batch: List[Instance]) -> List[Any]:
+        if method == 'proba_raw':
+            return [row.copy() for _, matrix in self.model.predict_proba_instances_raw(batch, batch_size=len(batch))
+                    for row in matrix]
+        predict = self.model.predict_proba_instances if method == 'proba' else self.model.predict_instances
+        return [value for _, value in predict(batch, batch_size=len(batch))]
+
+    def _predict(self, instances: Any, method: Method) -> Tuple[List[KT], List[Any]]:
+        instances = list(to_instances(instances))
+        keys = self.keys(instances, method=method)
+        values = self.cache.get_many(keys, disk=self._disk)
+        misses: Dict[bytes, Instance] = {}
+        for key, instance in zip(keys, instances):
+            if key not in values:
+                misses.setdefault(key, instance)
+        if misses:
+            computed = dict(zip(misses.keys(), self._compute(method, list(misses.values()))))
+            self.cache.put_many(computed, disk=self._disk)
+            values.update(computed)
+        return [instance.identifier for instance in instances], [values[key] for key in keys]
+
+    def predict_proba_raw(self, instances: Any, batch_size: int = None) -> Iterator[Tuple[Sequence[KT], np.ndarray]]:
+        """Keys and probability matrix of all instances, as a single batch."""
+        identifiers, rows = self._predict(instances, 'proba_raw')
+        if rows:
+            yield identifiers, np.vstack(rows)
+
+    def predict_proba(self, instances: Any, batch_size: int = None) -> List[Tuple[KT, FrozenSet[Tuple[LT, float]]]]:
+        """Labels with probabilities of each instance, in input order."""
+        return list(zip(*self._predict(instances, 'proba')))
+
+    def predict(self, instances: Any, batch_size: int = None) -> List[Tuple[KT, FrozenSet[LT]]]:
+        """Predicted labels of each instance, in input order."""
+        return list(zip(*self._predict(instances, 'predict')))
+
+    predict_provider = predict_instances = predict
+    predict_proba_provider = predict_proba_instances = predict_proba
+    predict_proba_provider_raw = predict_proba_instances_raw = predict_proba_raw
+
+    def __enter__(self) -> 'CachedClassifier':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the wrapped model if it can be closed (e.g. shut down the workers of a `ReplicatedClassifier`)."""
+        close = getattr(self.model, 'close', None)
+        if callable(close):
+            close()
+
+    def fit_provider(self, *args, **kwargs):
+        result = self.model.fit_provider(*args, **kwargs)
+        self._fingerprint_model()
+        return result
+
+    def fit_instances(self, *args, **kwargs):
+        result = self.model.fit_instances(*args, **kwargs)
+        self._fingerprint_model()
+        return result
+
+    def fit_val_provider(self, *args, **kwargs):
+        result = self.model.fit_val_provider(*args, **kwargs)
+        self._fingerprint_model()
+        return result
+
+
+AbstractClassifier.register(CachedClassifier)
@@ -0,0 +1,167 @@
+"""Predictions of imported (`instancelib`) classifiers by replicas of the model in worker processes.
+
+Each worker process loads one replica of the model once, when it starts: unpickled for models that can be pickled (e.g.
+scikit-learn pipelines), or imported again from its file for models that cannot (e.g. ONNX inference sessions).
+Batches of `batch_size` instances are then spread across the workers, with at most two batches per worker in flight,
+and recombined in input order. The workers are shut down with `close()`, when leaving a `with` block or when the
+classifier is garbage collected.
+"""
+
+import os
+import pickle  # nosec
+import sys
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
+
+from instancelib.instances.base import Instance
+from instancelib.instances.text import MemoryTextInstance
+from instancelib.machinelearning import AbstractClassifier
+
+from .batch import BATCH_SIZE, BatchedClassifier, iter_batches
+
+Method = Literal['proba_raw', 'proba', 'predict']
+
+_REPLICA: Optional[AbstractClassifier] = None
+
+
+def _load_replica(loader: Callable[..., AbstractClassifier], args: tuple, kwargs: Dict[str, Any]) -> None:
+    global _REPLICA
+    _REPLICA = loader(*args, **kwargs)
+
+
+# Constructor arguments (and equally named attributes) of instance classes sent to workers as rows of values, which
+# pickle faster than the instances themselves; instances of other classes are pickled as-is
+_PACKED_FIELDS: Dict[type, Tuple[str, ...]] = {
+    MemoryTextInstance: ('identifier', 'data', 'vector', 'representation', 'tokenized', 'map_to_original',
+                         'split_marker'),
+}
+
+
+def _pack(batch: List[Instance]) -> Any:
+    cls = type(batch[0])
+    fields = _PACKED_FIELDS.get(cls)
+    if fields is None or any(type(instance) is not cls for instance in batch):
+        return batch
+    getter = attrgetter(*fields)
+    return cls, [getter(instance) for instance in batch]
+
+
+def _unpack(packed: Any) -> List[Instance]:
+    if isinstance(packed, list):
+        return packed
+    cls, rows = packed
+    return [cls(*row) for row in rows]
+
+
+def _predict_replica(method: Method, packed: Any) -> List[Any]:
+    batch = _unpack(packed)
+    if method == 'proba_raw':
+        predictions = _REPLICA.predict_proba_instances_raw(batch, batch_size=len(batch))
+        return [(list(keys), matrix) for keys, matrix in predictions]
+    elif method == 'proba':
+        return list(_REPLICA.predict_proba_instances(batch, batch_size=len(batch)))
+    return list(_REPLICA.predict_instances(batch, batch_size=len(batch)))
+
+
+class ReplicatedClassifier(BatchedClassifier):
+    def __init__(self,
+                 model: AbstractClassifier,
+                 n_jobs: int = -1,
+                 batch_size: int = BATCH_SIZE,
+                 path: Optional[str] = None,
+                 label_map: Optional[Any] = None):
+        """Wrap a classifier to predict batches in parallel, with a replica of the model in each worker process.
+
+        Attributes other than the prediction methods (e.g. `name`) are those of `model`, in the main process.
+
+        Example:
+            >>> from genbase import import_model
+            >>> with import_model(pipeline, environment, n_jobs=4, batch_size=2_000) as model:
+            ...     predictions = model.predict_proba(environment.dataset)
+
+        Args:
+            model (AbstractClassifier): Classifier to replicate.
+            n_jobs (int, optional): Number of worker processes (replicas). If -1, uses the number of CPUs. Defaults to
+                -1.
+            batch_size (int, optional): Maximum number of instances per batch sent to a worker. Defaults to
+                `BATCH_SIZE`.
+            path (Optional[str], optional): File of the model, to import it from in the workers (e.g. for ONNX models,
+                of which the inference sessions cannot be pickled). If None, sends the pickled model to the workers.
+                Defaults to None.
+            label_map (Optional[Any], optional): Label map to import the model from `path` with. Defaults to None.
+
+        Raises:
+            ValueError: Non-positive batch size.
+            ImportError: The model cannot be pickled and has no `path` to import it from.
+        """
+        super().__init__(model, batch_size=batch_size)
+        if path is not None:
+            from . import import_model
+            loader, args, kwargs = import_model, (path,), {'label_map': label_map}
+        else:
+            try:
+                loader, args, kwargs = pickle.loads, (pickle.dumps(self.model, protocol=4),), {}  # nosec
+            except Exception as e:
+                raise ImportError(f'Unable to pickle model "{self.model}" to replicate it in worker processes, '
+                                  'import it from a file instead.') from e
+        self.n_jobs = os.cpu_count() if n_jobs is None or n_jobs < 1 else n_jobs
+        self._executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_load_replica,
+                                             initargs=(loader, args, kwargs))
+        shutdown_kwargs = {'wait': True, 'cancel_futures': True} if sys.version_info >= (3, 9) else {'wait': True}
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, **shutdown_kwargs)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.model!r}, n_jobs={self.n_jobs}, batch_size={self.batch_size})'
+
+    def __enter__(self) -> 'ReplicatedClassifier':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __reduce__(self):
+        raise TypeError(f'{self.__class__.__name__} cannot be pickled, pickle its `model` instead.')
+
+    @property
+    def closed(self) -> bool:
+        """Whether the worker processes have been shut down."""
+        return not self._finalizer.alive
+
+    def close(self) -> None:
+        """Shut down the worker processes, waiting for running batches and cancelling pending ones."""
+        self._finalizer()
+
+    def _map(self, method: Method, instances: Any) -> Iterator[List[Any]]:
+        if self.closed:
+            raise RuntimeError(f'Unable to predict with closed {self.__class__.__name__}.')
+        pending = deque()
+        for batch in iter_batches(instances, self.batch_size):
+            pending.append(self._executor.submit(_predict_replica, method, _pack(batch)))
+            if len(pending) >= 2 * self.n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def iter_predict_proba_raw(self, instances: Any) -> Iterator[Tuple[List, Any]]:
+        for results in self._map('proba_raw', instances):
+            yield from results
+
+    def iter_predict_proba(self, instances: Any) -> Iterator[Tuple[Any, Any]]:
+        encoder = getattr(self.model, 'encoder', None)
+        if encoder is None:
+            for results in self._map('proba', instances):
+                yield from results
+            return
+        # Decoded probabilities are slow to pickle, so decode matrices in the main process instead
+        for keys, matrix in self.iter_predict_proba_raw(instances):
+            yield from zip(keys, encoder.decode_proba_matrix(matrix))
+
+    def iter_predict(self, instances: Any) -> Iterator[Tuple[Any, Any]]:
+        for results in self._map('predict', instances):
+            yield from results
+
+
+AbstractClassifier.register(ReplicatedClassifier)
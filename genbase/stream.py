@@ -0,0 +1,176 @@
+"""Streaming (bounded-memory) export of configs to JSON and JSONL.
+
+Instead of first building the whole config with `to_config()` and then the whole JSON string, the writers in this
+module walk the objects with a lazy `genbase.utils.ExportWalk` (the walk used by `recursive_to_dict()`) and write each
+exported part to the file handle as soon as it is available. Lists, dictionaries, nested objects and `instancelib`
+providers are exported lazily, so memory is bounded by the largest single value (e.g. one instance) instead of the
+whole config.
+"""
+
+import gzip
+import io
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Tuple, Union
+
+import srsly
+from instancelib.environment.base import Environment
+from instancelib.instances.base import InstanceProvider
+from instancelib.labels.base import LabelProvider
+
+from genbase.utils import CHUNK_SIZE, ExportWalk, LazyDict, LazyList, export_instancelib_chunked, references
+
+
+def lazy_config(obj: Any, include_class: bool = True):
+    """Lazy equivalent of `obj.to_config()` (if available) or `dict(recursive_to_dict(obj))`.
+
+    `Configurable`s that do not override `to_config()` and `MetaInfo`s with `content` are exported lazily, other
+    objects with a custom `to_config()` are exported with it and then written incrementally. Needs to be consumed
+    within a `genbase.utils.references` statement to deduplicate shared objects.
+    """
+    from genbase import Configurable, MetaInfo
+
+    walk = ExportWalk(lazy=True)
+    walk.register(obj)
+    if isinstance(obj, MetaInfo) and type(obj).to_config is MetaInfo.to_config and hasattr(obj, 'content'):
+        content = obj.content() if callable(obj.content) else obj.content
+        return LazyDict(iter([('META', walk.export(obj.meta, ('META',))),
+                              ('CONTENT', LazyDict(walk.fields(content, include_class=False, path=('CONTENT',))))]))
+    elif isinstance(obj, Configurable) and type(obj).to_config is Configurable.to_config:
+        return LazyDict(walk.fields(vars(obj), include_class=False)) if not include_class else \
+            LazyDict(_with_class(obj, walk.fields(vars(obj))))
+    elif isinstance(obj, (Environment, InstanceProvider, LabelProvider)):
+        return walk.instancelib(obj)
+    return LazyDict(walk.fields(obj, include_class=include_class))
+
+
+def _with_class(obj, fields: Iterator[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    yield '__class__', str(obj.__class__).split("'")[1]
+    yield from fields
+
+
+def _json_key(key: Any) -> str:
+    if isinstance(key, str):
+        return srsly.json_dumps(key)
+    elif key is None or isinstance(key, bool):
+        return srsly.json_dumps(srsly.json_dumps(key))
+    return srsly.json_dumps(str(key))
+
+
+def iter_json(value: Any) -> Iterator[str]:
+    """Encode a (lazy) exported value as JSON, in chunks.
+
+    Args:
+        value (Any): Exported value, possibly containing `LazyDict`s and `LazyList`s.
+
+    Yields:
+        Iterator[str]: Chunks of compact JSON.
+    """
+    if isinstance(value, LazyDict):
+        yield '{'
+        for i, (key, item) in enumerate(value.items):
+            yield f'{"," if i else ""}{_json_key(key)}:'
+            yield from iter_json(item)
+        yield '}'
+    elif isinstance(value, LazyList):
+        yield '['
+        for i, item in enumerate(value.items):
+            if i:
+                yield ','
+            yield from iter_json(item)
+        yield ']'
+    else:
+        yield srsly.json_dumps(value)
+
+
+def iter_records(obj: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Iterate over the records of an object when writing JSONL, one record per instance.
+
+    For an `InstanceProvider` or `Environment` the records are its exported instances (see
+    `genbase.utils.export_instancelib_chunked()`). Lists, tuples and generators yield one record per item. Other objects
+    are written as a single record. References to shared objects (see `genbase.utils.references`) do not cross records.
+
+    Args:
+        obj (Any): Object to export.
+        chunk_size (int, optional): Number of instances to export at a time. Defaults to `CHUNK_SIZE`.
+
+    Yields:
+        Iterator[Any]: Exported (possibly lazy) records.
+    """
+    if isinstance(obj, (Environment, InstanceProvider)):
+        for chunk in export_instancelib_chunked(obj, chunk_size=chunk_size):
+            yield from chunk
+    elif isinstance(obj, (list, tuple)) or hasattr(obj, '__next__'):
+        for item in obj:
+            with references():
+                yield lazy_config(item) if hasattr(item, '__dict__') else ExportWalk(lazy=True).export(item)
+    else:
+        with references():
+            yield lazy_config(obj)
+
+
+@contextmanager
+def _open(path_or_file: Union[str, IO[str]]):
+    if not isinstance(path_or_file, str):
+        yield path_or_file
+    elif path_or_file.endswith('.gz'):
+        with gzip.open(path_or_file, 'wt', encoding='utf-8') as f:
+            yield f
+    else:
+        with open(path_or_file, 'w', encoding='utf-8') as f:
+            yield f
+
+
+def write_json(obj: Any, path_or_file: Union[str, IO[str]], buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> None:
+    """Write the config of an object to JSON incrementally, with bounded memory.
+
+    Example:
+        Write an environment with millions of instances without first building its config:
+
+        >>> from genbase.stream import write_json
+        >>> write_json(environment, 'environment.json.gz')
+
+    Args:
+        obj (Any): Object to export.
+        path_or_file (Union[str, IO[str]]): File path or text file handle. Paths ending in `.gz` are GZIP-compressed.
+        buffer_size (int, optional): Number of characters to collect before writing. Defaults to
+            `io.DEFAULT_BUFFER_SIZE`.
+    """
+    with _open(path_or_file) as f, references():
+        _write_chunks(f, iter_json(lazy_config(obj)), buffer_size=buffer_size)
+
+
+def write_jsonl(obj: Any,
+                path_or_file: Union[str, IO[str]],
+                buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+                chunk_size: int = CHUNK_SIZE) -> None:
+    """Write an object to JSONL incrementally, with one record per instance (see `iter_records()`).
+
+    Example:
+        >>> from genbase.stream import write_jsonl
+        >>> write_jsonl(environment, 'environment.jsonl')
+
+    Args:
+        obj (Any): Object to export.
+        path_or_file (Union[str, IO[str]]): File path or text file handle. Paths ending in `.gz` are GZIP-compressed.
+        buffer_size (int, optional): Number of characters to collect before writing. Defaults to
+            `io.DEFAULT_BUFFER_SIZE`.
+        chunk_size (int, optional): Number of instances to export at a time. Defaults to `CHUNK_SIZE`.
+    """
+    def chunks():
+        for record in iter_records(obj, chunk_size=chunk_size):
+            yield from iter_json(record)
+            yield '\n'
+
+    with _open(path_or_file) as f:
+        _write_chunks(f, chunks(), buffer_size=buffer_size)
+
+
+def _write_chunks(f: IO[str], chunks: Iterator[str], buffer_size: int) -> None:
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            f.write(''.join(buffer))
+            buffer, size = [], 0
+    f.write(''.join(buffer))
@@ -0,0 +1,34 @@
+import json
+
+from genbase.bench.__main__ import main
+from genbase.bench.importing import importing
+from genbase.bench.serialization import serialization
+from genbase.bench.startup import startup
+
+
+def test_startup():
+    results = startup(['genbase'], repeat=2)['modules']['genbase']
+    assert results['cold']['seconds'] > 0
+    assert len(results['warm']['runs']) == 2
+    assert results['warm']['seconds'] > 0
+
+
+def test_startup_cli(tmp_path):
+    output = tmp_path / 'startup.json'
+    main(['startup', '--modules', 'genbase.mixin', '--repeat', '1', '--output', str(output)])
+    results = json.loads(output.read_text())
+    assert results['benchmark'] == 'startup'
+    assert 'environment' in results
+    assert 'genbase.mixin' in results['modules']
+
+
+def test_serialization():
+    results = serialization(size=100, formats=['json', 'msgpack'], repeat=1)['formats']
+    assert set(results.keys()) == {'json', 'msgpack'}
+    assert results['msgpack']['size_bytes'] < results['json']['size_bytes']
+
+
+def test_importing():
+    results = importing(shards=2, rows=20, n_jobs=[2], executors=['thread'], repeat=1)['settings']
+    assert set(results.keys()) == {'serial', 'thread-2'}
+    assert results['thread-2']['seconds'] > 0
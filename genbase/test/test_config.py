@@ -0,0 +1,168 @@
+import json
+
+import numpy as np
+import pytest
+
+from genbase import Configurable
+
+
+class Arrays(Configurable):
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = b
+
+
+@pytest.fixture
+def arrays():
+    return Arrays(np.arange(6.0).reshape(2, 3), {'x': np.ones(2, dtype='int16')})
+
+
+def test_to_config(arrays):
+    assert arrays.to_config() == {'__class__': 'test_config.Arrays',
+                                  'a': [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+                                  'b': {'x': [1, 1]}}
+
+
+def test_to_config_base64(arrays):
+    config = arrays.to_config(array_encoding='base64')
+    assert config['a']['__ndarray__'] == 'base64'
+    assert config['b']['x']['dtype'] == np.dtype('int16').str
+
+
+def test_json_roundtrip(arrays):
+    read = Arrays.from_json(arrays.to_json(array_encoding='base64'))
+    assert read.a.dtype == arrays.a.dtype
+    np.testing.assert_array_equal(read.a, arrays.a)
+    np.testing.assert_array_equal(read.b['x'], arrays.b['x'])
+
+
+@pytest.mark.parametrize('encoding', ['list', 'base64', 'npy'])
+def test_write_read_json(arrays, tmp_path, encoding):
+    path = str(tmp_path / 'arrays.json')
+    arrays.write_json(path, array_encoding=encoding)
+    read = Arrays.read_json(path)
+    np.testing.assert_array_equal(read.a, arrays.a)
+    np.testing.assert_array_equal(read.b['x'], arrays.b['x'])
+    assert (tmp_path / 'arrays.json_arrays').is_dir() == (encoding == 'npy')
+
+
+def test_to_json_registered_exporter(arrays):
+    import srsly
+
+    from genbase import utils
+    utils.register_exporter(np.ndarray, lambda array: {'shape': list(array.shape)})
+    try:
+        assert srsly.json_loads(arrays.to_json())['a'] == {'shape': [2, 3]}
+        assert srsly.json_loads(arrays.to_json(array_encoding='list'))['a'] == arrays.a.tolist()
+        assert utils.EXPORTERS[np.ndarray](arrays.a) == {'shape': [2, 3]}
+    finally:
+        del utils.EXPORTERS[np.ndarray]
+        utils._clear_exporter_caches()
+
+
+def test_msgpack_roundtrip(arrays):
+    read = Arrays.from_msgpack(arrays.to_msgpack())
+    assert isinstance(read.a, np.ndarray)
+    np.testing.assert_array_equal(read.a, arrays.a)
+    np.testing.assert_array_equal(read.b['x'], arrays.b['x'])
+
+
+@pytest.mark.parametrize('write', ['write_json', 'write_msgpack'])
+def test_write_read_msgpack(arrays, tmp_path, write):
+    path = str(tmp_path / 'arrays.msgpack')
+    getattr(arrays, write)(path)
+    for read in (Arrays.read_json(path), Arrays.read_msgpack(path), Arrays.from_msgpack(path)):
+        np.testing.assert_array_equal(read.a, arrays.a)
+        assert read.b['x'].dtype == np.int16
+
+
+@pytest.mark.parametrize('encoding', ['list', 'base64', 'npy'])
+def test_write_msgpack_encoding(arrays, tmp_path, encoding):
+    import srsly
+
+    path = str(tmp_path / 'arrays.msgpack')
+    arrays.write_json(path, array_encoding=encoding)
+    raw = srsly.read_msgpack(path)
+    assert isinstance(raw['a'], list) if encoding == 'list' else raw['a']['__ndarray__'] == encoding
+    read = Arrays.read_json(path)
+    np.testing.assert_array_equal(read.a, arrays.a)
+    assert (tmp_path / 'arrays.msgpack_arrays').is_dir() == (encoding == 'npy')
+    assert isinstance(srsly.msgpack_loads(arrays.to_msgpack(array_encoding='list'))['a'], list)
+
+
+def test_array_encoding_unsupported(arrays, tmp_path):
+    with pytest.raises(ValueError):
+        arrays.to_json(array_encoding='native')
+    with pytest.raises(ValueError):
+        arrays.write_json(str(tmp_path / 'arrays.json'), array_encoding='native')
+    with pytest.raises(ValueError):
+        arrays.to_msgpack(array_encoding='npy')
+
+    objects = Arrays(np.array(['a', 1], dtype=object))
+    path = str(tmp_path / 'objects.msgpack')
+    objects.write_json(path)
+    assert Arrays.from_msgpack(objects.to_msgpack()).a == Arrays.read_json(path).a == ['a', 1]
+
+
+def test_from_config_shared():
+    shared = {'x': [1, 2]}
+    arrays = Arrays(shared, {'y': shared})
+    assert arrays.to_config()['b'] == {'y': {'x': [1, 2]}}
+    config = arrays.to_config(dedupe=True)
+    assert config['b'] == {'y': {'$ref': '#/a'}}
+    read = Arrays.from_config(config)
+    assert read.b['y'] is read.a
+
+
+def test_from_config_cycle(tmp_path):
+    arrays = Arrays(np.ones(2))
+    arrays.b = {'parent': arrays}
+    path = str(tmp_path / 'arrays.json')
+    arrays.write_json(path)
+    read = Arrays.read_json(path)
+    np.testing.assert_array_equal(read.a, arrays.a)
+    assert read.b['parent']['b'] is read.b
+    assert read.b['parent']['a'] is read.a
+
+
+def test_write_json_blob_store(tmp_path):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler().fit(np.random.default_rng(0).random((10, 10_000)))
+    path = str(tmp_path / 'scalers.json')
+    Arrays(scaler, [scaler, scaler]).write_json(path, blob_store=str(tmp_path / 'blobs'))
+    assert len(list((tmp_path / 'blobs').iterdir())) == 1
+    read = Arrays.read_json(path)
+    assert read.b[0] is read.b[1]  # shared reference
+    np.testing.assert_array_equal(read.a.load().mean_, scaler.mean_)
+
+
+def test_meta_info_render_shared():
+    from genbase import MetaInfo
+
+    class Renderer:
+        def __init__(self, config):
+            self.config = config
+
+        def as_html(self, **renderargs):
+            return self.config
+
+    shared = {'x': [1, 2]}
+    meta = MetaInfo(type='test', subtype='shared', renderer=Renderer)
+    meta.content = lambda: {'a': shared, 'b': shared}
+    assert meta.html['CONTENT'] == {'a': shared, 'b': shared}
+    assert meta.to_config(dedupe=True)['CONTENT']['b'] == {'$ref': '#/CONTENT/a'}
+
+
+def test_meta_info_json_shared():
+    from genbase import MetaInfo
+    from genbase.utils import resolve_references
+
+    shared = {'x': [1, 2]}
+    meta = MetaInfo(type='test')
+    meta.content = lambda: {'a': shared, 'b': shared}
+    config = json.loads(meta.to_json())
+    assert config['CONTENT']['b'] == {'$ref': '#/CONTENT/a'}
+    content = resolve_references(config)['CONTENT']
+    assert content['b'] is content['a']
+    assert content['a'] == shared
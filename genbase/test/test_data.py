@@ -0,0 +1,408 @@
+import pandas as pd
+import pytest
+
+from genbase.data import import_data, train_test_split
+
+
+@pytest.fixture
+def environment():
+    df = pd.DataFrame({'text': [f'text {i}' for i in range(20)], 'label': [f'label_{i % 3}' for i in range(20)]})
+    return train_test_split(import_data(df, data_cols='text', label_cols='label'), train_size=0.5)
+
+
+def summary(environment):
+    return ({key: (instance.data, environment.labels.get_labels(key)) for key, instance in environment.dataset.items()},
+            {name: sorted(provider) for name, provider in environment.named_providers.items()},
+            environment.labels.labelset)
+
+
+@pytest.mark.parametrize('extension', ['.parquet', '.arrow', '.feather'])
+def test_write_read_environment(environment, tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    from genbase.data.arrow import is_environment_file, read_environment, write_environment
+
+    path = str(tmp_path / f'environment{extension}')
+    write_environment(environment, path)
+    assert is_environment_file(path)
+    assert summary(read_environment(path)) == summary(environment)
+    assert summary(import_data(path, data_cols='text', label_cols='label')) == summary(environment)
+
+
+def test_import_columnar_label_map(environment, tmp_path):
+    pytest.importorskip('pyarrow')
+    from genbase.data.arrow import write_environment
+
+    path = str(tmp_path / 'environment.parquet')
+    write_environment(environment, path)
+    imported = import_data(path, data_cols='text', label_cols='label',
+                           label_map={'label_0': 'zero', 'label_1': 'one', 'label_2': 'two'})
+    assert imported.labels.labelset == frozenset({'zero', 'one', 'two'})
+
+
+def test_import_parquet_pandas(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'data.parquet')
+    pd.DataFrame({'text': ['a', 'b'], 'label': ['x', 'y']}).to_parquet(path)
+    assert len(import_data(path, data_cols='text', label_cols='label').dataset) == 2
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'text': [f'text {i}' for i in range(25)],
+                         'title': [f'title {i}' for i in range(25)],
+                         'label': [i % 3 for i in range(25)],
+                         'topic': ['a', 'b', ''] * 8 + ['a'],
+                         'unused': range(25)})
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.tsv', '.jsonl'])
+@pytest.mark.parametrize('data_cols,label_cols', [('text', 'label'), (['text', 'title'], ['label', 'topic'])])
+def test_import_chunksize(df, tmp_path, extension, data_cols, label_cols):
+    path = str(tmp_path / f'data{extension}')
+    if extension == '.jsonl':
+        df.to_json(path, orient='records', lines=True)
+    else:
+        df.to_csv(path, sep='\t' if extension == '.tsv' else ',', index=False)
+    expected = summary(import_data(path, data_cols=data_cols, label_cols=label_cols))
+    assert summary(import_data(path, data_cols=data_cols, label_cols=label_cols, chunksize=10)) == expected
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+@pytest.mark.parametrize('archive', [False, True])
+def test_import_parallel(df, tmp_path, executor, archive):
+    for i in range(4):
+        df.iloc[i::4].to_csv(tmp_path / f'shard_{i}.csv', index=False)
+    path = str(tmp_path / '*.csv')
+    if archive:
+        import zipfile
+        path = str(tmp_path / 'shards.zip')
+        with zipfile.ZipFile(path, 'w') as f:
+            for i in range(4):
+                f.write(tmp_path / f'shard_{i}.csv', f'shard_{i}.csv')
+    expected = summary(import_data(path, data_cols='text', label_cols=['label', 'topic']))
+    assert len(expected[1]) == 4
+    assert summary(import_data(path, data_cols='text', label_cols=['label', 'topic'],
+                               n_jobs=2, executor=executor)) == expected
+
+
+def test_import_key_values_extraction(df, tmp_path):
+    from genbase.data import pandas_to_instancelib
+
+    shards = {f'shard_{i}': df.iloc[i::2] for i in range(2)}
+    expected = summary(pandas_to_instancelib(shards, data_cols=['text', 'title'], label_cols=['label', 'topic']))
+    assert summary(import_data(shards, data_cols=['text', 'title'], label_cols=['label', 'topic'])) == expected
+
+    # Non-integer indices are kept as identifiers
+    path = str(tmp_path / 'data.csv')
+    df.assign(key=[f'key{i}' for i in range(len(df))]).to_csv(path, index=False)
+    env = import_data(path, data_cols='text', label_cols='label', index_col='key', usecols=['key', 'text', 'label'],
+                      chunksize=10)
+    assert env.dataset['key3'].data == 'text 3'
+    env = import_data({'a': path}, data_cols='text', label_cols='label', index_col='key')
+    assert env.dataset['a_key3'].data == 'text 3'
+
+
+def test_import_parallel_executor(df, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    for i in range(2):
+        df.iloc[i::2].to_csv(tmp_path / f'shard_{i}.csv', index=False)
+    path = str(tmp_path / '*.csv')
+    expected = summary(import_data(path, data_cols='text', label_cols='label'))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert summary(import_data(path, data_cols='text', label_cols='label', n_jobs=2, executor=executor)) == expected
+    with pytest.raises(ValueError):
+        import_data(path, data_cols='text', label_cols='label', n_jobs=2, executor='gpu')
+
+
+def test_import_cache(df, tmp_path):
+    from genbase.data.cache import ParseCache
+
+    path = str(tmp_path / 'data.csv')
+    df.to_csv(path, index=False)
+    cache = ParseCache(str(tmp_path / 'cache'))
+    expected = summary(import_data(path, data_cols='text', label_cols='label'))
+
+    assert summary(import_data(path, data_cols='text', label_cols='label', cache=cache)) == expected
+    assert len(cache.entries()) == 1
+    assert summary(import_data(path, data_cols='text', label_cols='label', cache=cache)) == expected
+    assert len(cache.entries()) == 1
+
+    # Different arguments and changed files are separate entries
+    import_data(path, data_cols='title', label_cols='label', cache=cache)
+    import_data(path, data_cols='text', label_cols='label', label_map={0: 'a', 1: 'b', 2: 'c'}, cache=cache)
+    assert len(cache.entries()) == 3
+    df.iloc[:10].to_csv(path, index=False)
+    assert len(import_data(path, data_cols='text', label_cols='label', cache=cache).dataset) == 10
+    assert len(cache.entries()) == 4
+
+    cache.invalidate(path)
+    assert cache.entries() == []
+
+
+def test_import_cache_label_map_closure(df, tmp_path):
+    import threading
+
+    from genbase.data.cache import ParseCache
+
+    def make(mapping):
+        return lambda label: mapping[label]
+
+    path = str(tmp_path / 'data.csv')
+    df.to_csv(path, index=False)
+    cache = ParseCache(str(tmp_path / 'cache'))
+    first = import_data(path, data_cols='text', label_cols='label', label_map=make({'0': 'a', '1': 'b', '2': 'c'}),
+                        cache=cache)
+    second = import_data(path, data_cols='text', label_cols='label', label_map=make({'0': 'x', '1': 'y', '2': 'z'}),
+                         cache=cache)
+    assert set(first.labels.labelset) == {'a', 'b', 'c'} and set(second.labels.labelset) == {'x', 'y', 'z'}
+    assert len(cache.entries()) == 2
+
+    # Closures over values that cannot be fingerprinted are not cached
+    lock = threading.Lock()
+    assert cache.entry_key(path, ['text'], ['label'], label_map=lambda label: lock and label) is None
+    import_data(path, data_cols='text', label_cols='label', label_map=lambda label: lock and str(label), cache=cache)
+    assert len(cache.entries()) == 2
+
+
+def test_import_cache_glob_eviction(df, tmp_path):
+    from genbase.data.cache import ParseCache
+
+    for i in range(2):
+        df.iloc[i::2].to_csv(tmp_path / f'shard_{i}.csv', index=False)
+    path = str(tmp_path / '*.csv')
+    cache = ParseCache(str(tmp_path / 'cache'), key='hash')
+    expected = summary(import_data(path, data_cols='text', label_cols='label'))
+    assert summary(import_data(path, data_cols='text', label_cols='label', cache=cache)) == expected
+    assert summary(import_data(path, data_cols='text', label_cols='label', cache=cache)) == expected
+
+    import_data(str(tmp_path / 'shard_0.csv'), data_cols='text', label_cols='label', cache=cache)
+    assert len(cache.entries()) == 2
+    cache.evict(max_size=cache.size - 1)
+    assert len(cache.entries()) == 1
+    cache.invalidate()
+    assert cache.size == 0
+
+
+@pytest.mark.parametrize('extension', ['.parquet', '.feather', '.arrow'])
+def test_import_columnar_projection(df, tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    from genbase.data.arrow import read_dataframe
+
+    path = str(tmp_path / f'data{extension}')
+    if extension == '.parquet':
+        df.to_parquet(path, row_group_size=5)
+    else:
+        df.to_feather(path)
+
+    assert list(read_dataframe(path, columns=['text', 'label'], format='infer').columns) == ['text', 'label']
+    env = import_data(path, data_cols='text', label_cols='label')
+    assert summary(env)[0] == summary(import_data(df, data_cols='text', label_cols='label'))[0]
+
+    filtered = import_data(path, data_cols='text', label_cols='label', filters=[('unused', '>=', 20)])
+    assert sorted(instance.data for instance in filtered.dataset.values()) == [f'text {i}' for i in range(20, 25)]
+    filtered = import_data(path, data_cols='text', label_cols='label',
+                           filters=[[('label', '==', 0)], [('topic', '=', 'b')]])
+    assert len(filtered.dataset) == len(df[(df['label'] == 0) | (df['topic'] == 'b')])
+
+
+@pytest.mark.parametrize('data_cols,label_cols', [('text', 'label'), (['text', 'title'], ['label', 'topic'])])
+def test_import_datasets(df, data_cols, label_cols):
+    datasets = pytest.importorskip('datasets')
+    from genbase.data import pandas_to_instancelib
+
+    dataset = datasets.Dataset.from_pandas(df, preserve_index=False)
+    expected = summary(pandas_to_instancelib(dataset.to_pandas(), data_cols=data_cols, label_cols=label_cols))
+    assert summary(import_data(dataset, data_cols=data_cols, label_cols=label_cols, chunksize=7)) == expected
+
+    splits = datasets.DatasetDict({'train': dataset.select(range(20)), 'test': dataset.select(range(20, 25))})
+    expected = summary(pandas_to_instancelib({key: split.to_pandas() for key, split in splits.items()},
+                                             data_cols=data_cols, label_cols=label_cols))
+    env = import_data(splits, data_cols=data_cols, label_cols=label_cols)
+    assert summary(env) == expected
+    assert set(env.named_providers) == {'train', 'test'}
+
+    iterable = datasets.IterableDatasetDict({key: split.to_iterable_dataset() for key, split in splits.items()})
+    assert summary(import_data(iterable, data_cols=data_cols, label_cols=label_cols, chunksize=3)) == expected
+
+
+@pytest.fixture
+def imbalanced():
+    labels = ['a'] * 60 + ['b'] * 30 + ['c'] * 10
+    return import_data(pd.DataFrame({'text': [f'text {i}' for i in range(100)], 'label': labels}),
+                       data_cols='text', label_cols='label')
+
+
+def label_counts(environment, provider):
+    from collections import Counter
+    return Counter(label for key in provider for label in environment.labels.get_labels(key))
+
+
+@pytest.mark.parametrize('train_size', [0.8, 0.55, 37])
+def test_train_test_split_stratified(imbalanced, train_size):
+    env = train_test_split(imbalanced, train_size=train_size, stratify=True, seed=1)
+    n_train = round(train_size * 100) if isinstance(train_size, float) else train_size
+    assert len(env['train']) == n_train and len(env['test']) == 100 - n_train
+    assert set(env['train']).isdisjoint(env['test'])
+    counts = label_counts(env, env['train'])
+    for label, total in {'a': 60, 'b': 30, 'c': 10}.items():
+        assert abs(counts[label] - total * n_train / 100) < 1
+
+
+def test_train_test_split_seed(imbalanced):
+    from genbase.data.split import Splitter
+
+    first = sorted(train_test_split(imbalanced, train_size=0.5, seed=3)['train'])
+    assert sorted(train_test_split(imbalanced, train_size=0.5, seed=3)['train']) == first
+    assert sorted(train_test_split(imbalanced, train_size=0.5, seed=4)['train']) != first
+
+    splitter = Splitter(imbalanced, seed=3)
+    train, _ = splitter.train_test_split(0.5)
+    assert sorted(splitter.train_test_split(0.5)[0]) != sorted(train)
+    assert sorted(splitter.reset_seed().train_test_split(0.5)[0]) == sorted(train)
+    with pytest.raises(ValueError):
+        splitter.train_test_split(101)
+
+
+@pytest.mark.parametrize('stratify', [True, False])
+def test_k_fold_split(imbalanced, stratify):
+    from genbase.data import k_fold_split
+
+    folds = k_fold_split(imbalanced, n_splits=5, stratify=stratify, seed=0)
+    assert len(folds) == 5
+    tests = [set(test) for _, test in folds]
+    assert set().union(*tests) == set(imbalanced.dataset.key_list)
+    assert sum(map(len, tests)) == 100
+    for train, test in folds:
+        assert len(test) == 20 and set(train).isdisjoint(test) and len(train) == 80
+        assert train.dataset is test.dataset is folds[0][0].dataset
+        if stratify:
+            assert label_counts(imbalanced, test) == {'a': 12, 'b': 6, 'c': 2}
+    assert [sorted(test) for _, test in k_fold_split(imbalanced, n_splits=5, stratify=stratify, seed=0)] == \
+        [sorted(test) for test in tests]
+
+
+def test_rename_labels_dict(df):
+    import instancelib as il
+
+    from genbase.data import rename_labels
+
+    env = import_data(df, data_cols='text', label_cols=['label', 'topic'])
+    mapping = {'0': 'zero', '1': 'one', '2': 'one', 'a': 'x', 'b': 'x', '': 'empty'}
+    expected = il.MemoryLabelProvider.rename_labels(env.labels, mapping)
+    renamed = rename_labels(env, mapping).labels
+    assert renamed.labelset == expected.labelset
+    assert renamed._labeldict == expected._labeldict
+    assert renamed._labeldict_inv == expected._labeldict_inv
+    assert len({id(labels) for labels in renamed._labeldict.values()}) == len(renamed._labeldict)
+    with pytest.raises(KeyError):
+        rename_labels(env, {'0': 'zero'})
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl', None])
+def test_import_sample(tmp_path, extension):
+    from genbase.data.sample import Sampler
+
+    df = pd.DataFrame({'text': [f'text {i}' for i in range(1000)], 'label': [['a', 'b', 'c', 'c'][i % 4] for i in range(1000)]})
+    dataset = df
+    if extension is not None:
+        dataset = str(tmp_path / f'data{extension}')
+        if extension == '.jsonl':
+            df.to_json(dataset, orient='records', lines=True)
+        else:
+            df.to_csv(dataset, index=False)
+
+    def texts(**kwargs):
+        return sorted(instance.data for instance in import_data(dataset, data_cols='text', label_cols='label',
+                                                                **kwargs).dataset.values())
+
+    assert len(texts(sample=100)) == 100
+    assert texts(sample=100, chunksize=33) == texts(sample=100, chunksize=500)
+    fraction = texts(sample=0.1, chunksize=70)
+    assert 50 < len(fraction) < 150 and fraction == texts(sample=0.1)
+    assert texts(sample=Sampler(frac=0.1, seed=1)) != fraction
+
+    env = import_data(dataset, data_cols='text', label_cols='label', sample=Sampler(per_label=30), chunksize=100)
+    assert label_counts(env, env.dataset) == {'a': 30, 'b': 30, 'c': 30}
+    assert all(env.dataset[key].data == f'text {key}' for key in env.dataset.key_list)
+    env = import_data(dataset, data_cols='text', label_cols='label', sample=Sampler(n=50, frac=0.5, per_label=20))
+    assert len(env.dataset) == 50 and max(label_counts(env, env.dataset).values()) <= 20
+
+
+def test_import_sample_datasets(df):
+    datasets = pytest.importorskip('datasets')
+    from genbase.data.sample import Sampler
+
+    def summary_sample(dataset, **kwargs):
+        return summary(import_data(dataset, data_cols='text', label_cols='label', **kwargs))
+
+    dataset = datasets.Dataset.from_pandas(df, preserve_index=False)
+    for sample in (5, 0.5, Sampler(per_label=3, seed=1)):
+        expected = summary_sample(df, sample=sample)
+        assert summary_sample(dataset, sample=sample, chunksize=7) == expected
+        assert summary_sample(dataset.to_iterable_dataset(), sample=sample, chunksize=7) == expected
+
+    empty = Sampler(n=5).sample([], columns=['text', 'label'])
+    assert len(empty) == 0 and list(empty.columns) == ['text', 'label']
+    assert len(import_data(dataset.select([]), data_cols='text', label_cols='label', sample=5).dataset) == 0
+
+
+def test_import_sample_glob(df, tmp_path):
+    for i in range(2):
+        df.iloc[i::2].to_csv(tmp_path / f'shard_{i}.csv', index=False)
+    env = import_data(str(tmp_path / '*.csv'), data_cols='text', label_cols='label', sample=5)
+    assert {name: len(provider) for name, provider in env.named_providers.items()} == \
+        {str(tmp_path / 'shard_0.csv'): 5, str(tmp_path / 'shard_1.csv'): 5}
+    with pytest.raises(ValueError):
+        import_data(df, data_cols='text', label_cols='label', sample=1.5)
+
+
+def test_content_index():
+    from genbase.data import deduplicate, lookup
+    from genbase.data.index import ContentIndex, content_index
+
+    texts = ['a', 'b', 'a', 'c', 'b', 'a', '1']
+    env = import_data(pd.DataFrame({'text': texts, 'label': range(7)}), data_cols='text', label_cols='label', index=True)
+    index = content_index(env)
+    assert content_index(env) is index and len(index) == 7
+
+    assert sorted(lookup(env, 'a')) == [0, 2, 5]
+    assert lookup(env, 'd') == [] and 'c' in index and 'd' not in index
+    assert [sorted(keys) for keys in index.lookup_many(['b', 'c', 1])] == [[1, 4], [3], []]
+    assert sorted(map(sorted, index.duplicates())) == [[0, 2, 5], [1, 4]]
+
+    unique = deduplicate(env)
+    assert sorted(unique) == [0, 1, 3, 6]
+    assert sorted(env.dataset[key].data for key in unique) == ['1', 'a', 'b', 'c']
+    assert sorted(ContentIndex(env.dataset).deduplicate(keep='last')) == [3, 4, 5, 6]
+    with pytest.raises(ValueError):
+        deduplicate(env, keep='middle')
+
+
+def test_content_index_changes():
+    from instancelib.instances.text import TextInstanceProvider
+
+    from genbase.data import lookup
+    from genbase.data.index import ContentIndex, content_index
+
+    env = import_data(pd.DataFrame({'text': ['a', 'b', 'c'], 'label': range(3)}), data_cols='text', label_cols='label')
+    index = content_index(env)
+    assert lookup(env, 'b') == [1]
+
+    env.dataset.discard(env.dataset[0])
+    assert index.stale
+    assert lookup(env, 'a') == [] and len(index) == 2 and content_index(env) is index
+    assert not index.stale
+    new = env.create(data='a', vector=None)
+    env.dataset.add(new)
+    assert lookup(env, 'a') == [new.identifier]
+
+    # Replacing an instance under the same identifier keeps the size and identifiers of the dataset
+    env.dataset[1] = env.create(data='d', vector=None)
+    assert not index.stale
+    index.refresh()
+    assert lookup(env, 'b') == [] and lookup(env, 'd') == [1]
+
+    # Unhashable data is compared on equality
+    lists = ContentIndex(TextInstanceProvider.from_data([[1, 2], [3], [1, 2]]))
+    assert lists.duplicates() == [[0, 2]] and lists.lookup([3]) == [1]
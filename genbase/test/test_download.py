@@ -0,0 +1,120 @@
+import os
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from genbase.data import import_data
+from genbase.data.download import Downloader, is_url
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves `server.files` with ETag/Last-Modified validators and `Range`/`If-Range` support."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        files, requests = self.server.files, self.server.requests
+        if self.path not in files:
+            self.send_error(404)
+            return
+        content, version = files[self.path]
+        etag, last_modified = f'"{version}"', formatdate(1_600_000_000 + version, usegmt=True)
+        requests.append((self.path, dict(self.headers)))
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        if 'Range' in self.headers and self.headers.get('If-Range') in (etag, last_modified):
+            start = int(self.headers['Range'].split('=')[1].split('-')[0])
+            if start >= len(content):
+                self.send_response(416)
+                self.end_headers()
+                return
+        self.send_response(206 if start else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Content-Length', str(len(content) - start))
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.files, httpd.requests = {}, []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def csv(n: int) -> bytes:
+    return pd.DataFrame({'text': [f'text {i}' for i in range(n)], 'label': [i % 2 for i in range(n)]}) \
+        .to_csv(index=False).encode('utf-8')
+
+
+def test_fetch_revalidate(server, tmp_path):
+    server.files['/data.csv'] = (csv(10), 1)
+    downloader = Downloader(str(tmp_path))
+    url = server.url + '/data.csv'
+    assert is_url(url) and not is_url(str(tmp_path))
+
+    path = downloader.fetch(url)
+    assert path.endswith('data.csv') and open(path, 'rb').read() == csv(10)
+    assert downloader.fetch(url) == path
+    assert server.requests[-1][1]['If-None-Match'] == '"1"'
+    assert len(os.listdir(tmp_path)) == 2  # file and validators
+
+    server.files['/data.csv'] = (csv(20), 2)
+    assert open(downloader.fetch(url), 'rb').read() == csv(20)
+
+    n_requests = len(server.requests)
+    assert Downloader(str(tmp_path), revalidate=False).fetch(url) == path
+    assert len(server.requests) == n_requests
+
+    downloader.invalidate(url)
+    assert os.listdir(tmp_path) == []
+
+
+def test_fetch_resume(server, tmp_path):
+    content = csv(1000)
+    server.files['/data.csv'] = (content, 1)
+    downloader = Downloader(str(tmp_path))
+    url = server.url + '/data.csv'
+    path = downloader.fetch(url)
+
+    # Interrupted download: resumed with a ranged request
+    os.replace(path, path + '.part')
+    with open(path + '.part', 'r+b') as f:
+        f.truncate(100)
+    assert open(downloader.fetch(url), 'rb').read() == content
+    assert server.requests[-1][1]['Range'] == 'bytes=100-'
+
+    # Changed file: If-Range does not match, so downloaded again from scratch
+    os.replace(path, path + '.part')
+    with open(path + '.part', 'r+b') as f:
+        f.truncate(100)
+    server.files['/data.csv'] = (csv(500), 2)
+    assert open(downloader.fetch(url), 'rb').read() == csv(500)
+
+
+def test_import_download(server, tmp_path):
+    for i in range(3):
+        server.files[f'/shard_{i}.csv'] = (csv(10 + i), 1)
+    urls = {f'shard_{i}': f'{server.url}/shard_{i}.csv' for i in range(3)}
+    downloader = Downloader(str(tmp_path), max_workers=3)
+
+    env = import_data(urls, data_cols='text', label_cols='label', download=downloader)
+    assert {name: len(provider) for name, provider in env.named_providers.items()} == \
+        {'shard_0': 10, 'shard_1': 11, 'shard_2': 12}
+    assert len(import_data(urls['shard_0'], data_cols='text', label_cols='label', download=str(tmp_path)).dataset) == 10
+    assert sum(1 for p, _ in server.requests if p == '/shard_0.csv') == 2
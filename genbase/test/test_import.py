@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET_US = 250_000
+HEAVY_MODULES = ['instancelib', 'pandas', 'sklearn', 'matplotlib', 'plotly', 'IPython', 'srsly', 'i18n']
+
+
+def importtime(statement: str) -> dict:
+    """Run `statement` in a fresh interpreter with `-X importtime`, and return cumulative import time per module."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time_budget():
+    times = importtime('import genbase')
+    assert 'genbase' in times
+    assert times['genbase'] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize('module', HEAVY_MODULES)
+def test_import_is_lazy(module):
+    assert module not in importtime('import genbase')
+
+
+def test_public_names_resolve():
+    import genbase
+
+    for name in genbase._LAZY_IMPORTS:
+        assert getattr(genbase, name) is not None
+        assert name in dir(genbase)
+
+
+def test_unknown_attribute():
+    import genbase
+
+    with pytest.raises(AttributeError):
+        genbase.does_not_exist
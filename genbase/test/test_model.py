@@ -0,0 +1,227 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+from instancelib.machinelearning import AbstractClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from genbase.data import import_data
+from genbase.model import (_MODEL_TYPE_CACHE, MODEL_ADAPTERS, import_model, model_type, register_model_adapter,
+                           sklearn_model)
+
+
+@pytest.fixture
+def environment():
+    df = pd.DataFrame({'text': [f'{"good" if i % 2 else "bad"} text {i}' for i in range(20)],
+                       'label': ['pos' if i % 2 else 'neg' for i in range(20)]})
+    return import_data(df, data_cols='text', label_cols='label')
+
+
+class Custom:
+    def predict(self, X):
+        return X
+
+
+def test_sklearn_model():
+    assert sklearn_model(Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]))
+    assert sklearn_model(LogisticRegression()) and sklearn_model(TfidfVectorizer())
+    assert not sklearn_model(Custom()) and not sklearn_model('model.onnx')
+    assert model_type(LogisticRegression()) == 'sklearn' and model_type(Custom()) is None
+
+
+def test_import_sklearn(environment):
+    pipeline = Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())])
+    model = import_model(pipeline, environment, train=0.5)
+    assert isinstance(model, AbstractClassifier)
+    assert isinstance(import_model(model), AbstractClassifier)
+    with pytest.raises(NotImplementedError):
+        import_model(TfidfVectorizer(), environment)
+
+
+def test_register_model_adapter(environment):
+    calls = []
+
+    def adapt(model, environment, train, label_map):
+        calls.append((model, train))
+        return 'adapted'
+
+    try:
+        with pytest.raises(NotImplementedError):
+            import_model(Custom(), environment)
+        register_model_adapter('custom', detect=lambda cls: issubclass(cls, Custom), adapt=adapt)
+        assert model_type(Custom()) == 'custom'
+        assert import_model(Custom(), environment) == 'adapted'
+        assert calls[0][1] is not None
+    finally:
+        MODEL_ADAPTERS.pop('custom')
+        _MODEL_TYPE_CACHE.clear()
+    assert model_type(Custom()) is None
+
+
+def test_batched(environment):
+    from genbase.model.batch import BatchedClassifier, iter_batches, predict_batched
+
+    model = import_model(Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]), environment, train=1.0)
+    batched = import_model(model, batch_size=3)
+    assert isinstance(batched, (AbstractClassifier, BatchedClassifier)) and batched.batch_size == 3
+    assert BatchedClassifier(batched, batch_size=5).model is model
+    with pytest.raises(ValueError):
+        BatchedClassifier(model, batch_size=0)
+
+    instances = [environment.dataset[key] for key in reversed(environment.dataset.key_list)]
+    expected = model.predict_proba(instances)
+    assert batched.predict_proba(instances) == expected
+    assert list(batched.iter_predict_proba(iter(instances))) == expected
+    assert list(predict_batched(model, (i for i in instances), batch_size=7)) == expected
+    assert batched.predict(instances) == model.predict(instances)
+    assert [key for key, _ in batched.predict(environment.dataset)] == list(environment.dataset.key_list)
+    assert len(batched.predict_proba(instances[0])) == 1
+
+    assert [len(batch) for batch in iter_batches(instances, 8)] == [8, 8, 4]
+    assert [len(keys) for keys, _ in batched.iter_predict_proba_raw(instances)] == [3] * 6 + [2]
+
+
+def test_cached(environment, tmp_path):
+    from genbase.model.cache import CachedClassifier, PredictionCache, model_fingerprint
+
+    model = import_model(Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]), environment, train=1.0)
+    cached = import_model(model, cache=True)
+    assert isinstance(cached, (AbstractClassifier, CachedClassifier))
+    assert cached.fingerprint == model_fingerprint(model) is not None
+
+    calls = []
+    predict_raw = type(model).predict_proba_instances_raw
+
+    def count_calls(self, batch, batch_size):
+        calls.append(len(batch))
+        return predict_raw(self, batch, batch_size)
+
+    with mock.patch.object(type(model), 'predict_proba_instances_raw', count_calls):
+        instances = list(environment.dataset.values())
+        expected = list(model.predict_proba(instances))
+        assert cached.predict_proba(instances) == expected
+        keys, matrix = next(cached.predict_proba_raw(instances + instances[:5]))
+        assert calls == [20] and matrix.shape == (25, 2) and keys[20:] == keys[:5]
+        keys, matrix = next(cached.predict_proba_raw(instances[::-1]))
+        assert calls == [20] and keys == [instance.identifier for instance in instances[::-1]]
+        assert (cached.cache.hits, cached.cache.misses) == (20, 45)
+        assert cached.predict(instances) == model.predict(instances)
+
+        # Same content under another identifier, and misses predicted in one batch
+        copy = environment.create(data=instances[0].data, vector=None)
+        _, matrix2 = next(cached.predict_proba_raw([copy] + instances[:1]))
+        assert calls == [20] and np.allclose(matrix2[0], matrix2[1])
+
+        # LRU eviction by count and bytes
+        cache = PredictionCache(max_entries=5)
+        assert CachedClassifier(model, cache=cache).fingerprint == cached.fingerprint
+        next(CachedClassifier(model, cache=cache).predict_proba_raw(instances))
+        assert len(cache) == 5 and cache.nbytes == 5 * 2 * 8
+        cache = PredictionCache(max_bytes=3 * 16)
+        next(CachedClassifier(model, cache=cache).predict_proba_raw(instances))
+        assert len(cache) == 3
+
+        # On-disk tier survives a new cache and is keyed on the fingerprint
+        disk = CachedClassifier(model, cache=PredictionCache(directory=str(tmp_path)), fingerprint='v1')
+        next(disk.predict_proba_raw(instances))
+        disk.cache.close()
+        n_calls = len(calls)
+        reopened = CachedClassifier(model, cache=PredictionCache(directory=str(tmp_path)), fingerprint='v1')
+        assert np.allclose(next(reopened.predict_proba_raw(instances))[1], matrix[::-1])
+        assert len(calls) == n_calls and reopened.cache.hits == 20
+        next(CachedClassifier(model, cache=reopened.cache, fingerprint='v2').predict_proba_raw(instances))
+        assert len(calls) == n_calls + 1
+
+        # Models imported from a file are identified by the file
+        import pickle
+
+        from genbase.data.cache import _file_hash
+        path = str(tmp_path / 'model.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump(model.innermodel, f)
+        from_file = import_model(path, label_map=['neg', 'pos'], cache=str(tmp_path / 'predictions'), batch_size=8)
+        assert from_file.fingerprint.startswith(_file_hash(path)) and from_file.model.batch_size == 8
+        assert from_file.predict_proba(instances) == expected
+        relabeled = import_model(path, label_map=['pos', 'neg'], cache=str(tmp_path / 'predictions'))
+        assert relabeled.fingerprint != from_file.fingerprint
+    assert model_fingerprint(model) == cached.fingerprint
+
+
+def test_cached_unpicklable(environment, tmp_path):
+    import copy
+    import threading
+
+    from genbase.model.cache import CachedClassifier, PredictionCache, model_fingerprint
+
+    model = copy.copy(import_model(Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]), environment,
+                                   train=1.0))
+    model.lock = threading.Lock()
+    assert model_fingerprint(model) is None
+
+    # Identified by the identity of the model, which is only unique within this process: never cached on disk
+    cache = PredictionCache(directory=str(tmp_path))
+    cached = CachedClassifier(model, cache=cache)
+    instances = list(environment.dataset.values())
+    assert cached.predict_proba(instances) == cached.predict_proba(instances)
+    assert cache.hits == 20 and len(cache) == 20
+    assert cache._db.execute('SELECT COUNT(*) FROM predictions').fetchone() == (0,)
+
+    versioned = CachedClassifier(model, cache=cache, fingerprint='v1')
+    versioned.predict_proba(instances)
+    assert cache._db.execute('SELECT COUNT(*) FROM predictions').fetchone() == (20,)
+
+
+def test_replicated(environment):
+    from genbase.model.cache import CachedClassifier
+    from genbase.model.replicas import ReplicatedClassifier
+
+    model = import_model(Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]), environment, train=1.0)
+    instances = list(environment.dataset.values())[::-1]
+    with import_model(model, n_jobs=2, batch_size=3) as replicated:
+        assert isinstance(replicated, (AbstractClassifier, ReplicatedClassifier)) and replicated.n_jobs == 2
+        assert replicated.predict_proba(instances) == model.predict_proba(instances)
+        assert replicated.predict(iter(instances)) == model.predict(instances)
+        assert [len(keys) for keys, _ in replicated.predict_proba_raw(instances)] == [3] * 6 + [2]
+        assert replicated.name == model.name
+    assert replicated.closed
+    with pytest.raises(RuntimeError):
+        replicated.predict(instances)
+
+    with import_model(model, cache=True, n_jobs=1) as cached:
+        assert isinstance(cached, CachedClassifier) and isinstance(cached.model, ReplicatedClassifier)
+        assert cached.predict_proba(instances) == model.predict_proba(instances)
+    assert cached.model.closed
+
+
+
+def test_replicated_onnx_label_map(environment, tmp_path):
+    path = tmp_path / 'model.onnx'
+    path.write_bytes(b'')
+    with mock.patch('ilonnx.build_data_model') as build, \
+            mock.patch('genbase.model.replicas.ReplicatedClassifier') as replicated:
+        import_model(str(path), environment, n_jobs=2)
+    classes = build.call_args.kwargs['classes']
+    assert sorted(classes) == sorted(environment.labels.labelset)
+    assert replicated.call_args.kwargs['label_map'] == classes
+
+def test_replicated_pack(environment):
+    from instancelib.instances.text import MemoryTextInstance
+
+    from genbase.model.replicas import _pack, _unpack
+
+    instances = list(environment.dataset.values())
+    packed = _pack(instances)
+    assert packed[0] is MemoryTextInstance
+    assert [vars(instance) for instance in _unpack(packed)] == \
+        [{k: v for k, v in vars(instance).items() if k != '__orig_class__'} for instance in instances]
+
+    class Other(MemoryTextInstance):
+        pass
+
+    others = [Other(1, 'text', None)]
+    assert _pack(others) is others and _pack(instances + others) is not None
+    assert _unpack(_pack(instances + others))[-1] is others[0]
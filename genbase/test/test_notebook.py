@@ -0,0 +1,42 @@
+import pytest
+import requests
+
+from genbase.ui import notebook
+from genbase.ui.plot import PLOTLYJS_FILE
+
+
+@pytest.fixture
+def requests_get(monkeypatch):
+    calls = []
+
+    def get(url, timeout):
+        calls.append(url)
+        raise requests.ConnectionError()
+
+    monkeypatch.setattr(requests, 'get', get)
+    monkeypatch.setattr(notebook, '_CONNECTION_CACHE', {})
+    return calls
+
+
+def test_plotlyjs_offline_by_default(requests_get):
+    with open(PLOTLYJS_FILE, encoding='utf-8') as f:
+        assert notebook.plotlyjs_script() == f'<script type="text/javascript">{f.read()}</script>'
+    assert requests_get == []
+
+
+def test_plotlyjs_connected_no_check(requests_get):
+    assert notebook.plotlyjs_script(connected=True).startswith('<script type="text/javascript" src="https://cdn.plot.ly/')
+    assert requests_get == []
+
+
+def test_plotlyjs_connected_falls_back(requests_get):
+    assert notebook.plotlyjs_script(connected=True, check_connection=True).startswith('<script type="text/javascript">')
+    assert len(requests_get) == 1
+
+
+def test_internet_connection_cached(requests_get):
+    assert not notebook.internet_connection()
+    assert not notebook.internet_connection()
+    assert len(requests_get) == 1
+    assert not notebook.internet_connection(refresh=True)
+    assert len(requests_get) == 2
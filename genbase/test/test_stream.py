@@ -0,0 +1,101 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import srsly
+
+from genbase import Configurable, MetaInfo
+from genbase.data import import_data, train_test_split
+from genbase.stream import iter_json, lazy_config, write_json, write_jsonl
+from genbase.utils import export_instancelib, references
+
+
+class Results(Configurable):
+    def __init__(self, records, scores, tags=None):
+        self.records = records
+        self.scores = scores
+        self.tags = tags
+
+
+@pytest.fixture
+def results():
+    return Results(records=[{'id': i, 'label': f'label_{i % 3}', 'score': i / 4, 'missing': None} for i in range(10)],
+                   scores=np.arange(6.0).reshape(3, 2),
+                   tags=({'a', 'b'}, (1, 2), {0: 'zero'}))
+
+
+@pytest.fixture
+def environment():
+    df = pd.DataFrame({'text': [f'text {i}' for i in range(10)], 'label': [f'label_{i % 2}' for i in range(10)]})
+    return train_test_split(import_data(df, data_cols='text', label_cols='label'), train_size=0.5)
+
+
+def load(obj):
+    with references():
+        return json.loads(''.join(iter_json(lazy_config(obj))))
+
+
+def test_stream_equals_config(results):
+    assert load(results) == json.loads(results.to_json())
+
+
+def test_stream_meta_info():
+    meta = MetaInfo(type='test', subtype='stream')
+    meta.content = lambda: {'a': [1, 2], 'b': {'c': 'd'}}
+    assert load(meta) == json.loads(json.dumps(meta.to_config()))
+
+
+def test_stream_environment(environment):
+    config = load(environment)
+    assert len(config['dataset']) == 10
+    instance = environment.dataset[next(iter(environment.dataset))]
+    assert config['dataset'][0] == json.loads(srsly.json_dumps(export_instancelib(instance)))
+    assert set(config['labels']['labelset']) == {'label_0', 'label_1'}
+
+
+@pytest.mark.parametrize('file', ['results.json', 'results.json.gz', None])
+def test_write_json(results, tmp_path, file):
+    if file is None:
+        f = io.StringIO()
+        write_json(results, f, buffer_size=16)
+        content = f.getvalue()
+    else:
+        write_json(results, str(tmp_path / file))
+        with (gzip.open if file.endswith('.gz') else open)(tmp_path / file, 'rt') as f:
+            content = f.read()
+    assert json.loads(content) == json.loads(results.to_json())
+
+
+def test_write_jsonl_environment(environment, tmp_path):
+    path = str(tmp_path / 'environment.jsonl')
+    write_jsonl(environment, path)
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == len(environment.dataset)
+    assert all(len(record['providers']) == 1 for record in records)
+    assert {tuple(record['labels']) for record in records} == {('label_0',), ('label_1',)}
+
+
+def test_write_jsonl_provider(environment):
+    f = io.StringIO()
+    write_jsonl(environment['train'], f)
+    assert len(f.getvalue().splitlines()) == len(environment['train'])
+
+
+@pytest.mark.parametrize('encoding', ['list', 'base64'])
+def test_configurable_write_json_stream(results, tmp_path, encoding):
+    path = str(tmp_path / 'results.json')
+    results.write_json(path, array_encoding=encoding, stream=True)
+    read = Results.read_json(path)
+    np.testing.assert_array_equal(read.scores, results.scores)
+    assert read.records == results.records
+
+
+def test_stream_references(results):
+    results.tags = [results.records[0], (results.records, results)]
+    config = load(results)
+    assert config == json.loads(results.to_json())
+    assert config['tags'][1][1] == {'$ref': '#'}
@@ -0,0 +1,258 @@
+import os
+
+import numpy as np
+import pytest
+
+from genbase import utils
+from genbase.utils import (ExportWalk, LazyDict, LazyList, array_encoding, decode_array, decode_arrays, encode_array,
+                           export_safe, get_exporter, recursive_to_dict, references, register_exporter,
+                           resolve_references)
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Point3D(Point):
+    def __init__(self, x, y, z):
+        super().__init__(x, y)
+        self.z = z
+
+
+@pytest.fixture
+def exporters():
+    original = dict(utils.EXPORTERS)
+    yield utils.EXPORTERS
+    utils.EXPORTERS.clear()
+    utils.EXPORTERS.update(original)
+    for cache in (utils._EXPORTER_CACHE, utils._ITEM_EXPORTER_CACHE, utils._VALUE_EXPORTER_CACHE):
+        cache.clear()
+
+
+@pytest.mark.parametrize('value,expected', [(np.int64(3), 3),
+                                            (np.float32(2.5), 2.5),
+                                            (True, 1),
+                                            ('a', 'a'),
+                                            (None, None),
+                                            (np.arange(4).reshape(2, 2), [[0, 1], [2, 3]]),
+                                            ({'a': {'b': np.int8(1)}}, {'a': {'b': 1}}),
+                                            ((1, np.float64(2.0)), [1, 2.0]),
+                                            (frozenset(['a']), ['a'])])
+def test_export_safe(value, expected):
+    assert export_safe(value) == expected
+    assert type(export_safe(value)) is type(expected)
+
+
+def test_exporter_memoized():
+    assert get_exporter(np.int64) is get_exporter(np.int64)
+    assert np.int64 in utils._EXPORTER_CACHE
+
+
+def test_recursive_to_dict():
+    assert dict(recursive_to_dict(Point(np.int64(1), [Point(2, 3)]))) == \
+        {'__class__': 'test_utils.Point', 'x': 1, 'y': [{'__class__': 'test_utils.Point', 'x': 2, 'y': 3}]}
+
+
+def test_register_exporter(exporters):
+    register_exporter(Point, lambda p: [p.x, p.y])
+    assert export_safe(Point(1, 2)) == [1, 2]
+    assert export_safe([Point(1, 2)]) == [[1, 2]]
+    assert dict(recursive_to_dict({'p': Point(1, 2)})) == {'p': [1, 2]}
+
+
+def test_register_exporter_subclass(exporters):
+    register_exporter(Point, lambda p: [p.x, p.y])
+    assert export_safe(Point3D(1, 2, 3)) == [1, 2]
+
+    @register_exporter(Point3D)
+    def export_point3d(p):
+        return [p.x, p.y, p.z]
+
+    assert export_safe(Point3D(1, 2, 3)) == [1, 2, 3]
+
+
+def test_register_exporter_by_name(exporters):
+    register_exporter(f'{Point.__module__}.{Point.__qualname__}', lambda p: 'point')
+    assert export_safe(Point(1, 2)) == 'point'
+
+
+@pytest.mark.parametrize('array', [np.arange(12, dtype='>i4').reshape(3, 4)[:, ::2],
+                                   np.array(1.5),
+                                   np.zeros((0, 3)),
+                                   np.array(['2020-01-01'], dtype='datetime64[D]'),
+                                   np.array([True, False])])
+def test_encode_array_base64(array):
+    encoded = encode_array(array, encoding='base64')
+    assert set(encoded.keys()) == {'__ndarray__', 'dtype', 'shape', 'data'}
+    decoded = decode_array(encoded)
+    assert decoded.dtype == array.dtype
+    np.testing.assert_array_equal(decoded, array)
+
+
+def test_encode_array_npy(tmp_path):
+    array = np.arange(6.0).reshape(2, 3)
+    encoded = encode_array(array, encoding='npy', directory=str(tmp_path / 'arrays'), root=str(tmp_path), name='a')
+    assert encoded == {'__ndarray__': 'npy', 'path': 'arrays/a.npy'.replace('/', os.sep)}
+    decoded = decode_array(encoded, root=str(tmp_path))
+    assert isinstance(decoded, np.memmap)
+    np.testing.assert_array_equal(decoded, array)
+
+
+def test_array_encoding(exporters):
+    value = {'a': [np.arange(3)]}
+    with array_encoding('base64'):
+        encoded = export_safe(value)
+    assert encoded['a'][0]['__ndarray__'] == 'base64'
+    assert export_safe(value) == {'a': [[0, 1, 2]]}
+    np.testing.assert_array_equal(decode_arrays(encoded)['a'][0], np.arange(3))
+
+
+def test_array_encoding_registered(exporters):
+    register_exporter(np.ndarray, lambda array: {'shape': list(array.shape)})
+    value = {'a': np.arange(3)}
+    assert export_safe(value) == {'a': {'shape': [3]}}
+    with array_encoding('list'):
+        assert export_safe(value) == {'a': [0, 1, 2]}
+        with array_encoding(None):
+            assert export_safe(value) == {'a': [0, 1, 2]}
+    assert export_safe(value) == {'a': {'shape': [3]}}
+    assert np.ndarray in exporters
+
+
+def test_array_encoding_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+
+    barrier = Barrier(2)
+
+    def encode(encoding):
+        with array_encoding(encoding):
+            barrier.wait()
+            return export_safe({'a': np.arange(3)})['a']
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        as_list, as_base64 = executor.map(encode, ['list', 'base64'])
+    assert as_list == [0, 1, 2]
+    assert as_base64['__ndarray__'] == 'base64'
+
+
+def test_recursive_to_dict_shared():
+    point = Point(1, 2)
+    value = {'a': point, 'b': [point, (1, point)], 'd/e': point}
+    assert dict(recursive_to_dict(value))['d/e'] == {'__class__': 'test_utils.Point', 'x': 1, 'y': 2}
+    with references():
+        config = dict(recursive_to_dict(value))
+    assert config['a'] == {'__class__': 'test_utils.Point', 'x': 1, 'y': 2}
+    assert config['b'] == [{'$ref': '#/a'}, [1, {'$ref': '#/a'}]]
+    assert config['d/e'] == {'$ref': '#/a'}
+
+
+def test_recursive_to_dict_cycle():
+    a, b = Point(1, None), Point(2, None)
+    a.y, b.y = b, a
+    with references():
+        config = dict(recursive_to_dict(a))
+    assert config == {'__class__': 'test_utils.Point', 'x': 1,
+                                          'y': {'__class__': 'test_utils.Point', 'x': 2, 'y': {'$ref': '#'}}}
+
+
+def test_references_scope():
+    point = Point(1, 2)
+    with references():
+        first = dict(recursive_to_dict({'point': point}))
+        second = dict(recursive_to_dict({'point': point}))
+    assert second == {'point': {'$ref': '#/point'}}
+    assert dict(recursive_to_dict({'point': point})) == first
+
+
+def test_references_nested():
+    from genbase.utils import _REFERENCES
+
+    with references() as outer:
+        with references() as inner:
+            assert inner is outer
+        assert _REFERENCES.get() is outer
+
+    def export():
+        with references():
+            yield dict(recursive_to_dict({'point': Point(1, 2)}))
+
+    exports = export()
+    next(exports)
+    exports.close()
+    assert _REFERENCES.get() is None
+
+
+def test_export_walk_lazy():
+    def collect(value):
+        if isinstance(value, LazyDict):
+            return {k: collect(v) for k, v in value.items}
+        elif isinstance(value, LazyList):
+            return [collect(v) for v in value.items]
+        return value
+
+    point = Point(1, None)
+    point.y = point
+    value = {'a': point, 'b': [point, {'c': (1, point)}], 'd': {point.x, 3}, 'e': {'f': [np.arange(2)]}}
+    with references():
+        eager = dict(recursive_to_dict(value))
+    with references():
+        lazy = collect(LazyDict(ExportWalk(lazy=True).fields(value)))
+    assert lazy == eager
+    assert eager['b'][0] == {'$ref': '#/a'}
+    assert eager['a']['y'] == {'$ref': '#/a'}
+
+
+def test_resolve_references():
+    config = resolve_references({'a': {'x': [1, 2]}, 'b': {'$ref': '#/a'}, 'c': {'$ref': '#/a/x'},
+                                 'd/e': {'f': {'$ref': '#/d~1e'}}})
+    assert config['b'] is config['a']
+    assert config['c'] is config['a']['x']
+    assert config['d/e']['f'] is config['d/e']
+
+
+def test_resolve_references_unchanged():
+    config = {'a': [1, {'b': 2}]}
+    assert resolve_references(config) is config
+    with pytest.raises(ValueError):
+        resolve_references({'a': {'$ref': '#/b'}})
+
+
+def test_blob_store(tmp_path):
+    directory = str(tmp_path / 'blobs')
+    points = [Point(i, i) for i in range(100)]
+    with utils.blob_store(directory, min_size=1024) as store:
+        large = utils.export_serializable(points)
+        small = utils.export_serializable(points[0])
+        assert utils.export_serializable(points) == large
+    assert isinstance(small, bytes)
+    assert large['__blob__'] == os.path.splitext(os.listdir(directory)[0])[0]
+    assert len(os.listdir(directory)) == 1
+
+    with utils.blob_store(directory, min_size=1024):
+        assert utils.export_serializable([Point(i, i) for i in range(100)]) == large
+
+    blob = decode_arrays({'model': large})['model']
+    assert isinstance(blob, utils.Blob) and not blob._loaded
+    assert [(p.x, p.y) for p in blob.load()] == [(i, i) for i in range(100)]
+    assert export_safe(blob) == {**large, 'path': os.path.abspath(large['path'])}
+    with store:
+        assert export_safe(blob) == large
+
+
+def test_export_instancelib_chunked():
+    import pandas as pd
+
+    from genbase.data import import_data
+
+    environment = import_data(pd.DataFrame({'text': [f'text {i}' for i in range(25)], 'label': ['a', 'b'] * 12 + ['a']}),
+                              data_cols='text', label_cols='label')
+    chunks = list(utils.export_instancelib_chunked(environment.dataset, chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [i for chunk in chunks for i in chunk] == utils.export_instancelib(environment.dataset)
+    records = [i for chunk in utils.export_instancelib_chunked(environment, chunk_size=10) for i in chunk]
+    assert [record['labels'] for record in records] == [['a'], ['b']] * 12 + [['a']]
+    with pytest.raises(TypeError):
+        next(utils.export_instancelib_chunked([1, 2, 3]))
@@ -2,10 +2,7 @@
 
 from typing import Sequence, Union
 
-import matplotlib.cm
-import matplotlib.colors
-
-from genbase.ui.notebook import Render, format_instances, is_colab, is_interactive
+from genbase.ui.notebook import Render, format_instances, init_plotly, is_colab, is_interactive
 from genbase.ui.plot import matplotlib_available
 
 
@@ -43,6 +40,8 @@ def get_color(value: Union[float, Sequence[float]],
 
     if not matplotlib_available():
         raise ImportError('Currently requires `matplotlib` to be installed!')
+    import matplotlib.cm
+    import matplotlib.colors
 
     # Clamp value
     value = [min(max(v, min_value), max_value) for v in value]
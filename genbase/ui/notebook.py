@@ -3,15 +3,17 @@
 import copy
 import traceback
 import uuid
-from typing import Callable, Iterable, List, Optional, Union
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 import srsly
 from IPython import get_ipython
 
-from .plot import plotly_available
+from .plot import PLOTLYJS_FILE, plotly_available
 from .svg import CLONE as CLONE_SVG
 
 PACKAGE_LINK = 'https://git.science.uu.nl/m.j.robeer/genbase/'
+PLOTLYJS_CDN = 'https://cdn.plot.ly/plotly-{version}.min.js'
 MAIN_COLOR = '#000000'
 CUSTOM_CSS = """
 #--var(ui_id),
@@ -431,23 +433,82 @@ def is_interactive() -> bool:
         return False
 
 
-def internet_connection(url: str = 'http://www.pypi.org', timeout: int = 5) -> bool:
+_CONNECTION_CACHE: Dict[str, bool] = {}
+
+
+def internet_connection(url: str = 'http://www.pypi.org', timeout: int = 5, refresh: bool = False) -> bool:
     """Check whether there is an active internet connection, by trying to reach an URL within timeout.
 
+    The result is cached per URL for the remainder of the session.
+
     Args:
         url (str, optional): URL to connect to. Defaults to 'http://www.pypi.org'.
         timeout (int, optional): Timeout. Defaults to 5.
+        refresh (bool, optional): Ignore the cached result and check again. Defaults to False.
 
     Returns:
         bool: True if has internet connection, else False.
     """
+    if not refresh and url in _CONNECTION_CACHE:
+        return _CONNECTION_CACHE[url]
+
     import requests
 
     try:
         requests.get(url, timeout=timeout)
-        return True
+        connected = True
     except (requests.ConnectionError, requests.Timeout):
-        return False
+        connected = False
+    _CONNECTION_CACHE[url] = connected
+    return connected
+
+
+@lru_cache(maxsize=None)
+def local_plotlyjs() -> str:
+    """Contents of the local `plotly.js` bundle (`genbase.ui.plot.PLOTLYJS_FILE`), read once per session.
+
+    Returns:
+        str: Minified `plotly.js` source.
+    """
+    with open(PLOTLYJS_FILE, encoding='utf-8') as f:
+        return f.read()
+
+
+def plotlyjs_script(connected: bool = False, check_connection: bool = False) -> str:
+    """Get a `<script>` tag that loads `plotly.js`, offline-first.
+
+    Args:
+        connected (bool, optional): Load `plotly.js` from the CDN instead of inlining the local bundle.
+            Defaults to False.
+        check_connection (bool, optional): Only load from the CDN if an internet connection is available (checked once
+            per session). Defaults to False.
+
+    Returns:
+        str: HTML script tag.
+    """
+    if connected and (not check_connection or internet_connection()):
+        from plotly.offline import get_plotlyjs_version
+        return f'<script type="text/javascript" src="{PLOTLYJS_CDN.format(version=get_plotlyjs_version())}"></script>'
+    return f'<script type="text/javascript">{local_plotlyjs()}</script>'
+
+
+def init_plotly(connected: bool = False, check_connection: bool = False) -> None:
+    """Initialize `plotly` notebook mode in interactive environments, using the local `plotly.js` by default.
+
+    Example:
+        Load `plotly.js` from the CDN if the kernel is connected to the internet:
+
+        >>> from genbase.ui.notebook import init_plotly
+        >>> init_plotly(connected=True, check_connection=True)
+
+    Args:
+        connected (bool, optional): Load `plotly.js` from the CDN instead of the local bundle. Defaults to False.
+        check_connection (bool, optional): Only load from the CDN if an internet connection is available (checked once
+            per session). Defaults to False.
+    """
+    if is_interactive() and plotly_available():
+        from plotly.offline import init_notebook_mode
+        init_notebook_mode(connected=connected and (not check_connection or internet_connection()))
 
 
 class Render:
@@ -716,8 +777,7 @@ class Render:
 
         PLOTLY = ''
         if add_plotly and 'plotly' in HTML:
-            from plotly.offline import get_plotlyjs
-            PLOTLY = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+            PLOTLY = plotlyjs_script()
 
         CSS = self.css(ui_color=main_color, ui_id=ui_id, tabs_id=tabs_id)
         FOOTER = f'<footer>Generated with <a href="{package}" target="_blank">{package_name}</a></footer>'
@@ -728,6 +788,4 @@ class Render:
         return f'{PLOTLY}<style>{CSS}</style>{HTML}{FOOTER}{JS}'
 
 
-if is_interactive() and plotly_available():
-    from plotly.offline import init_notebook_mode
-    init_notebook_mode(connected=internet_connection())
+init_plotly()
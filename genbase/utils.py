@@ -2,13 +2,19 @@
 
 import base64
 import gc
+import hashlib
 import importlib.util
+import os
 import pkgutil
+import shutil
+import uuid
 import warnings
+from contextvars import ContextVar
+from functools import lru_cache, partial
 from importlib import import_module
 from pathlib import Path
 from types import ModuleType
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union
 from zipfile import ZipExtFile
 
 import numpy as np
@@ -44,8 +50,57 @@ def export_instancelib(obj) -> Dict[str, Any]:
     return export_serializable(obj)
 
 
+CHUNK_SIZE = 1000
+
+
+def export_instancelib_chunked(obj: Union[Environment, InstanceProvider],
+                               chunk_size: int = CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Export the instances of an `instancelib` provider or environment in chunks, without exporting all at once.
+
+    Example:
+        Write the instances of an environment to a database, 10.000 at a time:
+
+        >>> from genbase.utils import export_instancelib_chunked
+        >>> for chunk in export_instancelib_chunked(environment, chunk_size=10_000):
+        ...     database.insert_many(chunk)
+
+    Args:
+        obj (Union[Environment, InstanceProvider]): Provider or environment to export. For an `Environment` each
+            instance of its dataset is exported with its `labels` and the names of the named providers it is in
+            (`providers`).
+        chunk_size (int, optional): Maximum number of instances per chunk. Defaults to `CHUNK_SIZE`.
+
+    Raises:
+        TypeError: `obj` is not an `InstanceProvider` or `Environment`.
+
+    Yields:
+        Iterator[List[Dict[str, Any]]]: Exported instances (see `export_instancelib()`), in chunks of `chunk_size`.
+    """
+    if isinstance(obj, Environment):
+        named_providers = obj.named_providers.items() if isinstance(obj.named_providers, dict) else []
+        for chunk in obj.dataset.instance_chunker(chunk_size):
+            records = []
+            for instance in chunk:
+                record = export_instancelib(instance)
+                record['labels'] = export_safe(obj.labels.get_labels(instance.identifier))
+                record['providers'] = [name for name, provider in named_providers if instance.identifier in provider]
+                records.append(record)
+            yield records
+    elif isinstance(obj, InstanceProvider):
+        for chunk in obj.instance_chunker(chunk_size):
+            yield [export_instancelib(instance) for instance in chunk]
+    else:
+        raise TypeError(f'Unable to export "{type(obj).__name__}" in chunks, expected InstanceProvider or Environment.')
+
+
 def export_serializable(obj):
-    """Export in serializable format (`pickle.dumps()` that is `base64`-encoded).."""
+    """Export in serializable format (`pickle.dumps()` that is `base64`-encoded).
+
+    Within a `blob_store` statement, large payloads are written to the blob store once and exported as a reference.
+    """
+    store = _BLOB_STORE.get()
+    if store is not None:
+        return store.export(obj)
     return base64.b64encode(srsly.pickle_dumps(obj))
 
 
@@ -58,42 +113,227 @@ def export_dict(nested: dict) -> Iterator[Tuple]:
     Yields:
         Iterator[Tuple]: Current level of key-value pairs.
     """
-    for key, value in nested.items():
-        if isinstance(value, dict):
-            yield key, dict(export_dict(value))
-        else:
-            yield key, export_safe(value)
+    walk = ExportWalk()
+    if walk.state is None:
+        yield from walk.dict_items(nested)
+        return
+    path = tuple(walk.state.path)
+    try:
+        yield from walk.dict_items(nested, path)
+    finally:
+        walk.state.path[:] = path
+
+
+EXPORTERS: Dict[Union[type, str], Callable[[Any], Any]] = {}
+
+
+def register_exporter(cls: Union[type, str], exporter: Optional[Callable[[Any], Any]] = None):
+    """Register a function that exports objects of type `cls` (and its subclasses) in `export_safe()`.
+
+    Registered exporters take precedence over the default exports, in `export_safe()` and for values in
+    `recursive_to_dict()`. Can also be used as a decorator.
+
+    Example:
+        Export PyTorch tensors as lists, without having to import `torch` in the package registering the exporter:
+
+        >>> from genbase.utils import register_exporter
+        >>> @register_exporter('torch.Tensor')
+        ... def export_tensor(obj):
+        ...     return obj.tolist()
+
+    Args:
+        cls (Union[type, str]): Type or fully qualified name of type (e.g. 'torch.Tensor').
+        exporter (Optional[Callable[[Any], Any]], optional): Function taking an object and returning its export. If
+            None, returns a decorator. Defaults to None.
+    """
+    def register(exporter):
+        EXPORTERS[cls] = exporter
+        _clear_exporter_caches()
+        return exporter
+
+    return register if exporter is None else register(exporter)
+
+
+def _clear_exporter_caches() -> None:
+    _EXPORTER_CACHE.clear()
+    _ITEM_EXPORTER_CACHE.clear()
+    _VALUE_EXPORTER_CACHE.clear()
+
+
+def _registered_exporter(cls: type) -> Optional[Callable[[Any], Any]]:
+    """Get the registered exporter for the first type in the method resolution order of `cls`, if any."""
+    if EXPORTERS:
+        for parent in cls.__mro__:
+            for key in (parent, f'{parent.__module__}.{parent.__qualname__}'):
+                if key in EXPORTERS:
+                    return EXPORTERS[key]
+    return None
+
+
+def _defines(cls: type, name: str) -> bool:
+    """Whether `cls` or any of its parents defines attribute `name` for its instances (e.g. `__call__`)."""
+    return any(name in vars(parent) for parent in cls.__mro__)
+
+
+def _export_object(obj) -> dict:
+    return dict(recursive_to_dict(obj))
+
+
+def _export_container(obj):
+    """Export a list, tuple, set or dictionary with `ExportWalk.export()`, starting at the current path."""
+    walk = ExportWalk()
+    if walk.state is None:
+        return walk.export(obj)
+    path = tuple(walk.state.path)
+    try:
+        return walk.export(obj, path)
+    finally:
+        walk.state.path[:] = path
+
+
+def _export_iterable(obj) -> list:
+    return _export_container(obj)
+
+
+def _export_set(obj) -> list:
+    return _export_container(obj)
+
+
+def _export_dict(obj) -> dict:
+    return _export_container(obj)
+
+
+def _export_tf_torch(obj) -> str:
+    return 'TODO-EXPORT-TF-TORCH'
+
+
+def _export_identity(obj):
+    return obj
+
+
+def _export_array(obj: np.ndarray, fallback: Callable[[np.ndarray], Any] = np.ndarray.tolist):
+    encoder = _ARRAY_ENCODING.get()
+    return fallback(obj) if encoder is None else encoder.encode(obj)
+
+
+def _resolve_exporter(cls: type) -> Callable[[Any], Any]:
+    registered = _registered_exporter(cls)
+    if issubclass(cls, np.ndarray):
+        # Encoding of the current `array_encoding` statement (if any), otherwise the registered or default export
+        return _export_array if registered is None else partial(_export_array, fallback=registered)
+    elif registered is not None:
+        return registered
+
+    type_name = str(cls).lower()
+    if issubclass(cls, (int, np.integer)):
+        return int
+    elif issubclass(cls, (float, np.floating)):
+        return float
+    elif 'pandas' in type_name and callable(getattr(cls, 'to_dict', None)):
+        return cls.to_dict
+    elif issubclass(cls, str):
+        return str
+    elif issubclass(cls, (frozenset, set)):
+        return _export_set
+    elif issubclass(cls, (list, tuple)):
+        return _export_iterable
+    elif issubclass(cls, dict):
+        return _export_dict
+    elif 'tensorflow.' in type_name or 'torch.' in type_name:
+        return _export_tf_torch
+    elif _defines(cls, '__call__'):
+        return export_serializable
+    return _export_identity
+
+
+_EXPORTER_CACHE: Dict[type, Callable[[Any], Any]] = {}
+_ITEM_EXPORTER_CACHE: Dict[type, Callable[[Any], Any]] = {}
+
+
+def get_exporter(cls: type) -> Callable[[Any], Any]:
+    """Get the function used by `export_safe()` for objects of type `cls`, memoized per type.
+
+    Args:
+        cls (type): Type of object to export.
+
+    Returns:
+        Callable[[Any], Any]: Export function.
+    """
+    try:
+        return _EXPORTER_CACHE[cls]
+    except KeyError:
+        exporter = _EXPORTER_CACHE[cls] = _resolve_exporter(cls)
+        return exporter
+
+
+def _get_item_exporter(cls: type) -> Callable[[Any], Any]:
+    """Get the function used for items in a list or tuple, memoized per type."""
+    try:
+        return _ITEM_EXPORTER_CACHE[cls]
+    except KeyError:
+        exporter = _ITEM_EXPORTER_CACHE[cls] = _export_object \
+            if _defines(cls, '__dict__') and _registered_exporter(cls) is None else get_exporter(cls)
+        return exporter
 
 
 def export_safe(obj):
     """Safely export to transform into JSON or YAML."""
-    if isinstance(obj, (int, np.integer)):
-        return int(obj)
-    elif isinstance(obj, (float, np.floating)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif 'pandas' in str(type(obj)).lower() and hasattr(obj, 'to_dict') and callable(obj.to_dict):
-        return obj.to_dict()
-    elif isinstance(obj, str):
-        return str(obj)
-    elif isinstance(obj, (frozenset, set)):
-        return [export_safe(o) for o in list(obj)]
-    elif isinstance(obj, (list, tuple)):
-        return [dict(recursive_to_dict(o)) if hasattr(o, '__dict__') else export_safe(o) for o in obj]
-    elif isinstance(obj, dict):
-        return dict(export_dict(obj))
-    elif 'tensorflow.' in str(type(obj)).lower() or 'torch.' in str(type(obj)).lower():
-        return 'TODO-EXPORT-TF-TORCH'
-    elif callable(obj):
-        return export_serializable(obj)
-    return obj
+    try:
+        exporter = _EXPORTER_CACHE[type(obj)]
+    except KeyError:
+        exporter = get_exporter(type(obj))
+    return exporter(obj)
 
 
-def recursive_to_dict(nested: Any,
-                      exclude: Optional[List[str]] = None,
-                      include_class: bool = True) -> Iterator[Tuple[str, Any]]:
-    """Recursively transform objects into a dictionary representation.
+def _export_recursive(value, exclude: List[str], include_class: bool) -> dict:
+    return dict(recursive_to_dict(value, exclude=exclude, include_class=include_class))
+
+
+def _resolve_value_exporter(cls: type) -> Tuple[Callable, bool]:
+    if issubclass(cls, np.ndarray):
+        return get_exporter(cls), False
+    registered = _registered_exporter(cls)
+    if registered is not None:
+        return registered, False
+    if issubclass(cls, (AbstractClassifier, Environment, Instance, InstanceProvider, LabelProvider, ModelMetrics)):
+        return export_instancelib, False
+    elif issubclass(cls, sklearn.base.BaseEstimator):
+        return export_serializable, False
+    elif _defines(cls, '__dict__') or issubclass(cls, dict):
+        return _export_recursive, True
+    return get_exporter(cls), False
+
+
+_VALUE_EXPORTER_CACHE: Dict[type, Tuple[Callable, bool]] = {}
+_SHARED_EXPORTERS = (export_instancelib, export_serializable)
+# Exporters of lists, tuples, sets and dictionaries, of which `ExportWalk` exports the items itself
+_CONTAINER_EXPORTERS = frozenset([_export_iterable, _export_set, _export_dict])
+# Exporters that do not export other objects (and thus do not need the current path)
+_LEAF_EXPORTERS = frozenset([int, float, str, _export_array, _export_identity, _export_tf_torch])
+
+
+def _get_value_exporter(cls: type) -> Tuple[Callable, bool]:
+    """Get the function used by `recursive_to_dict()` for values of type `cls`, memoized per type.
+
+    Returns:
+        Tuple[Callable, bool]: Export function and whether it is `_export_recursive()`.
+    """
+    try:
+        return _VALUE_EXPORTER_CACHE[cls]
+    except KeyError:
+        exporter = _VALUE_EXPORTER_CACHE[cls] = _resolve_value_exporter(cls)
+        return exporter
+
+
+@lru_cache(maxsize=None)
+def _class_name(cls: type) -> str:
+    return str(cls).split("'")[1]
+
+
+def iter_fields(nested: Any,
+                exclude: Optional[List[str]] = None,
+                include_class: bool = True) -> Iterator[Tuple[str, Any, bool]]:
+    """Iterate over the fields of an object as used by `recursive_to_dict()`, without exporting their values.
 
     Args:
         nested (Any): Current object.
@@ -101,21 +341,22 @@ def recursive_to_dict(nested: Any,
         include_class (bool, optional): Whether to include `__class__` (True) or not (False). Defaults to True.
 
     Yields:
-        Iterator[Tuple[str, Any]]: Current level of key-value pairs.
+        Iterator[Tuple[str, Any, bool]]: Key, value and whether the value still needs to be exported (True) or not
+            (False, e.g. for `__class__`).
     """
     exclude = [] if exclude is None else exclude
     if include_class and hasattr(nested, '__class__'):
-        cls = str(nested.__class__).split("'")[1]
+        cls = _class_name(nested.__class__)
         if cls == 'type':
-            yield '__name__', str(nested.__qualname__)
+            yield '__name__', str(nested.__qualname__), False
             return
         elif 'blackboxclassifier' in str.lower(cls):
-            yield 'BLACKBOX', 'HAS_CONTENTS_HIDDEN_<3_SO_STOP_PEEKING_:)'
+            yield 'BLACKBOX', 'HAS_CONTENTS_HIDDEN_<3_SO_STOP_PEEKING_:)', False
             return
         elif cls != 'dict':
-            yield '__class__', cls
+            yield '__class__', cls, False
     if hasattr(nested, '__qualname__') and hasattr(nested, '__annotations__'):
-        yield '__name__', str(nested.__qualname__)
+        yield '__name__', str(nested.__qualname__), False
         nested = nested.__annotations__
     elif hasattr(nested, 'to_config') and callable(nested.to_config):
         nested = nested.to_config()
@@ -125,15 +366,625 @@ def recursive_to_dict(nested: Any,
         nested = dict(nested)
     for key, value in nested.items():
         if (isinstance(key, str) and not key.startswith('__')) and key not in exclude:
-            if isinstance(value, (AbstractClassifier, Environment, Instance,
-                                  InstanceProvider, LabelProvider, ModelMetrics)):
-                yield export_safe(key), export_instancelib(value)
-            elif isinstance(value, (sklearn.base.BaseEstimator)):
-                yield export_safe(key), export_serializable(value)
-            elif hasattr(value, '__dict__') or isinstance(value, dict):
-                yield export_safe(key), dict(recursive_to_dict(value, exclude=exclude, include_class=include_class))
+            yield str(key), value, True
+
+
+REF_KEY = '$ref'
+
+
+def _escape_pointer(key: Any) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+class _ReferenceState:
+    """Objects exported so far (by identity) with the JSON Pointer to their first export, and the current path."""
+
+    __slots__ = ('pointers', 'objects', 'path')
+
+    def __init__(self):
+        self.pointers: Dict[int, str] = {}
+        self.objects: List[Any] = []  # keep exported objects alive, so their `id()` is not reused
+        self.path: List[Any] = []
+
+    def pointer(self) -> str:
+        return '#' + ''.join('/' + _escape_pointer(key) for key in self.path)
+
+    def register(self, obj) -> None:
+        if id(obj) not in self.pointers:
+            self.pointers[id(obj)] = self.pointer()
+            self.objects.append(obj)
+
+
+_REFERENCES: ContextVar[Optional[_ReferenceState]] = ContextVar('genbase_references', default=None)
+
+
+class references:
+    """Track exported objects by identity within a `with` statement, to deduplicate shared objects and break cycles.
+
+    Within the statement, objects exported by `recursive_to_dict()` (objects, dictionaries, `instancelib` objects and
+    `sklearn` estimators) and objects in lists are exported once. Later occurrences are exported as a JSON Pointer
+    (RFC 6901) to their first export (e.g. `{'$ref': '#/explanations/0/environment'}`), which is also used for
+    reference cycles. `resolve_references()` (used by `Configurable.from_config()`) restores them. Statements can be
+    nested. `Configurable.to_config(dedupe=True)` enters one, as do `Configurable.to_json()`, `write_json()`,
+    `to_msgpack()` and `write_msgpack()` by default; outside of a statement all objects are exported in full.
+
+    Example:
+        >>> from genbase.utils import recursive_to_dict, references
+        >>> shared = {'a': 1}
+        >>> with references():
+        ...     dict(recursive_to_dict({'x': shared, 'y': shared}))
+        {'x': {'a': 1}, 'y': {'$ref': '#/x'}}
+
+    Args:
+        obj (Any, optional): Object whose export starts at the current path (and `key`). Defaults to None.
+        key (Any, optional): Key to add to the current path within the statement. Defaults to None.
+    """
+
+    def __init__(self, obj: Any = None, key: Any = None):
+        self.obj = obj
+        self.key = key
+        self._token = None
+
+    def __enter__(self) -> _ReferenceState:
+        state = _REFERENCES.get()
+        if state is None:
+            state = _ReferenceState()
+            self._token = _REFERENCES.set(state)
+        if self.key is not None:
+            state.path.append(self.key)
+        if self.obj is not None:
+            state.register(self.obj)
+        self._state = state
+        return state
+
+    @staticmethod
+    def active() -> bool:
+        """Whether the current thread or task is within a `references` statement."""
+        return _REFERENCES.get() is not None
+
+    def __exit__(self, *args):
+        if self.key is not None:
+            self._state.path.pop()
+        if self._token is not None:
+            _REFERENCES.reset(self._token)
+            self._token = None
+
+
+def resolve_references(config: Any) -> Any:
+    """Replace references (`{'$ref': pointer}`) in a config by the object they point to (see `references`).
+
+    Shared objects are shared again in the result, reference cycles become cycles.
+
+    Args:
+        config (Any): Config (configuration dictionary).
+
+    Raises:
+        ValueError: Reference does not point to an earlier part of the config.
+
+    Returns:
+        Any: Config with references resolved. Returned unchanged if it contains no references.
+    """
+    pointers = set()
+
+    def collect(value):
+        if isinstance(value, dict):
+            if len(value) == 1 and isinstance(value.get(REF_KEY), str):
+                pointers.add(value[REF_KEY])
+            else:
+                for v in value.values():
+                    collect(v)
+        elif isinstance(value, list):
+            for v in value:
+                collect(v)
+
+    collect(config)
+    if not pointers:
+        return config
+
+    targets = {}
+
+    def resolve(value, pointer):
+        if isinstance(value, dict):
+            if len(value) == 1 and isinstance(value.get(REF_KEY), str):
+                if value[REF_KEY] not in targets:
+                    raise ValueError(f'Unable to resolve reference "{value[REF_KEY]}" at "{pointer}".')
+                return targets[value[REF_KEY]]
+            res = targets[pointer] = {}
+            for k, v in value.items():
+                res[k] = resolve(v, f'{pointer}/{_escape_pointer(k)}')
+            return res
+        elif isinstance(value, list):
+            res = targets[pointer] = []
+            for i, v in enumerate(value):
+                res.append(resolve(v, f'{pointer}/{i}'))
+            return res
+        if pointer in pointers:
+            targets[pointer] = value
+        return value
+
+    return resolve(config, '#')
+
+
+class LazyDict:
+    """Dictionary whose key-value pairs are exported while being consumed (see `ExportWalk`)."""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Iterator[Tuple[Any, Any]]):
+        self.items = items
+
+
+class LazyList:
+    """List whose items are exported while being consumed (see `ExportWalk`)."""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Iterator[Any]):
+        self.items = items
+
+
+class ExportWalk:
+    """Walk over objects to export them, as used by `export_safe()`, `recursive_to_dict()` and `genbase.stream`.
+
+    The items of lists, dictionaries and objects are exported by generators, which are collected into lists and
+    dictionaries right away, or wrapped in a `LazyList` or `LazyDict` if `lazy` (exporting `instancelib` providers one
+    instance at a time) to be exported while they are consumed. Within a `references` statement, shared objects and
+    reference cycles are exported as a reference to their first export, with `path` the keys leading to the object.
+
+    Example:
+        Export the fields of `obj` one at a time:
+
+        >>> from genbase.utils import ExportWalk, references
+        >>> with references():
+        ...     for key, value in ExportWalk(lazy=True).fields(obj):
+        ...         ...
+
+    Args:
+        lazy (bool, optional): Export lists, dictionaries and objects as `LazyList`s and `LazyDict`s. Defaults to False.
+    """
+
+    __slots__ = ('lazy', 'state')
+
+    def __init__(self, lazy: bool = False):
+        self.lazy = lazy
+        self.state = _REFERENCES.get()
+
+    def _dict(self, items: Iterator[Tuple[Any, Any]]) -> Union[dict, LazyDict]:
+        return LazyDict(items) if self.lazy else dict(items)
+
+    def _seen(self, obj, path: Tuple) -> Optional[dict]:
+        """Reference to the first export of `obj` if it was exported before, or register it at `path` otherwise."""
+        pointer = self.state.pointers.get(id(obj))
+        if pointer is not None:
+            return {REF_KEY: pointer}
+        self.register(obj, path)
+        return None
+
+    def register(self, obj, path: Tuple = ()) -> None:
+        """Register `obj` as exported at `path`, if within a `references` statement."""
+        if self.state is not None:
+            self.state.path[:] = path
+            self.state.register(obj)
+
+    def export(self, obj, path: Tuple = ()):
+        """Export an object as `export_safe()`."""
+        try:
+            exporter = _EXPORTER_CACHE[type(obj)]
+        except KeyError:
+            exporter = get_exporter(type(obj))
+        if exporter in _CONTAINER_EXPORTERS:
+            return self._export_container(exporter, obj, path)
+        if self.state is not None and exporter not in _LEAF_EXPORTERS:
+            self.state.path[:] = path  # the exporter may export other objects (e.g. with `recursive_to_dict()`)
+        return exporter(obj)
+
+    def _export_container(self, exporter: Callable[[Any], Any], obj, path: Tuple):
+        if exporter is _export_dict:
+            return self._dict(self.dict_items(obj, path))
+        elif exporter is _export_set:
+            obj = list(obj)
+            export = self.export
+        else:
+            export = self.item
+        if self.lazy:
+            return LazyList(export(o, path + (i,)) for i, o in enumerate(obj))
+        elif self.state is None:
+            return [export(o) for o in obj]
+        return [export(o, path + (i,)) for i, o in enumerate(obj)]
+
+    def item(self, obj, path: Tuple = ()):
+        """Export an item of a list or tuple, with objects exported by their fields."""
+        try:
+            exporter = _ITEM_EXPORTER_CACHE[type(obj)]
+        except KeyError:
+            exporter = _get_item_exporter(type(obj))
+        if exporter is _export_object:
+            ref = None if self.state is None else self._seen(obj, path)
+            return self._dict(self.fields(obj, path=path)) if ref is None else ref
+        elif exporter in _CONTAINER_EXPORTERS:
+            return self._export_container(exporter, obj, path)
+        if self.state is not None and exporter not in _LEAF_EXPORTERS:
+            self.state.path[:] = path
+        return exporter(obj)
+
+    def dict_items(self, nested: dict, path: Tuple = ()) -> Iterator[Tuple[Any, Any]]:
+        """Export the key-value pairs of a dictionary as `export_dict()`."""
+        track = self.state is not None
+        for key, value in nested.items():
+            if isinstance(value, dict):
+                yield key, self._dict(self.dict_items(value, path + (key,) if track else path))
             else:
-                yield export_safe(key), export_safe(value)
+                yield key, self.export(value, path + (key,) if track else path)
+
+    def instancelib(self, obj, path: Tuple = ()):
+        """Export an `instancelib` object as `export_instancelib()`, one instance at a time if `lazy`."""
+        if self.lazy:
+            if isinstance(obj, Environment):
+                return LazyDict(iter([('dataset', self.instancelib(obj.dataset, path + ('dataset',))),
+                                      ('labels', self.instancelib(obj.labels, path + ('labels',))),
+                                      ('named_providers', self.instancelib(obj.named_providers,
+                                                                           path + ('named_providers',)))]))
+            elif isinstance(obj, LabelProvider):
+                labeldict = ((k, self.export(v, path + ('labeldict', k))) for k, v in obj._labeldict.items())
+                return LazyDict(iter([('labelset', self.export(obj._labelset, path + ('labelset',))),
+                                      ('labeldict', LazyDict(labeldict))]))
+            elif isinstance(obj, InstanceProvider):
+                return LazyList(instance for chunk in export_instancelib_chunked(obj) for instance in chunk)
+        if self.state is not None:
+            self.state.path[:] = path
+        return export_instancelib(obj)
+
+    def value(self, value, exclude: Optional[List[str]] = None, include_class: bool = True, path: Tuple = ()):
+        """Export the value of a field as `recursive_to_dict()`."""
+        exporter, recursive = _get_value_exporter(type(value))
+        if self.state is not None and (recursive or exporter in _SHARED_EXPORTERS):
+            ref = self._seen(value, path)
+            if ref is not None:
+                return ref
+        if recursive:
+            return self._dict(self.fields(value, exclude=exclude, include_class=include_class, path=path))
+        elif exporter is export_instancelib:
+            return self.instancelib(value, path)
+        elif exporter in _CONTAINER_EXPORTERS:
+            return self._export_container(exporter, value, path)
+        if self.state is not None and exporter not in _LEAF_EXPORTERS:
+            self.state.path[:] = path
+        return exporter(value)
+
+    def fields(self,
+               nested: Any,
+               exclude: Optional[List[str]] = None,
+               include_class: bool = True,
+               path: Tuple = ()) -> Iterator[Tuple[str, Any]]:
+        """Export the fields of an object as `recursive_to_dict()`."""
+        exclude = [] if exclude is None else exclude
+        state = self.state
+        if state is None:
+            for key, value, export in iter_fields(nested, exclude=exclude, include_class=include_class):
+                yield key, self.value(value, exclude, include_class) if export else value
+            return
+
+        self.register(nested, path)
+        fields = iter_fields(nested, exclude=exclude, include_class=include_class)
+        while True:
+            state.path[:] = path  # `iter_fields()` may call `nested.to_config()`
+            try:
+                key, value, export = next(fields)
+            except StopIteration:
+                return
+            yield key, self.value(value, exclude, include_class, path + (key,)) if export else value
+
+
+def recursive_to_dict(nested: Any,
+                      exclude: Optional[List[str]] = None,
+                      include_class: bool = True) -> Iterator[Tuple[str, Any]]:
+    """Recursively transform objects into a dictionary representation.
+
+    Within a `references` statement, objects that are exported more than once (shared objects and reference cycles)
+    are exported as a reference to their first export.
+
+    Args:
+        nested (Any): Current object.
+        exclude (Optional[List[str]], optional): Keys to exclude. Defaults to None.
+        include_class (bool, optional): Whether to include `__class__` (True) or not (False). Defaults to True.
+
+    Yields:
+        Iterator[Tuple[str, Any]]: Current level of key-value pairs.
+    """
+    walk = ExportWalk()
+    if walk.state is None:
+        yield from walk.fields(nested, exclude=exclude, include_class=include_class)
+        return
+    path = tuple(walk.state.path)
+    try:
+        yield from walk.fields(nested, exclude=exclude, include_class=include_class, path=path)
+    finally:
+        walk.state.path[:] = path
+
+
+ArrayEncoding = Literal['list', 'base64', 'npy', 'native']
+ARRAY_ENCODINGS = ['list', 'base64', 'npy', 'native']
+ARRAY_KEY = '__ndarray__'
+
+
+def encode_array(obj: np.ndarray,
+                 encoding: ArrayEncoding = 'base64',
+                 directory: Optional[str] = None,
+                 root: Optional[str] = None,
+                 name: Optional[str] = None) -> Union[list, dict]:
+    """Encode a `np.ndarray` with its dtype, shape and raw buffer, without converting it to Python objects.
+
+    Args:
+        obj (np.ndarray): Array to encode.
+        encoding (ArrayEncoding, optional): Encode as nested lists ('list'), as base64-encoded buffer inline ('base64'),
+            in a sidecar `.npy` file in `directory` ('npy') or keep as `np.ndarray` for formats that support NumPy
+            arrays, such as MessagePack ('native'). Arrays of objects are always encoded as nested lists. Defaults to
+            'base64'.
+        directory (Optional[str], optional): Directory to write `.npy` files to. Defaults to None.
+        root (Optional[str], optional): Store paths of `.npy` files relative to `root`. Defaults to None.
+        name (Optional[str], optional): Name of `.npy` file. If None, generates a unique name. Defaults to None.
+
+    Raises:
+        ValueError: Unknown encoding or no directory for encoding 'npy'.
+
+    Returns:
+        Union[list, dict]: Encoded array.
+    """
+    if encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f'Unknown array encoding "{encoding}", choose from {ARRAY_ENCODINGS}.')
+    if encoding == 'list' or obj.dtype.hasobject:
+        return obj.tolist()
+    if encoding == 'native':
+        return obj
+    if encoding == 'npy':
+        if directory is None:
+            raise ValueError('Array encoding "npy" requires a directory to write to.')
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{uuid.uuid4().hex if name is None else name}.npy')
+        np.save(path, obj, allow_pickle=False)
+        return {ARRAY_KEY: 'npy', 'path': os.path.relpath(path, root) if root is not None else path}
+    return {ARRAY_KEY: 'base64',
+            'dtype': obj.dtype.str,
+            'shape': list(obj.shape),
+            'data': base64.b64encode(np.ascontiguousarray(obj).reshape(-1).view(np.uint8)).decode('ascii')}
+
+
+def decode_array(encoded: dict, root: Optional[str] = None, mmap_mode: Optional[str] = 'r') -> np.ndarray:
+    """Decode an array encoded with `encode_array()`, without copying its buffer.
+
+    Args:
+        encoded (dict): Encoded array.
+        root (Optional[str], optional): Directory relative paths of `.npy` files are relative to. Defaults to None.
+        mmap_mode (Optional[str], optional): Memory-map `.npy` files with this mode (see `np.load()`).
+            Defaults to 'r'.
+
+    Returns:
+        np.ndarray: Read-only array backed by the decoded buffer or memory-mapped file.
+    """
+    if encoded[ARRAY_KEY] == 'npy':
+        path = encoded['path']
+        if root is not None and not os.path.isabs(path):
+            path = os.path.join(root, path)
+        return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+    return np.frombuffer(base64.b64decode(encoded['data']), dtype=np.dtype(encoded['dtype'])).reshape(encoded['shape'])
+
+
+def decode_arrays(config: Any, root: Optional[str] = None, mmap_mode: Optional[str] = 'r') -> Any:
+    """Recursively decode all arrays encoded with `encode_array()` in a config, and blob references (see `blob_store`).
+
+    Args:
+        config (Any): Config (configuration dictionary) or part of it.
+        root (Optional[str], optional): Directory relative paths of `.npy` files and blobs are relative to.
+            Defaults to None.
+        mmap_mode (Optional[str], optional): Memory-map `.npy` files with this mode (see `np.load()`).
+            Defaults to 'r'.
+
+    Returns:
+        Any: Config with decoded arrays and lazily loaded `Blob`s.
+    """
+    if isinstance(config, dict):
+        if ARRAY_KEY in config:
+            return decode_array(config, root=root, mmap_mode=mmap_mode)
+        elif BLOB_KEY in config:
+            return Blob.from_reference(config, root=root)
+        return {k: decode_arrays(v, root=root, mmap_mode=mmap_mode) for k, v in config.items()}
+    elif isinstance(config, list) and any(isinstance(v, (dict, list)) for v in config):
+        return [decode_arrays(v, root=root, mmap_mode=mmap_mode) for v in config]
+    return config
+
+
+class array_encoding:
+    """Choose how `np.ndarray`s are encoded in exports within a `with` statement.
+
+    The encoding only applies to exports in the current thread or task (it is stored in a `ContextVar`), and takes
+    precedence over an exporter registered for `np.ndarray` with `register_exporter()` within the statement.
+
+    Example:
+        Export the config of `obj` with all arrays as base64-encoded buffers:
+
+        >>> from genbase.utils import array_encoding
+        >>> with array_encoding('base64'):
+        ...     config = obj.to_config()
+
+        Write arrays to `.npy` files in directory 'arrays' instead:
+
+        >>> with array_encoding('npy', directory='arrays'):
+        ...     config = obj.to_config()
+    """
+
+    def __init__(self, encoding: Optional[ArrayEncoding] = 'base64', directory: Optional[str] = None,
+                 root: Optional[str] = None):
+        """
+        Args:
+            encoding (Optional[ArrayEncoding], optional): Array encoding ('list', 'base64', 'npy' or 'native'). If
+                None, keeps the current encoding (or the registered/default export of arrays). Defaults to 'base64'.
+            directory (Optional[str], optional): Directory to write `.npy` files to. Defaults to None.
+            root (Optional[str], optional): Store paths of `.npy` files relative to `root`. Defaults to None.
+        """
+        if encoding is not None and encoding not in ARRAY_ENCODINGS:
+            raise ValueError(f'Unknown array encoding "{encoding}", choose from {ARRAY_ENCODINGS}.')
+        if encoding == 'npy' and directory is None:
+            raise ValueError('Array encoding "npy" requires a directory to write to.')
+        self.encoding = encoding
+        self.directory = directory
+        self.root = root
+        self.n_arrays = 0
+        self._token = None
+
+    def encode(self, obj: np.ndarray) -> Union[list, dict]:
+        self.n_arrays += 1
+        return encode_array(obj, encoding=self.encoding, directory=self.directory, root=self.root,
+                            name=f'array_{self.n_arrays - 1}')
+
+    def __enter__(self):
+        """Use this encoding for arrays exported within the statement."""
+        if self.encoding is not None:
+            self._token = _ARRAY_ENCODING.set(self)
+        return self
+
+    def __exit__(self, *args):
+        """Restore the previous encoding."""
+        if self._token is not None:
+            _ARRAY_ENCODING.reset(self._token)
+            self._token = None
+
+
+_ARRAY_ENCODING: ContextVar[Optional[array_encoding]] = ContextVar('genbase_array_encoding', default=None)
+
+
+BLOB_KEY = '__blob__'
+
+
+class Blob:
+    """Serialized object in a `blob_store`, loaded lazily on first use of `load()`."""
+
+    def __init__(self, digest: str, path: str, size: Optional[int] = None):
+        """
+        Args:
+            digest (str): SHA-256 hash of the serialized object.
+            path (str): Path of the blob file.
+            size (Optional[int], optional): Size of the serialized object in bytes. Defaults to None.
+        """
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self._loaded = False
+        self._obj = None
+
+    @classmethod
+    def from_reference(cls, reference: dict, root: Optional[str] = None) -> 'Blob':
+        path = reference['path']
+        if root is not None and not os.path.isabs(path):
+            path = os.path.join(root, path)
+        return cls(reference[BLOB_KEY], path, size=reference.get('size'))
+
+    def to_reference(self) -> dict:
+        """Export as reference, adding the blob to the current `blob_store` (if any)."""
+        store = _BLOB_STORE.get()
+        return store.add_file(self) if store is not None else \
+            {BLOB_KEY: self.digest, 'path': os.path.abspath(self.path), 'size': self.size}
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def load(self) -> Any:
+        """Unpickle the object (once)."""
+        if not self._loaded:
+            self._obj = srsly.pickle_loads(self.read_bytes())
+            self._loaded = True
+        return self._obj
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(digest={self.digest}, path={self.path}, size={self.size})'
+
+
+register_exporter(Blob, Blob.to_reference)
+
+_BLOB_STORE: ContextVar[Optional['blob_store']] = ContextVar('genbase_blob_store', default=None)
+
+
+class blob_store:
+    """Write serialized objects (see `export_serializable()`) to a content-addressed store within a `with` statement.
+
+    Each payload of at least `min_size` bytes is written once to `{directory}/{sha256}.pkl` and exported as a reference
+    to it (`{'__blob__': sha256, 'path': ..., 'size': ...}`), so large objects such as `sklearn` pipelines are not
+    embedded in every config they occur in. `decode_arrays()` (used by `Configurable.from_config()` and
+    `Configurable.read_json()`) turns references into `Blob`s, that load the object lazily.
+
+    Example:
+        Export explanations sharing the same pipeline, which is written to directory 'blobs' once:
+
+        >>> from genbase.utils import blob_store
+        >>> with blob_store('blobs'):
+        ...     configs = [explanation.to_config() for explanation in explanations]
+    """
+
+    def __init__(self, directory: str, min_size: int = 64 * 1024, root: Optional[str] = None):
+        """
+        Args:
+            directory (str): Directory to write blobs to.
+            min_size (int, optional): Minimum size in bytes to write a payload to the store, smaller payloads are
+                inlined as base64. Defaults to 64 * 1024.
+            root (Optional[str], optional): Store paths of blobs relative to `root`. Defaults to None.
+        """
+        self.directory = directory
+        self.min_size = min_size
+        self.root = root
+        self._exported: Dict[int, Tuple[Any, Union[bytes, dict]]] = {}
+        self._token = None
+
+    def _reference(self, digest: str, size: int) -> dict:
+        path = os.path.join(self.directory, f'{digest}.pkl')
+        return {BLOB_KEY: digest,
+                'path': os.path.relpath(path, self.root) if self.root is not None else path,
+                'size': size}
+
+    def _write(self, digest: str, write_fn: Callable[[str], None]) -> None:
+        path = os.path.join(self.directory, f'{digest}.pkl')
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+            write_fn(tmp_path)
+            os.replace(tmp_path, path)
+
+    def add(self, data: bytes) -> dict:
+        """Add serialized data to the store (if not already in it).
+
+        Returns:
+            dict: Reference to the blob.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+
+        def write(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        self._write(digest, write)
+        return self._reference(digest, len(data))
+
+    def add_file(self, blob: Blob) -> dict:
+        """Add a blob from another store (if not already in this one), without loading it."""
+        self._write(blob.digest, lambda path: shutil.copyfile(blob.path, path))
+        return self._reference(blob.digest, blob.size)
+
+    def export(self, obj) -> Union[bytes, dict]:
+        """Export `obj` as base64-encoded pickle if it is small or as reference to the store, pickling it only once."""
+        if id(obj) in self._exported:
+            exported = self._exported[id(obj)][1]
+            return dict(exported) if isinstance(exported, dict) else exported
+        data = srsly.pickle_dumps(obj)
+        exported = base64.b64encode(data) if len(data) < self.min_size else self.add(data)
+        self._exported[id(obj)] = (obj, exported)  # keep `obj` alive, so its `id()` is not reused
+        return exported
+
+    def __enter__(self):
+        self._token = _BLOB_STORE.set(self)
+        return self
+
+    def __exit__(self, *args):
+        _BLOB_STORE.reset(self._token)
+        self._exported.clear()
 
 
 def get_file_type(pathlike: str) -> Optional[str]: